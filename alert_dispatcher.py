@@ -0,0 +1,159 @@
+"""
+Outbox dispatcher for ScaleX Ventures portfolio alerts
+Drains pending rows from the alerts table and delivers them with retries
+"""
+
+import logging
+import random
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Iterable, List, Optional, Tuple, Union
+
+from config import (
+    ALERT_MAX_ATTEMPTS, ALERT_RETRY_BASE_SECONDS, ALERT_RETRY_MAX_SECONDS,
+    ALERT_DISPATCH_INTERVAL_SECONDS, ALERT_DISPATCH_WORKERS,
+    ALERT_DIGEST_WINDOW_MINUTES, ALERT_DIGEST_MAX_MENTIONS
+)
+from database import MentionDatabase
+from metrics import metrics
+
+logger = logging.getLogger(__name__)
+
+class AlertDispatcher:
+    """
+    Senders take a digest's claimed rows and return whether they were delivered,
+    or, when they send them in several messages, the alert ids of the rows that
+    were; only the rest are retried
+    """
+
+    def __init__(self, db: MentionDatabase, senders: Dict[str, Callable[[List[Dict]], Union[bool, Iterable[int]]]],
+                 max_attempts: int = ALERT_MAX_ATTEMPTS,
+                 base_delay: int = ALERT_RETRY_BASE_SECONDS,
+                 max_delay: int = ALERT_RETRY_MAX_SECONDS,
+                 max_workers: int = ALERT_DISPATCH_WORKERS,
+                 batch_size: int = 200,
+                 digest_window_minutes: int = ALERT_DIGEST_WINDOW_MINUTES,
+                 digest_max_size: int = ALERT_DIGEST_MAX_MENTIONS):
+        self.db = db
+        self.senders = senders
+        self.max_attempts = max_attempts
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.max_workers = max_workers
+        self.batch_size = batch_size
+        self.digest_window_minutes = digest_window_minutes
+        self.digest_max_size = digest_max_size
+        self.running = False
+        self.dispatch_thread = None
+        self._wake_event = threading.Event()
+    
+    def backoff_delay(self, attempts: int) -> int:
+        """Exponential backoff with jitter for the given number of failed attempts"""
+        delay = min(self.max_delay, self.base_delay * (2 ** max(attempts - 1, 0)))
+        return max(1, int(delay * random.uniform(0.5, 1.0)))
+    
+    def drain(self, flush_digests: bool = False) -> Dict[str, bool]:
+        """
+        Deliver all due alerts, one message per (channel, company), in parallel
+        Mentions held in the digest window are included when flush_digests is set.
+        Returns per channel whether every one of its messages was delivered
+        """
+        alerts = self.db.claim_due_alerts(
+            limit=self.batch_size,
+            digest_window_minutes=0 if flush_digests else self.digest_window_minutes,
+            digest_max_size=self.digest_max_size
+        )
+        if not alerts:
+            return {}
+        
+        # Group claimed rows into one digest per channel and company
+        digests: Dict[Tuple[str, str], List[Dict]] = {}
+        for alert in alerts:
+            digests.setdefault((alert['alert_type'], alert['company_name']), []).append(alert)
+        
+        results = {}
+        with ThreadPoolExecutor(max_workers=max(1, min(len(digests), self.max_workers))) as pool:
+            futures = {
+                key: pool.submit(self._deliver, key[0], rows)
+                for key, rows in digests.items()
+            }
+            for (alert_type, _), future in futures.items():
+                results[alert_type] = future.result() and results.get(alert_type, True)
+        
+        logger.info(f"Alert dispatch results: {results} ({len(digests)} digests)")
+        return results
+    
+    def _deliver(self, alert_type: str, rows: List[Dict]) -> bool:
+        """Send one digest's claimed rows on a channel and record the outcome of each"""
+        sender = self.senders.get(alert_type)
+        error_message = None
+        delivered = set()
+        
+        if sender is None:
+            error_message = f"No sender configured for alert type '{alert_type}'"
+        else:
+            try:
+                with metrics.timed('alert', channel=alert_type):
+                    result = sender(rows)
+                if isinstance(result, bool):
+                    delivered = {row['alert_id'] for row in rows} if result else set()
+                else:
+                    delivered = set(result)
+                error_message = f"{alert_type} delivery failed"
+            except Exception as e:
+                error_message = str(e)
+        
+        updates = []
+        for row in rows:
+            if row['alert_id'] in delivered:
+                updates.append((row['alert_id'], 'sent', None))
+                continue
+            
+            attempts = (row.get('attempts') or 0) + 1
+            if sender is None or attempts >= self.max_attempts:
+                logger.error(f"Giving up on alert {row['idempotency_key']} after {attempts} attempts: {error_message}")
+                updates.append((row['alert_id'], 'failed', error_message))
+            else:
+                delay = self.backoff_delay(attempts)
+                logger.warning(f"Retrying alert {row['idempotency_key']} in {delay}s: {error_message}")
+                updates.append((row['alert_id'], 'retry', error_message, delay))
+        
+        self.db.update_alert_statuses(updates)
+        return all(row['alert_id'] in delivered for row in rows)
+    
+    def wake(self):
+        """Ask the background dispatcher to drain immediately"""
+        self._wake_event.set()
+    
+    def start(self, interval_seconds: int = ALERT_DISPATCH_INTERVAL_SECONDS):
+        """Start draining the outbox in a background thread"""
+        if self.running:
+            return
+        
+        self.running = True
+        self.dispatch_thread = threading.Thread(
+            target=self._run, args=(interval_seconds,), daemon=True
+        )
+        self.dispatch_thread.start()
+        logger.info(f"Alert dispatcher started (every {interval_seconds}s)")
+    
+    def _run(self, interval_seconds: int):
+        """Internal dispatcher loop"""
+        while self.running:
+            try:
+                self.drain()
+            except Exception as e:
+                logger.error(f"Alert dispatcher error: {e}")
+            
+            self._wake_event.wait(interval_seconds)
+            self._wake_event.clear()
+    
+    def stop(self, timeout: Optional[float] = 5):
+        """Stop the background dispatcher"""
+        self.running = False
+        self._wake_event.set()
+        
+        if self.dispatch_thread and self.dispatch_thread.is_alive():
+            self.dispatch_thread.join(timeout=timeout)
+        
+        logger.info("Alert dispatcher stopped")
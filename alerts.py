@@ -3,8 +3,6 @@ Alert system for ScaleX Ventures portfolio monitoring
 Supports email, Slack, and webhook notifications
 """
 
-import smtplib
-import requests
 import logging
 from email.mime.text import MIMEText
 from email.mime.multipart import MIMEMultipart
@@ -13,24 +11,55 @@ from datetime import datetime
 import json
 
 from config import (
-    SLACK_WEBHOOK_URL, EMAIL_SMTP_SERVER, EMAIL_SMTP_PORT,
-    EMAIL_USERNAME, EMAIL_PASSWORD, ALERT_EMAIL_RECIPIENTS
+    SLACK_WEBHOOK_URL, EMAIL_USERNAME, EMAIL_PASSWORD, ALERT_EMAIL_RECIPIENTS
 )
 from database import MentionDatabase
+from http_client import get_session
+from story_clustering import collapse_stories
+from alert_dispatcher import AlertDispatcher
+from smtp_pool import get_smtp_sender
+from slack_transport import get_slack_transport
 
 logger = logging.getLogger(__name__)
 
 class AlertSystem:
     def __init__(self, db: MentionDatabase):
         self.db = db
+        self.smtp_sender = get_smtp_sender()
+        
+        # New mentions enqueue outbox rows for every configured channel;
+        # the dispatcher delivers them with retries
+        self.db.register_alert_types(self.enabled_alert_types())
+        self.dispatcher = AlertDispatcher(db, {
+            'email': self.send_email_alert,
+            'slack': self.deliver_slack_alert
+        })
+    
+    def enabled_alert_types(self) -> List[str]:
+        """Get the alert channels that are configured"""
+        alert_types = []
+        if EMAIL_USERNAME and ALERT_EMAIL_RECIPIENTS:
+            alert_types.append('email')
+        if SLACK_WEBHOOK_URL:
+            alert_types.append('slack')
+        return alert_types
+    
+    def dispatch_pending(self, flush_digests: bool = False) -> Dict[str, bool]:
+        """Deliver queued alerts from the outbox"""
+        return self.dispatcher.drain(flush_digests=flush_digests)
     
     def format_mention_for_alert(self, mention: Dict) -> Dict:
         """Format a mention for alert display"""
         sentiment_emoji = self._get_sentiment_emoji(mention.get('sentiment_score', 0))
         
+        # Collapsed story clusters note how many other outlets ran the story
+        title = mention['title']
+        if mention.get('duplicate_count'):
+            title = f"{title} (+{mention['duplicate_count']} more outlets)"
+        
         return {
             'company': mention['company_name'],
-            'title': mention['title'],
+            'title': title,
             'content': mention.get('content', '')[:200] + '...' if len(mention.get('content', '')) > 200 else mention.get('content', ''),
             'url': mention['url'],
             'source': mention['source'],
@@ -56,33 +85,13 @@ class AlertSystem:
             return False
         
         try:
-            # Create email content
+            mentions = collapse_stories(mentions)
             subject = f"ScaleX Ventures Portfolio Alert - {len(mentions)} New Mentions"
+            msg = self._create_email_message(subject, mentions)
             
-            # HTML email body
-            html_body = self._create_email_html(mentions)
-            
-            # Text email body
-            text_body = self._create_email_text(mentions)
-            
-            # Create message
-            msg = MIMEMultipart('alternative')
-            msg['Subject'] = subject
-            msg['From'] = EMAIL_USERNAME
-            msg['To'] = ', '.join(ALERT_EMAIL_RECIPIENTS)
-            
-            # Add text and HTML parts
-            part1 = MIMEText(text_body, 'plain')
-            part2 = MIMEText(html_body, 'html')
-            
-            msg.attach(part1)
-            msg.attach(part2)
-            
-            # Send email
-            with smtplib.SMTP(EMAIL_SMTP_SERVER, EMAIL_SMTP_PORT) as server:
-                server.starttls()
-                server.login(EMAIL_USERNAME, EMAIL_PASSWORD)
-                server.sendmail(EMAIL_USERNAME, ALERT_EMAIL_RECIPIENTS, msg.as_string())
+            # Send over the pooled connection instead of a fresh handshake per alert
+            if not self.smtp_sender.send(EMAIL_USERNAME, ALERT_EMAIL_RECIPIENTS, msg.as_string()):
+                return False
             
             logger.info(f"Email alert sent successfully to {len(ALERT_EMAIL_RECIPIENTS)} recipients")
             return True
@@ -91,6 +100,44 @@ class AlertSystem:
             logger.error(f"Failed to send email alert: {e}")
             return False
     
+    def send_company_email_alerts(self, mentions: List[Dict]) -> bool:
+        """Send one email per company, all over a single pooled SMTP connection"""
+        if not EMAIL_USERNAME or not EMAIL_PASSWORD or not ALERT_EMAIL_RECIPIENTS:
+            logger.warning("Email configuration not complete")
+            return False
+        
+        try:
+            mentions_by_company = {}
+            for mention in collapse_stories(mentions):
+                mentions_by_company.setdefault(mention['company_name'], []).append(mention)
+            
+            messages = []
+            for company, company_mentions in mentions_by_company.items():
+                subject = f"ScaleX Ventures Portfolio Alert - {company} ({len(company_mentions)} New Mentions)"
+                msg = self._create_email_message(subject, company_mentions)
+                messages.append((EMAIL_USERNAME, ALERT_EMAIL_RECIPIENTS, msg.as_string()))
+            
+            sent = self.smtp_sender.send_many(messages)
+            logger.info(f"Sent {sent}/{len(messages)} company email alerts")
+            return sent == len(messages)
+            
+        except Exception as e:
+            logger.error(f"Failed to send company email alerts: {e}")
+            return False
+    
+    def _create_email_message(self, subject: str, mentions: List[Dict]) -> MIMEMultipart:
+        """Create a multipart email with text and HTML bodies"""
+        msg = MIMEMultipart('alternative')
+        msg['Subject'] = subject
+        msg['From'] = EMAIL_USERNAME
+        msg['To'] = ', '.join(ALERT_EMAIL_RECIPIENTS)
+        
+        # Add text and HTML parts
+        msg.attach(MIMEText(self._create_email_text(mentions), 'plain'))
+        msg.attach(MIMEText(self._create_email_html(mentions), 'html'))
+        
+        return msg
+    
     def _create_email_html(self, mentions: List[Dict]) -> str:
         """Create HTML email body"""
         html = f"""
@@ -204,14 +251,24 @@ Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
     
     def send_slack_alert(self, mentions: List[Dict]) -> bool:
         """Send Slack alert for new mentions"""
+        return len(self._send_slack(mentions)) == len(mentions)
+    
+    def deliver_slack_alert(self, rows: List[Dict]) -> List[int]:
+        """Outbox sender for Slack: alert ids of the rows whose company section was delivered"""
+        return [row['alert_id'] for row in self._send_slack(rows)]
+    
+    def _send_slack(self, mentions: List[Dict]) -> List[Dict]:
+        """Post mentions to Slack; returns those whose company's section was delivered"""
         if not SLACK_WEBHOOK_URL:
             logger.warning("Slack webhook URL not configured")
-            return False
+            return []
         
         try:
+            collapsed = collapse_stories(mentions)
+            
             # Group mentions by company
             mentions_by_company = {}
-            for mention in mentions:
+            for mention in collapsed:
                 company = mention['company_name']
                 if company not in mentions_by_company:
                     mentions_by_company[company] = []
@@ -223,7 +280,7 @@ Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
                     "type": "header",
                     "text": {
                         "type": "plain_text",
-                        "text": f"🚀 ScaleX Portfolio Alert - {len(mentions)} New Mentions"
+                        "text": f"🚀 ScaleX Portfolio Alert - {len(collapsed)} New Mentions"
                     }
                 },
                 {
@@ -237,6 +294,8 @@ Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
                 }
             ]
             
+            # One segment per company, so a message that fails only fails its companies
+            sections = []
             for company, company_mentions in mentions_by_company.items():
                 # Company header
                 blocks.append({
@@ -279,23 +338,28 @@ Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
                     })
                 
                 blocks.append({"type": "divider"})
+                sections.append(blocks)
+                blocks = []
             
             # Send to Slack
             payload = {
-                "blocks": blocks,
                 "username": "ScaleX Portfolio Monitor",
                 "icon_emoji": ":rocket:"
             }
             
-            response = requests.post(SLACK_WEBHOOK_URL, json=payload, timeout=30)
-            response.raise_for_status()
-            
-            logger.info("Slack alert sent successfully")
-            return True
+            # Large bursts are split into block-limit compliant, rate-limited messages
+            delivered = get_slack_transport(SLACK_WEBHOOK_URL).send_segments(payload, sections)
+            companies = {company for company, ok in zip(mentions_by_company, delivered) if ok}
+            if len(companies) < len(mentions_by_company):
+                logger.error(f"Failed to send Slack alert for "
+                             f"{', '.join(c for c in mentions_by_company if c not in companies)}")
+            else:
+                logger.info("Slack alert sent successfully")
+            return [mention for mention in mentions if mention['company_name'] in companies]
             
         except Exception as e:
             logger.error(f"Failed to send Slack alert: {e}")
-            return False
+            return []
     
     def send_webhook_alert(self, mentions: List[Dict], webhook_url: str) -> bool:
         """Send generic webhook alert"""
@@ -307,7 +371,7 @@ Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
                 "mentions": [self.format_mention_for_alert(m) for m in mentions]
             }
             
-            response = requests.post(webhook_url, json=payload, timeout=30)
+            response = get_session().post(webhook_url, json=payload, timeout=30)
             response.raise_for_status()
             
             logger.info(f"Webhook alert sent successfully to {webhook_url}")
@@ -318,7 +382,7 @@ Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
             return False
     
     def send_alerts(self, mentions: List[Dict]) -> Dict[str, bool]:
-        """Send all configured alerts"""
+        """Send all configured alerts immediately, bypassing the outbox"""
         if not mentions:
             logger.info("No mentions to alert about")
             return {}
@@ -328,28 +392,18 @@ Generated: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}
         # Send email alert
         if EMAIL_USERNAME and ALERT_EMAIL_RECIPIENTS:
             results['email'] = self.send_email_alert(mentions)
-            
-            # Record alert attempts in database
-            for mention in mentions:
-                if mention.get('id'):
-                    self.db.add_alert_record(
-                        mention['id'], 
-                        'email', 
-                        'sent' if results['email'] else 'failed'
-                    )
         
         # Send Slack alert
         if SLACK_WEBHOOK_URL:
             results['slack'] = self.send_slack_alert(mentions)
-            
-            # Record alert attempts in database
-            for mention in mentions:
-                if mention.get('id'):
-                    self.db.add_alert_record(
-                        mention['id'], 
-                        'slack', 
-                        'sent' if results['slack'] else 'failed'
-                    )
+        
+        # Record alert attempts in one transaction, committed by the database's writer thread
+        self.db.get_writer().add_alert_records([
+            (mention['id'], alert_type, 'sent' if success else 'failed')
+            for alert_type, success in results.items()
+            for mention in mentions
+            if mention.get('id')
+        ])
         
         logger.info(f"Alert results: {results}")
         return results
@@ -10,6 +10,7 @@ import json
 
 from config_minimal import DEMO_MODE, DEMO_ALERT_EMAIL, DEMO_ALERT_SLACK
 from database import MentionDatabase
+from story_clustering import collapse_stories
 
 logger = logging.getLogger(__name__)
 
@@ -21,9 +22,14 @@ class MinimalAlertSystem:
         """Format a mention for alert display"""
         sentiment_emoji = self._get_sentiment_emoji(mention.get('sentiment_score', 0))
         
+        # Collapsed story clusters note how many other outlets ran the story
+        title = mention['title']
+        if mention.get('duplicate_count'):
+            title = f"{title} (+{mention['duplicate_count']} more outlets)"
+        
         return {
             'company': mention['company_name'],
-            'title': mention['title'],
+            'title': title,
             'content': mention.get('content', '')[:150] + '...' if len(mention.get('content', '')) > 150 else mention.get('content', ''),
             'url': mention['url'],
             'source': mention['source'],
@@ -145,22 +151,24 @@ class MinimalAlertSystem:
             return {}
         
         results = {}
+        stories = collapse_stories(mentions)
         
         # Always send console alert
-        results['console'] = self.send_console_alert(mentions)
+        results['console'] = self.send_console_alert(stories)
         
         # Send demo email alert
-        results['email_demo'] = self.send_demo_email_alert(mentions)
+        results['email_demo'] = self.send_demo_email_alert(stories)
         
         # Send demo Slack alert
-        results['slack_demo'] = self.send_demo_slack_alert(mentions)
-        
-        # Record alert attempts in database
-        for mention in mentions:
-            if mention.get('id'):
-                self.db.add_alert_record(mention['id'], 'console', 'sent')
-                self.db.add_alert_record(mention['id'], 'email_demo', 'sent')
-                self.db.add_alert_record(mention['id'], 'slack_demo', 'sent')
+        results['slack_demo'] = self.send_demo_slack_alert(stories)
+        
+        # Record alert attempts in one transaction, committed by the database's writer thread
+        self.db.get_writer().add_alert_records([
+            (mention['id'], alert_type, 'sent' if success else 'failed')
+            for alert_type, success in results.items()
+            for mention in mentions
+            if mention.get('id')
+        ])
         
         logger.info(f"Demo alert results: {results}")
         return results
@@ -4,13 +4,13 @@ Sends actual alerts to your Slack workspace
 """
 
 import logging
-import requests
-import json
 from typing import List, Dict, Optional
 from datetime import datetime
 
 from config_complete import PORTFOLIO_COMPANIES
 from database import MentionDatabase
+from story_clustering import collapse_stories
+from slack_transport import get_slack_transport
 
 logger = logging.getLogger(__name__)
 
@@ -18,14 +18,20 @@ class SlackAlertSystem:
     def __init__(self, db: MentionDatabase, slack_webhook_url: str):
         self.db = db
         self.slack_webhook_url = slack_webhook_url
+        self.transport = get_slack_transport(slack_webhook_url)
     
     def format_mention_for_alert(self, mention: Dict) -> Dict:
         """Format a mention for alert display"""
         sentiment_emoji = self._get_sentiment_emoji(mention.get('sentiment_score', 0))
         
+        # Collapsed story clusters note how many other outlets ran the story
+        title = mention['title']
+        if mention.get('duplicate_count'):
+            title = f"{title} (+{mention['duplicate_count']} more outlets)"
+        
         return {
             'company': mention['company_name'],
-            'title': mention['title'],
+            'title': title,
             'content': mention.get('content', '')[:200] + '...' if len(mention.get('content', '')) > 200 else mention.get('content', ''),
             'url': mention['url'],
             'source': mention['source'],
@@ -51,7 +57,7 @@ class SlackAlertSystem:
         try:
             # Group mentions by company
             company_mentions = {}
-            for mention in mentions:
+            for mention in collapse_stories(mentions):
                 company = mention['company_name']
                 if company not in company_mentions:
                     company_mentions[company] = []
@@ -65,23 +71,30 @@ class SlackAlertSystem:
                 "blocks": blocks
             }
             
-            response = requests.post(
-                self.slack_webhook_url,
-                data=json.dumps(payload),
-                headers={'Content-Type': 'application/json'},
-                timeout=10
-            )
-            
-            if response.status_code == 200:
+            if self.transport.send(payload):
                 logger.info("✅ Slack alert sent successfully")
-                return True
+                success = True
             else:
-                logger.error(f"❌ Slack alert failed: {response.status_code} - {response.text}")
-                return False
+                logger.error("❌ Slack alert failed")
+                success = False
                 
         except Exception as e:
             logger.error(f"❌ Slack alert error: {e}")
-            return False
+            success = False
+        
+        self._record_alerts(mentions, success)
+        return success
+    
+    def _record_alerts(self, mentions: List[Dict], success: bool):
+        """Record Slack alert attempts for stored mentions in a single transaction"""
+        try:
+            self.db.get_writer().add_alert_records([
+                (mention['id'], 'slack', 'sent' if success else 'failed')
+                for mention in mentions
+                if mention.get('id')
+            ])
+        except Exception as e:
+            logger.warning(f"Failed to record Slack alert attempts: {e}")
     
     def _create_slack_blocks(self, company_mentions: Dict) -> List[Dict]:
         """Create Slack message blocks"""
@@ -233,18 +246,11 @@ class SlackAlertSystem:
                 "blocks": blocks
             }
             
-            response = requests.post(
-                self.slack_webhook_url,
-                data=json.dumps(payload),
-                headers={'Content-Type': 'application/json'},
-                timeout=10
-            )
-            
-            if response.status_code == 200:
+            if self.transport.send(payload):
                 logger.info("✅ Daily summary sent successfully")
                 return True
             else:
-                logger.error(f"❌ Daily summary failed: {response.status_code}")
+                logger.error("❌ Daily summary failed")
                 return False
                 
         except Exception as e:
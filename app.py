@@ -4,12 +4,19 @@ ScaleX Ventures Portfolio Monitoring System - Web UI
 Beautiful web interface for portfolio monitoring
 """
 
-from flask import Flask, render_template, jsonify, request, redirect, url_for
+from flask import Flask, render_template, jsonify, request, redirect, url_for, Response, abort
+import hmac
 import sqlite3
 import json
+import threading
 from datetime import datetime, timedelta
 import os
 from config_complete import PORTFOLIO_COMPANIES, TOTAL_COMPANIES, FUND_I_COMPANIES, ACQUIRED_COMPANIES, ANGEL_COMPANIES
+from story_clustering import collapse_stories
+from metrics import metrics
+from profiling import maybe_profile, request_profile
+from query_log import connect, query_log
+from config import DEBUG_ROUTES_TOKEN
 try:
     from dotenv import load_dotenv
     load_dotenv()
@@ -24,7 +31,7 @@ app = Flask(__name__)
 
 def get_db_connection():
     """Get database connection"""
-    conn = sqlite3.connect('portfolio_mentions.db')
+    conn = connect('portfolio_mentions.db')
     conn.row_factory = sqlite3.Row
     return conn
 
@@ -35,6 +42,23 @@ def init_database():
     db.populate_portfolio_companies(PORTFOLIO_COMPANIES)
     return db
 
+_db = None
+_db_lock = threading.Lock()
+
+def get_db():
+    """Shared MentionDatabase, created (schema checks and company upserts) on first use"""
+    global _db
+    if _db is None:
+        with _db_lock:
+            if _db is None:
+                _db = init_database()
+    return _db
+
+def debug_allowed() -> bool:
+    """Whether the request may use the /debug routes and profiling: DEBUG_ROUTES_TOKEN is set and was sent"""
+    token = request.headers.get('X-Debug-Token') or request.args.get('token', '')
+    return bool(DEBUG_ROUTES_TOKEN) and hmac.compare_digest(token.encode(), DEBUG_ROUTES_TOKEN.encode())
+
 def get_portfolio_stats():
     """Get comprehensive portfolio statistics"""
     conn = get_db_connection()
@@ -57,11 +81,11 @@ def get_portfolio_stats():
         'SELECT source, COUNT(*) as count FROM mentions GROUP BY source ORDER BY count DESC'
     ).fetchall()
     
-    # Mentions by fund
+    # Mentions by fund (portfolio_companies.name is unique, so the join is an index lookup)
     fund_mentions = conn.execute(
-        'SELECT m.company_name, m.source, c.fund FROM mentions m '
-        'JOIN (SELECT DISTINCT name, fund FROM portfolio_companies) c ON m.company_name = c.name '
-        'GROUP BY c.fund'
+        'SELECT c.fund, COUNT(*) as count FROM mentions m '
+        'JOIN portfolio_companies c ON m.company_name = c.name '
+        'GROUP BY c.fund ORDER BY count DESC'
     ).fetchall()
     
     # Recent mentions details
@@ -104,13 +128,35 @@ def api_companies():
 
 @app.route('/api/mentions')
 def api_mentions():
-    """API endpoint for recent mentions"""
+    """API endpoint for recent mentions (syndicated copies collapsed unless ?collapse=0)"""
     conn = get_db_connection()
     mentions = conn.execute(
         'SELECT * FROM mentions ORDER BY published_date DESC, created_at DESC LIMIT 50'
     ).fetchall()
     conn.close()
-    return jsonify([dict(row) for row in mentions])
+    mentions = [dict(row) for row in mentions]
+    if request.args.get('collapse', '1') != '0':
+        mentions = collapse_stories(mentions)
+    return jsonify(mentions)
+
+@app.route('/metrics')
+def prometheus_metrics():
+    """Per-stage pipeline timings in Prometheus text format"""
+    return Response(metrics.render_prometheus(), mimetype='text/plain; version=0.0.4')
+
+@app.route('/debug/queries')
+def debug_queries():
+    """Per-statement SQL timings and recent slow queries with their plans"""
+    if not debug_allowed():
+        abort(404)
+    return jsonify(query_log.snapshot(limit=request.args.get('limit', 50, type=int)))
+
+@app.route('/debug/sources')
+def debug_sources():
+    """Circuit breaker state and health score of every source and endpoint"""
+    if not debug_allowed():
+        abort(404)
+    return jsonify(get_db().get_source_health())
 
 @app.route('/api/run-monitoring')
 def api_run_monitoring():
@@ -118,17 +164,30 @@ def api_run_monitoring():
     try:
         # Import and run the monitoring system
         from main_complete import run_complete_demo
-        result = run_complete_demo()
+        with maybe_profile('api-cycle'):
+            result = run_complete_demo()
         return jsonify({'success': True, 'message': 'Monitoring completed successfully'})
     except Exception as e:
         return jsonify({'success': False, 'message': str(e)})
 
+@app.route('/api/profile-next-cycle', methods=['POST'])
+def api_profile_next_cycle():
+    """Profile the next monitoring cycle here or in the scheduler (?tracemalloc=1 for allocations)"""
+    if not debug_allowed():
+        abort(404)
+    try:
+        trace_allocations = request.args.get('tracemalloc', '0') == '1'
+        request_profile(trace_allocations=trace_allocations)
+        return jsonify({'success': True, 'message': 'The next monitoring cycle will be profiled',
+                        'tracemalloc': trace_allocations})
+    except Exception as e:
+        return jsonify({'success': False, 'message': str(e)}), 500
+
 @app.route('/api/clean-false-positives')
 def api_clean_false_positives():
     """API endpoint to clean false positive mentions"""
     try:
-        from database import MentionDatabase
-        db = MentionDatabase()
+        db = get_db()
         deleted_count = db.clean_false_positives()
         
         return jsonify({
@@ -177,9 +236,9 @@ def mentions():
         'SELECT * FROM mentions ORDER BY published_date DESC, created_at DESC LIMIT 100'
     ).fetchall()
     conn.close()
-    return render_template('mentions.html', mentions=[dict(row) for row in mentions])
+    return render_template('mentions.html', mentions=collapse_stories([dict(row) for row in mentions]))
 
 if __name__ == '__main__':
     # Initialize database on startup
-    init_database()
+    get_db()
     app.run(debug=True, host='0.0.0.0', port=5000)
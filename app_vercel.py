@@ -4,13 +4,16 @@ ScaleX Ventures Portfolio Monitor - Vercel Version
 Web interface for monitoring portfolio company mentions
 """
 
+import hmac
 import os
 import sqlite3
 import json
+import threading
 from datetime import datetime, timedelta
-from flask import Flask, render_template, jsonify, request
-from news_monitor_complete import CompleteNewsMonitor
+from flask import Flask, render_template, jsonify, request, abort
 from config_complete import PORTFOLIO_COMPANIES
+from query_log import connect, query_log
+from config import DEBUG_ROUTES_TOKEN
 
 app = Flask(__name__)
 
@@ -22,8 +25,24 @@ def init_database():
     db.populate_portfolio_companies(PORTFOLIO_COMPANIES)
     return db
 
-# Initialize on startup
-db = init_database()
+# Initialized on first use so a cold start that only serves static pages or
+# PORTFOLIO_COMPANIES does not pay for schema checks and company upserts
+_db = None
+_db_lock = threading.Lock()
+
+def get_db():
+    """Shared MentionDatabase, created on the first request that needs it"""
+    global _db
+    if _db is None:
+        with _db_lock:
+            if _db is None:
+                _db = init_database()
+    return _db
+
+def debug_allowed() -> bool:
+    """Whether the request may see the /debug routes: DEBUG_ROUTES_TOKEN is set and was sent"""
+    token = request.headers.get('X-Debug-Token') or request.args.get('token', '')
+    return bool(DEBUG_ROUTES_TOKEN) and hmac.compare_digest(token.encode(), DEBUG_ROUTES_TOKEN.encode())
 
 @app.route('/')
 def index():
@@ -49,12 +68,29 @@ def api_stats():
     stats = get_portfolio_stats()
     return jsonify(stats)
 
+@app.route('/debug/queries')
+def debug_queries():
+    """Per-statement SQL timings and recent slow queries with their plans"""
+    if not debug_allowed():
+        abort(404)
+    return jsonify(query_log.snapshot(limit=request.args.get('limit', 50, type=int)))
+
+@app.route('/debug/sources')
+def debug_sources():
+    """Circuit breaker state and health score of every source and endpoint"""
+    if not debug_allowed():
+        abort(404)
+    return jsonify(get_db().get_source_health())
+
 @app.route('/api/run-monitoring', methods=['POST'])
 def api_run_monitoring():
     """API endpoint to trigger monitoring manually"""
     try:
+        from news_monitor_complete import CompleteNewsMonitor
+        
         # Run monitoring for a few companies (to avoid timeout)
-        monitor = CompleteNewsMonitor()
+        db = get_db()
+        monitor = CompleteNewsMonitor(db)
         
         # Monitor only first 5 companies to avoid Vercel timeout
         companies_to_monitor = PORTFOLIO_COMPANIES[:5]
@@ -83,7 +119,7 @@ def api_run_monitoring():
 def get_portfolio_stats():
     """Get portfolio statistics"""
     try:
-        with sqlite3.connect(db.db_path) as conn:
+        with connect(get_db().db_path) as conn:
             cursor = conn.cursor()
             
             # Total mentions
@@ -136,7 +172,7 @@ def get_portfolio_stats():
 def get_recent_mentions(limit=100):
     """Get recent mentions"""
     try:
-        with sqlite3.connect(db.db_path) as conn:
+        with connect(get_db().db_path) as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT company_name, title, content, url, source, 
@@ -0,0 +1,139 @@
+"""
+HTTP client for the asyncio monitoring cycle
+Requests go through aiohttp when it is installed, otherwise through the
+sources' shared requests sessions on a small thread pool. Either way the
+client caps the requests in flight overall and per host, and spaces each
+host's requests by its rate limit (or a source's politeness delay, if longer)
+"""
+
+import asyncio
+import json
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Optional, Tuple
+from urllib.parse import urlsplit
+
+import requests
+
+from config import (
+    ASYNC_HTTP_BACKEND, ASYNC_MAX_IN_FLIGHT, ASYNC_PER_HOST_LIMIT, ASYNC_HOST_RATE_PER_SECOND,
+    HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT, HTTP_DNS_CACHE_SECONDS
+)
+
+# Requests running at once on the thread backend
+MAX_THREADS = 32
+
+def aiohttp_available() -> bool:
+    try:
+        import aiohttp  # noqa: F401
+        return True
+    except ImportError:
+        return False
+
+class AsyncRateLimiter:
+    """Spaces acquisitions at least `interval` seconds apart on one event loop"""
+
+    def __init__(self, interval: float = 0.0):
+        self.interval = interval
+        self._next_at = 0.0
+
+    async def wait(self, interval: Optional[float] = None):
+        """Wait for the next slot; `interval` widens the spacing for this caller"""
+        interval = max(self.interval, interval or 0.0)
+        if interval <= 0:
+            return
+        now = asyncio.get_running_loop().time()
+        wait = self._next_at - now
+        self._next_at = max(now, self._next_at) + interval
+        if wait > 0:
+            await asyncio.sleep(wait)
+
+class AsyncResponse:
+    """The parts of requests.Response the sources use, for a response read in full"""
+
+    def __init__(self, url: str, status_code: int, content: bytes, headers: Dict[str, str]):
+        self.url = url
+        self.status_code = status_code
+        self.content = content
+        self.headers = headers
+
+    def json(self):
+        return json.loads(self.content)
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.exceptions.HTTPError(f"{self.status_code} Error for url: {self.url}", response=self)
+
+class AsyncHTTPClient:
+    def __init__(self, max_in_flight: int = ASYNC_MAX_IN_FLIGHT, per_host: int = ASYNC_PER_HOST_LIMIT,
+                 host_rate: float = ASYNC_HOST_RATE_PER_SECOND, backend: str = ASYNC_HTTP_BACKEND):
+        if backend == 'auto':
+            backend = 'aiohttp' if aiohttp_available() else 'threads'
+        if backend not in ('aiohttp', 'threads'):
+            raise ValueError(f"Unknown async HTTP backend '{backend}' (use auto, aiohttp or threads)")
+        self.backend = backend
+        self.max_in_flight = max(1, max_in_flight)
+        self.per_host = max(1, per_host)
+        self.host_interval = 1.0 / host_rate if host_rate > 0 else 0.0
+        self._in_flight = asyncio.Semaphore(self.max_in_flight)
+        self._hosts: Dict[str, Tuple[asyncio.Semaphore, AsyncRateLimiter]] = {}
+        self._session = None
+        self._executor: Optional[ThreadPoolExecutor] = None
+
+    def _host(self, url: str) -> Tuple[asyncio.Semaphore, AsyncRateLimiter]:
+        host = urlsplit(url).netloc
+        if host not in self._hosts:
+            self._hosts[host] = (asyncio.Semaphore(self.per_host), AsyncRateLimiter(self.host_interval))
+        return self._hosts[host]
+
+    async def get(self, session: requests.Session, url: str, params: Optional[Dict] = None,
+                  timeout: Optional[float] = None, min_interval: float = 0.0):
+        """
+        GET a URL with the headers of a source's session; returns a
+        requests.Response or an AsyncResponse and raises requests exceptions
+        """
+        semaphore, limiter = self._host(url)
+        async with self._in_flight, semaphore:
+            await limiter.wait(min_interval)
+            if self.backend == 'aiohttp':
+                return await self._aiohttp_get(session, url, params, timeout)
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=min(self.max_in_flight, MAX_THREADS),
+                                                    thread_name_prefix='async-http')
+            return await asyncio.get_running_loop().run_in_executor(
+                self._executor, lambda: session.get(url, params=params, timeout=timeout))
+
+    async def _aiohttp_get(self, session: requests.Session, url: str, params: Optional[Dict],
+                           timeout: Optional[float]) -> AsyncResponse:
+        import aiohttp
+
+        if self._session is None:
+            connector = aiohttp.TCPConnector(limit=self.max_in_flight, limit_per_host=self.per_host,
+                                             ttl_dns_cache=int(HTTP_DNS_CACHE_SECONDS) or None)
+            self._session = aiohttp.ClientSession(connector=connector)
+        if timeout is None:
+            client_timeout = aiohttp.ClientTimeout(sock_connect=HTTP_CONNECT_TIMEOUT, sock_read=HTTP_READ_TIMEOUT)
+        else:
+            client_timeout = aiohttp.ClientTimeout(total=timeout)
+        try:
+            async with self._session.get(url, params=params, headers=dict(session.headers),
+                                         timeout=client_timeout) as response:
+                content = await response.read()
+                return AsyncResponse(str(response.url), response.status, content, dict(response.headers))
+        except asyncio.TimeoutError as e:
+            raise requests.exceptions.Timeout(f"Timed out fetching {url}") from e
+        except aiohttp.ClientError as e:
+            raise requests.exceptions.ConnectionError(str(e)) from e
+
+    async def close(self):
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+            self._executor = None
+
+    async def __aenter__(self) -> 'AsyncHTTPClient':
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.close()
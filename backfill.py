@@ -0,0 +1,143 @@
+"""
+Historical backfill for newly added portfolio companies
+Splits a date range into windows and fetches each (company, dated source,
+window) as an asyncio task through the async client, so every window is in
+flight at once under its per-host caps and rate limits. A window's mentions are
+filtered and scored on the monitor's engine and queued with the database's
+writer thread as soon as the window is fetched; once they are committed the
+window is checkpointed, and a resumed backfill skips checkpointed windows.
+Windows are aligned to multiples of the window size counted from 1970-01-01, so
+a backfill resumed on a later day finds the same windows
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from datetime import date, datetime, time, timedelta
+from typing import Dict, List, Optional, Tuple
+
+from config import BACKFILL_WINDOW_DAYS, BACKFILL_MAX_PAGES
+from monitor_engine import MonitorEngine
+from query_planner import plan_queries
+from sources import Source
+
+logger = logging.getLogger(__name__)
+
+WINDOW_EPOCH = date(1970, 1, 1)
+
+def windows(start: date, end: date, days: int = BACKFILL_WINDOW_DAYS) -> List[Tuple[datetime, datetime]]:
+    """
+    (start, end) windows of `days` days covering start up to end (exclusive),
+    newest first; the oldest may begin before start and the newest is cut at end
+    """
+    days = max(1, days)
+    day = start - timedelta(days=(start - WINDOW_EPOCH).days % days)
+    spans = []
+    while day < end:
+        spans.append((datetime.combine(day, time()), datetime.combine(min(day + timedelta(days=days), end), time())))
+        day += timedelta(days=days)
+    return spans[::-1]
+
+class Backfill:
+    def __init__(self, engine: MonitorEngine, window_days: int = BACKFILL_WINDOW_DAYS,
+                 max_pages: int = BACKFILL_MAX_PAGES):
+        self.engine = engine
+        self.db = engine.db
+        self.window_days = max(1, window_days)
+        # Pages fetched per query for a single-day window that is still cut off
+        self.max_pages = max(1, max_pages)
+        # Only sources that can be asked for a date range have history to fetch
+        self.sources = [source for source in engine.sources if source.date_windows]
+
+    def queries(self, source: Source, company: Dict) -> List[str]:
+        """The company's searches on a source, as OR queries where the engine batches the source"""
+        keywords = source.keywords(company)
+        if not self.engine.batched(source):
+            return keywords
+        return [batch.query for batch in plan_queries([(company, keywords)], source.window_query_limits,
+                                                      self.engine.max_query_terms)]
+
+    def run(self, companies: List[Dict], start: date, end: date,
+            client: Optional['AsyncHTTPClient'] = None) -> Dict[str, Dict[str, int]]:
+        """arun() on a new event loop"""
+        import asyncio
+        return asyncio.run(self.arun(companies, start, end, client))
+
+    async def arun(self, companies: List[Dict], start: date, end: date,
+                   client: Optional['AsyncHTTPClient'] = None) -> Dict[str, Dict[str, int]]:
+        """
+        Backfill companies from start up to end (exclusive); requests go through
+        client (a new one closed afterwards when not given). Returns per company
+        the windows fetched, the windows skipped as already checkpointed, the
+        windows that failed (retried by the next backfill) and the new mentions
+        """
+        import asyncio
+        from async_http import AsyncHTTPClient
+
+        loop = asyncio.get_running_loop()
+        spans = windows(start, end, self.window_days)
+        summary = {company['name']: {'windows': 0, 'resumed': 0, 'failed': 0, 'new_mentions': 0}
+                   for company in companies}
+
+        async def backfill_window(company: Dict, source: Source, window_start: datetime, window_end: datetime):
+            name = company['name']
+            span = f"{window_start:%Y-%m-%d}..{window_end:%Y-%m-%d}"
+            try:
+                items = []
+                for query in self.queries(source, company):
+                    found = await source.afetch_window(query, window_start, window_end, name, client, executor,
+                                                       self.max_pages)
+                    if found is None:
+                        logger.warning(f"Backfill of {name} from {source.name} for {span} incomplete, "
+                                       f"it is retried on the next backfill")
+                        summary[name]['failed'] += 1
+                        return
+                    items.extend(found)
+
+                mentions = await loop.run_in_executor(executor, self.engine.mentions_by_company, source, items,
+                                                      [company])
+                # Stored as found when the article came out, so recent-mention queries and
+                # daily summaries (which go by created_at) leave history out
+                published = {item['url']: item.get('published_at') for item in items}
+                for mention in mentions[name]:
+                    mention['created_at'] = f"{published.get(mention['url']) or window_start:%Y-%m-%d %H:%M:%S}"
+                pending = await loop.run_in_executor(resolver, self.engine.submit, company, mentions[name])
+                ids = await asyncio.gather(*(asyncio.wrap_future(future) for _, future in pending))
+                new_mentions = sum(1 for mention_id in ids if mention_id)
+                # Checkpointed only once its mentions are committed
+                await loop.run_in_executor(resolver, self.db.save_backfill_window, name, source.name,
+                                           f"{window_start:%Y-%m-%d}", f"{window_end:%Y-%m-%d}", new_mentions)
+                summary[name]['windows'] += 1
+                summary[name]['new_mentions'] += new_mentions
+            except Exception as e:
+                logger.error(f"Backfill failed for {name} from {source.name} for {span}: {e}")
+                summary[name]['failed'] += 1
+
+        owned = client is None
+        client = client or AsyncHTTPClient()
+        with ThreadPoolExecutor(max_workers=self.engine.max_workers, thread_name_prefix='backfill') as executor, \
+                ThreadPoolExecutor(max_workers=1, thread_name_prefix='backfill-resolver') as resolver:
+            try:
+                async with asyncio.TaskGroup() as group:
+                    for company in companies:
+                        done = self.db.get_backfill_windows(company['name'])
+                        for source in self.sources:
+                            oldest = (datetime.combine(date.today() - timedelta(days=source.history_days - 1), time())
+                                      if source.history_days else None)
+                            for window_start, window_end in spans:
+                                if oldest and window_start < oldest:
+                                    continue
+                                key = (source.name, f"{window_start:%Y-%m-%d}", f"{window_end:%Y-%m-%d}")
+                                if key in done:
+                                    summary[company['name']]['resumed'] += 1
+                                    continue
+                                group.create_task(backfill_window(company, source, window_start, window_end))
+            finally:
+                if owned:
+                    await client.close()
+
+        if self.engine.breakers is not None:
+            self.engine.breakers.save()
+        for name, counts in summary.items():
+            logger.info(f"Backfilled {name}: {counts['new_mentions']} new mentions from {counts['windows']} windows "
+                        f"({counts['resumed']} already done, {counts['failed']} failed)")
+        return summary
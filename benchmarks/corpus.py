@@ -0,0 +1,249 @@
+"""
+Benchmark corpus for the portfolio monitors
+Serves recorded responses from benchmarks/fixtures when one exists for a query
+and otherwise generates deterministic synthetic Google News RSS, NewsAPI JSON,
+Google SERP HTML and LinkedIn RSS payloads
+"""
+
+import json
+import os
+import random
+import re
+from datetime import datetime, timedelta
+from email.utils import format_datetime
+from html import escape
+from typing import Dict, List, Optional
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'fixtures')
+
+# Recorded fixtures live in one directory per source
+FIXTURE_KINDS = {
+    'google_news_rss': '.xml',
+    'newsapi': '.json',
+    'google_serp': '.html',
+}
+
+PUBLISHERS = [
+    ('TechCrunch', 'techcrunch.com'), ('Reuters', 'reuters.com'), ('VentureBeat', 'venturebeat.com'),
+    ('The Next Web', 'thenextweb.com'), ('Sifted', 'sifted.eu'), ('Business Insider', 'businessinsider.com'),
+    ('Forbes', 'forbes.com'), ('Yahoo Finance', 'finance.yahoo.com'), ('EU-Startups', 'eu-startups.com'),
+    ('SiliconANGLE', 'siliconangle.com'), ('The Register', 'theregister.com'), ('ZDNet', 'zdnet.com'),
+]
+
+RELEVANT_TEMPLATES = [
+    "{company} raises ${amount}M Series {round} to expand {topic}",
+    "{company} launches new {topic} product for enterprise customers",
+    "{company} partners with {partner} to bring {topic} to Europe",
+    "How {company} is changing {topic}",
+    "{company} appoints former {partner} executive as CTO",
+    "{company} announces general availability of its {topic} platform",
+    "Startup {company} named among top {topic} companies to watch",
+]
+
+NOISE_TEMPLATES = [
+    "Why {topic} matters for every enterprise in {year}",
+    "{partner} reports quarterly earnings ahead of expectations",
+    "Five trends shaping {topic} this year",
+    "Local council approves new {topic} budget",
+    "Opinion: the hype around {topic} is fading",
+]
+
+SUMMARY_TEMPLATES = [
+    "The company said the funding will be used to grow its team and accelerate adoption of {topic}.",
+    "Investors including {partner} participated in the round, according to a statement on {weekday}.",
+    "Customers have reported significant gains after moving their {topic} workloads to the platform.",
+    "Analysts expect demand for {topic} to keep growing as companies modernise their infrastructure.",
+    "The announcement follows a year of rapid growth across Europe and the United States.",
+]
+
+TOPICS = [
+    'vector search', 'graph analytics', 'cloud infrastructure', 'IT automation', 'weather intelligence',
+    'venue marketing', 'developer tooling', 'AI agents', 'data compliance', 'observability',
+]
+PARTNERS = ['Microsoft', 'Google', 'Amazon', 'Siemens', 'SAP', 'Accel', 'Index Ventures', 'Atomico']
+
+def slugify(text: str) -> str:
+    """Fixture file name for a query"""
+    return re.sub(r'[^a-z0-9]+', '-', text.lower()).strip('-') or 'empty'
+
+def load_recorded(kind: str, query: str) -> Optional[str]:
+    """Recorded response body for a query, if one was captured"""
+    path = os.path.join(FIXTURES_DIR, kind, slugify(query) + FIXTURE_KINDS[kind])
+    if not os.path.exists(path):
+        return None
+    with open(path, encoding='utf-8') as f:
+        return f.read()
+
+def or_terms(query: str) -> List[str]:
+    """Operands of a boolean OR query, with the grouping parentheses removed"""
+    return [term.strip().strip('()').strip() for term in query.split(' OR ')]
+
+def or_articles(query: str, count: int = 20, seed: int = 0) -> List[Dict]:
+    """Articles for an OR query: every operand's articles, newest first, as a real search merges them"""
+    merged = {}
+    for term in or_terms(query):
+        for article in synthetic_articles(term, count, seed):
+            merged.setdefault(article['url'], article)
+    return sorted(merged.values(), key=lambda article: article['published'], reverse=True)
+
+def _company_from_query(query: str) -> str:
+    """Best-effort company name for a search query"""
+    quoted = re.findall(r'"([^"]+)"', query)
+    words = (quoted[0] if quoted else query).split()
+    return words[0] if words else 'Acme'
+
+def synthetic_articles(query: str, count: int = 20, seed: int = 0,
+                       relevant_ratio: float = 0.7, syndication_ratio: float = 0.2) -> List[Dict]:
+    """
+    Deterministic articles for a query
+    About relevant_ratio of them name the company; about syndication_ratio are
+    copies of an earlier story from a different outlet
+    """
+    rng = random.Random(f"{seed}:{query}")
+    company = _company_from_query(query)
+    base_time = datetime(2024, 6, 1, 12, 0, 0) - timedelta(hours=rng.randint(0, 48))
+
+    articles = []
+    for i in range(count):
+        publisher, domain = rng.choice(PUBLISHERS)
+        if articles and rng.random() < syndication_ratio:
+            original = rng.choice(articles)
+            title, summary = original['title'], original['description']
+        else:
+            template = rng.choice(RELEVANT_TEMPLATES if rng.random() < relevant_ratio else NOISE_TEMPLATES)
+            values = {
+                'company': company, 'amount': rng.randint(2, 80), 'round': rng.choice('ABC'),
+                'topic': rng.choice(TOPICS), 'partner': rng.choice(PARTNERS), 'year': 2024,
+                'weekday': rng.choice(['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday']),
+            }
+            title = template.format(**values)
+            summary = ' '.join(rng.choice(SUMMARY_TEMPLATES).format(**values) for _ in range(rng.randint(1, 3)))
+
+        articles.append({
+            'title': title,
+            'description': summary,
+            'url': f"https://{domain}/news/{slugify(title)[:60]}-{rng.randint(10000, 99999)}?utm_source=rss",
+            'publisher': publisher,
+            'publisher_url': f"https://{domain}",
+            'published': base_time - timedelta(minutes=17 * i + rng.randint(0, 15)),
+        })
+    return articles
+
+def render_google_news_rss(query: str, articles: List[Dict]) -> str:
+    """Google News RSS search feed"""
+    items = []
+    for i, article in enumerate(articles):
+        title = f"{article['title']} - {article['publisher']}"
+        description = (f'<a href="{article["url"]}" target="_blank">{escape(title)}</a>'
+                       f'&nbsp;&nbsp;<font color="#6f6f6f">{escape(article["publisher"])}</font>')
+        items.append(f"""<item>
+<title>{escape(title)}</title>
+<link>{escape(article['url'])}</link>
+<guid isPermaLink="false">CBMi{slugify(query)}{i:04d}</guid>
+<pubDate>{format_datetime(article['published'])} GMT</pubDate>
+<description>{escape(description)}</description>
+<source url="{escape(article['publisher_url'])}">{escape(article['publisher'])}</source>
+</item>""")
+
+    return f"""<?xml version="1.0" encoding="UTF-8" standalone="yes"?>
+<rss version="2.0" xmlns:media="http://search.yahoo.com/mrss/">
+<channel>
+<generator>NFE/5.0</generator>
+<title>&quot;{escape(query)}&quot; - Google News</title>
+<link>https://news.google.com/search?q={escape(query)}&amp;hl=en-US&amp;gl=US&amp;ceid=US:en</link>
+<language>en-US</language>
+<webMaster>news-webmaster@google.com</webMaster>
+<copyright>2024 Google Inc.</copyright>
+<lastBuildDate>{format_datetime(datetime(2024, 6, 1, 12, 0, 0))} GMT</lastBuildDate>
+<description>Google News</description>
+{chr(10).join(items)}
+</channel>
+</rss>
+"""
+
+def render_newsapi_json(query: str, articles: List[Dict], total_results: Optional[int] = None) -> str:
+    """NewsAPI /v2/everything response (total_results: matches beyond this page, default none)"""
+    return json.dumps({
+        'status': 'ok',
+        'totalResults': len(articles) if total_results is None else total_results,
+        'articles': [{
+            'source': {'id': None, 'name': article['publisher']},
+            'author': None,
+            'title': article['title'],
+            'description': article['description'],
+            'url': article['url'],
+            'urlToImage': f"{article['publisher_url']}/images/{i}.jpg",
+            'publishedAt': article['published'].strftime('%Y-%m-%dT%H:%M:%SZ'),
+            'content': article['description'][:200] + ' [+1200 chars]',
+        } for i, article in enumerate(articles)]
+    })
+
+def _serp_noise(rng: random.Random, kilobytes: int) -> str:
+    """Markup standing in for the scripts, styles and navigation of a real results page"""
+    parts = []
+    size = 0
+    while size < kilobytes * 1024:
+        if rng.random() < 0.3:
+            chunk = '<script nonce="x">(function(){var a=' + json.dumps(
+                [rng.random() for _ in range(40)]) + ';window.__d=a;})();</script>'
+        else:
+            chunk = ''.join(
+                f'<div class="n{rng.randint(0, 999)}"><span jsname="s{j}" class="z{rng.randint(0, 99)}">'
+                f'{rng.choice(TOPICS)}</span><a href="/search?q={rng.randint(0, 99999)}">related</a></div>'
+                for j in range(10)
+            )
+        parts.append(chunk)
+        size += len(chunk)
+    return ''.join(parts)
+
+def render_google_serp_html(query: str, articles: List[Dict], noise_kb: int = 150) -> str:
+    """Google search results page in the div.g layout the LinkedIn monitors parse"""
+    rng = random.Random(query)
+    results = []
+    for i, article in enumerate(articles):
+        post_url = f"https://www.linkedin.com/posts/{slugify(article['publisher'])}_{slugify(article['title'])[:50]}-activity-{7000000000 + i}"
+        results.append(f"""<div class="g"><div class="tF2Cxc"><div class="yuRUbf">
+<a href="{escape(post_url)}" data-ved="2ahUKEw{i}"><br><h3 class="LC20lb DKV0Md">{escape(article['title'])}</h3>
+<div class="TbwUpd"><cite class="iUh30">linkedin.com &rsaquo; posts</cite></div></a></div>
+<div class="IsZvec"><span class="st">{escape(article['description'])}</span></div></div></div>""")
+
+    noise = _serp_noise(rng, noise_kb)
+    head_noise, tail_noise = noise[:len(noise) // 2], noise[len(noise) // 2:]
+    return f"""<!doctype html><html itemscope="" itemtype="http://schema.org/SearchResultsPage" lang="en">
+<head><meta charset="UTF-8"><title>{escape(query)} - Google Search</title>
+<style>.g{{margin:0 0 30px}}.st{{line-height:1.58}}</style></head>
+<body><div id="searchform">{head_noise}</div>
+<div id="main"><div id="rcnt"><div id="search"><div id="rso">
+{chr(10).join(results)}
+</div></div></div></div>
+<div id="footcnt">{tail_noise}</div></body></html>
+"""
+
+def render_linkedin_rss(company_slug: str, articles: List[Dict]) -> str:
+    """LinkedIn company page RSS feed"""
+    items = ''.join(f"""<item><title>{escape(article['title'])}</title>
+<link>https://www.linkedin.com/company/{company_slug}/posts/{i}</link>
+<pubDate>{format_datetime(article['published'])} GMT</pubDate>
+<description>{escape(article['description'])}</description></item>
+""" for i, article in enumerate(articles))
+    return f"""<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0"><channel><title>{company_slug} | LinkedIn</title>
+<link>https://www.linkedin.com/company/{company_slug}/</link>
+{items}</channel></rss>
+"""
+
+def synthetic_mentions(companies: List[Dict], per_company: int = 50, seed: int = 0) -> List[Dict]:
+    """Mention dicts in the shape the monitors hand to MentionDatabase.add_mention"""
+    mentions = []
+    for company in companies:
+        for article in synthetic_articles(company['name'], per_company, seed=seed):
+            mentions.append({
+                'company_name': company['name'],
+                'title': f"{article['title']} - {article['publisher']}",
+                'content': article['description'],
+                'url': article['url'],
+                'source': f"Google News - {article['publisher_url']}",
+                'published_date': article['published'].strftime('%Y-%m-%d %H:%M:%S'),
+                'sentiment_score': 0.0,
+            })
+    return mentions
@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Import-time benchmark for the portfolio monitor entry points
+Imports each entry point in a fresh interpreter under `python -X importtime`
+and checks it against a time budget and a list of modules it must not load
+
+Usage:
+    python benchmarks/import_time.py
+    python benchmarks/import_time.py app_vercel --runs 10 --budget-scale 2
+"""
+
+import argparse
+import os
+import re
+import statistics
+import subprocess
+import sys
+from typing import Dict, List, Optional, Tuple
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+REPO_DIR = os.path.dirname(BENCHMARKS_DIR)
+
+# Loaded on first use by the monitors; an entry point that pulls one in at
+# import time has regressed regardless of how fast this machine is
+HEAVY_MODULES = ('textblob', 'nltk', 'bs4', 'feedparser', 'lxml')
+
+# Entry point -> import-time budget in ms (median of the runs)
+BUDGETS_MS = {
+    'main_complete': 200,
+    'monitor': 200,
+    'app_vercel': 250,
+    'app': 300,
+    'scheduler': 200,
+    'news_monitor_complete': 200,
+    'linkedin_monitor_free': 200,
+}
+
+_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)$')
+
+def measure(module: str) -> Tuple[float, Dict[str, Tuple[int, int]]]:
+    """
+    Import a module in a fresh interpreter
+    Returns its cumulative import time in ms and {module: (self_us, cumulative_us)}
+    for everything it loaded
+    """
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', f"import {module}"],
+        cwd=REPO_DIR, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import {module} failed:\n{result.stderr[-2000:]}")
+
+    loaded = {}
+    for line in result.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            loaded[match.group(4)] = (int(match.group(1)), int(match.group(2)))
+    if module not in loaded:
+        raise RuntimeError(f"no importtime entry for {module}")
+    return loaded[module][1] / 1000, loaded
+
+def run_entry_point(module: str, runs: int) -> Dict:
+    """Median import time over several runs, after one run to warm the bytecode cache"""
+    measure(module)
+    timings = []
+    loaded: Dict[str, Tuple[int, int]] = {}
+    for _ in range(runs):
+        elapsed, loaded = measure(module)
+        timings.append(elapsed)
+
+    heavy = sorted({name.split('.')[0] for name in loaded} & set(HEAVY_MODULES))
+    slowest = sorted(loaded.items(), key=lambda item: item[1][0], reverse=True)[:5]
+    return {
+        'module': module,
+        'median_ms': statistics.median(timings),
+        'min_ms': min(timings),
+        'timings_ms': timings,
+        'heavy_modules': heavy,
+        'slowest_self_ms': [(name, self_us / 1000) for name, (self_us, _) in slowest],
+    }
+
+def check_budget(result: Dict, budget_scale: float = 1.0) -> List[str]:
+    """Budget violations for one entry point (empty when it is within budget)"""
+    problems = []
+    budget = BUDGETS_MS.get(result['module'])
+    if budget is not None and result['median_ms'] > budget * budget_scale:
+        problems.append(f"{result['module']}: {result['median_ms']:.1f}ms over its {budget * budget_scale:.0f}ms budget")
+    if result['heavy_modules']:
+        problems.append(f"{result['module']}: imports {', '.join(result['heavy_modules'])} at load time")
+    return problems
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(description='Import-time benchmark for the portfolio monitor')
+    parser.add_argument('modules', nargs='*', help=f"Entry points to measure (default: {', '.join(BUDGETS_MS)})")
+    parser.add_argument('--runs', type=int, default=5, help='Fresh-interpreter imports per entry point')
+    parser.add_argument('--budget-scale', type=float, default=1.0,
+                        help='Multiply every budget, e.g. 2 on a slow CI runner')
+    args = parser.parse_args(argv)
+
+    problems = []
+    header = f"{'entry point':<24} {'median ms':>10} {'min ms':>9} {'budget ms':>10}  slowest own import"
+    print(header)
+    print('-' * len(header))
+    for module in args.modules or list(BUDGETS_MS):
+        result = run_entry_point(module, args.runs)
+        budget = BUDGETS_MS.get(module)
+        name, self_ms = result['slowest_self_ms'][0]
+        print(f"{module:<24} {result['median_ms']:>10.1f} {result['min_ms']:>9.1f} "
+              f"{(f'{budget * args.budget_scale:.0f}' if budget else '-'):>10}  {name} ({self_ms:.1f}ms)")
+        problems.extend(check_budget(result, args.budget_scale))
+
+    if problems:
+        print('\nImport-time budget exceeded:')
+        for problem in problems:
+            print(f"  {problem}")
+        return 1
+    return 0
+
+if __name__ == "__main__":
+    sys.exit(main())
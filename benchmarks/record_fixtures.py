@@ -0,0 +1,68 @@
+"""
+Record live source responses into benchmarks/fixtures
+The replay server serves a recorded response whenever a request's query has
+one, so the benchmark corpus can be refreshed from real feeds
+"""
+
+import argparse
+import os
+import sys
+import time
+from urllib.parse import quote_plus
+
+import requests
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from corpus import FIXTURES_DIR, FIXTURE_KINDS, slugify
+
+USER_AGENT = 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+
+def save(kind: str, query: str, body: str):
+    directory = os.path.join(FIXTURES_DIR, kind)
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, slugify(query) + FIXTURE_KINDS[kind])
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write(body)
+    print(f"Saved {path} ({len(body) / 1024:.0f} KB)")
+
+def record_company(session: requests.Session, company: dict, news_api_key: str):
+    for keyword in company['keywords'][:2]:
+        response = session.get(
+            f"https://news.google.com/rss/search?q={quote_plus(keyword)}&hl=en-US&gl=US&ceid=US:en", timeout=30)
+        if response.ok:
+            save('google_news_rss', keyword, response.text)
+
+        if news_api_key:
+            response = session.get('https://newsapi.org/v2/everything', params={
+                'q': keyword, 'sortBy': 'publishedAt', 'language': 'en', 'pageSize': 100, 'apiKey': news_api_key
+            }, timeout=30)
+            if response.ok:
+                save('newsapi', keyword, response.text)
+
+        query = f'site:linkedin.com "{keyword}"'
+        response = session.get(f"https://www.google.com/search?q={quote_plus(query)}&num=10&tbm=nws", timeout=30)
+        if response.ok:
+            save('google_serp', query, response.text)
+
+        time.sleep(2)
+
+def main():
+    from config_complete import PORTFOLIO_COMPANIES
+
+    parser = argparse.ArgumentParser(description='Record live responses as benchmark fixtures')
+    parser.add_argument('companies', nargs='*', help='Company names to record (default: first 5)')
+    args = parser.parse_args()
+
+    companies = [c for c in PORTFOLIO_COMPANIES if not args.companies or c['name'] in args.companies]
+    if not args.companies:
+        companies = companies[:5]
+
+    session = requests.Session()
+    session.headers.update({'User-Agent': USER_AGENT})
+    for company in companies:
+        print(f"Recording {company['name']}")
+        record_company(session, company, os.getenv('NEWS_API_KEY', ''))
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,262 @@
+"""
+Local HTTP replay server for the portfolio monitor benchmarks
+Answers Google News RSS, NewsAPI, Google search and LinkedIn RSS requests from
+the benchmark corpus with configurable latency and injected errors
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Dict, Optional, Tuple
+from urllib.parse import parse_qs, urlsplit
+
+from corpus import (
+    load_recorded, or_articles, synthetic_articles, render_google_news_rss, render_newsapi_json,
+    render_google_serp_html, render_linkedin_rss
+)
+
+# Hosts in recorded fixtures that are rewritten to the replay server so a
+# benchmark never leaves the machine
+RECORDED_HOSTS = ('https://news.google.com', 'https://www.google.com', 'https://newsapi.org')
+
+class ReplayServer:
+    def __init__(self, host: str = '127.0.0.1', port: int = 0,
+                 latency_ms: float = 0, jitter_ms: float = 0,
+                 error_rate: float = 0, error_status: int = 503,
+                 articles_per_feed: int = 20, serp_noise_kb: int = 150,
+                 linkedin_rss: bool = False, recorded: bool = True, seed: int = 0):
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.articles_per_feed = articles_per_feed
+        self.serp_noise_kb = serp_noise_kb
+        self.linkedin_rss = linkedin_rss
+        # Serve recorded fixtures where they exist; off, every response is synthetic
+        self.recorded = recorded
+        self.seed = seed
+        self.requests_served: Dict[str, int] = {}
+        # TCP connections accepted; fewer than requests_served means keep-alive reuse
+        self.connections = 0
+        self.errors_injected = 0
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        # Latency is simulated with an Event wait so benchmarks that patch out
+        # time.sleep in the monitors do not also remove the server's latency
+        self._never = threading.Event()
+        self._cache: Dict[Tuple[str, str], bytes] = {}
+        self._httpd = ThreadingHTTPServer((host, port), self._handler_class())
+        self._httpd.daemon_threads = True
+        self._thread: Optional[threading.Thread] = None
+
+    @property
+    def url(self) -> str:
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def endpoints(self) -> Dict[str, str]:
+        """Environment overrides pointing the monitors at this server"""
+        return {
+            'NEWSAPI_URL': f"{self.url}/v2/everything",
+            'GOOGLE_NEWS_RSS_URL': f"{self.url}/rss/search",
+            'GOOGLE_SEARCH_URL': f"{self.url}/search",
+            'LINKEDIN_BASE_URL': self.url,
+        }
+
+    def start(self) -> 'ReplayServer':
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def use_recorded(self, recorded: bool):
+        """Switch recorded fixtures on or off, dropping responses rendered so far"""
+        with self._lock:
+            self.recorded = recorded
+            self._cache.clear()
+
+    def _delay(self):
+        with self._lock:
+            delay = self.latency_ms + (self._rng.uniform(-self.jitter_ms, self.jitter_ms) if self.jitter_ms else 0)
+        if delay > 0:
+            self._never.wait(delay / 1000)
+
+    def _should_fail(self) -> bool:
+        with self._lock:
+            fail = self.error_rate > 0 and self._rng.random() < self.error_rate
+            if fail:
+                self.errors_injected += 1
+        return fail
+
+    def _connected(self):
+        with self._lock:
+            self.connections += 1
+
+    def _count(self, route: str):
+        with self._lock:
+            self.requests_served[route] = self.requests_served.get(route, 0) + 1
+
+    def _body(self, route: str, query: str, page_size: int = 100) -> Optional[Tuple[bytes, str]]:
+        """Response body and content type for a route, cached per query"""
+        key = (route, query, page_size)
+        if key not in self._cache:
+            body = self._render(route, query, page_size)
+            if body is None:
+                return None
+            for host in RECORDED_HOSTS:
+                body = body.replace(host, self.url)
+            self._cache[key] = body.encode('utf-8')
+
+        content_type = {
+            'rss': 'application/rss+xml; charset=utf-8',
+            'newsapi': 'application/json; charset=utf-8',
+            'serp': 'text/html; charset=utf-8',
+            'linkedin': 'application/rss+xml; charset=utf-8',
+        }[route]
+        return self._cache[key], content_type
+
+    def _render(self, route: str, query: str, page_size: int = 100) -> Optional[str]:
+        # NewsAPI returns at most pageSize articles; Google News RSS has a fixed page
+        limit = page_size if route == 'newsapi' else 100
+        # OR queries merge their operands' synthetic articles (recorded fixtures are
+        # single-keyword only), so batched and per-keyword searches see the same corpus
+        if route in ('rss', 'newsapi') and ' OR ' in query:
+            articles = or_articles(query, self.articles_per_feed, self.seed)
+            if route == 'rss':
+                return render_google_news_rss(query, articles[:limit])
+            return render_newsapi_json(query, articles[:limit], len(articles))
+        if route == 'rss':
+            recorded = self.recorded and load_recorded('google_news_rss', query)
+            return recorded or render_google_news_rss(
+                query, synthetic_articles(query, self.articles_per_feed, self.seed))
+        if route == 'newsapi':
+            recorded = self.recorded and load_recorded('newsapi', query)
+            if recorded:
+                data = json.loads(recorded)
+                data['articles'] = data['articles'][:limit]
+                return json.dumps(data)
+            articles = synthetic_articles(query, self.articles_per_feed, self.seed)
+            return render_newsapi_json(query, articles[:limit], len(articles))
+        if route == 'serp':
+            recorded = self.recorded and load_recorded('google_serp', query)
+            return recorded or render_google_serp_html(
+                query, synthetic_articles(query, 10, self.seed), self.serp_noise_kb)
+        if route == 'linkedin':
+            if not self.linkedin_rss:
+                return None
+            return render_linkedin_rss(query, synthetic_articles(query, 5, self.seed))
+        return None
+
+    def _handler_class(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Headers and body go out in separate writes; without TCP_NODELAY the
+            # client's delayed ACK adds ~40ms to every keep-alive response
+            disable_nagle_algorithm = True
+
+            def log_message(self, format, *args):
+                pass
+
+            def setup(self):
+                server._connected()
+                super().setup()
+
+            def do_HEAD(self):
+                self.do_GET(head=True)
+
+            def do_GET(self, head: bool = False):
+                parts = urlsplit(self.path)
+                params = parse_qs(parts.query)
+                query = params.get('q', [''])[0]
+                try:
+                    page_size = int(params.get('pageSize', ['100'])[0])
+                except ValueError:
+                    page_size = 100
+
+                if parts.path == '/rss/search':
+                    route = 'rss'
+                elif parts.path == '/v2/everything':
+                    route = 'newsapi'
+                elif parts.path == '/search':
+                    route = 'serp'
+                elif parts.path.startswith('/company/') and parts.path.endswith('/rss/'):
+                    route = 'linkedin'
+                    query = parts.path.split('/')[2]
+                else:
+                    self._send(404, b'not found', 'text/plain', head)
+                    return
+
+                server._count(route)
+                server._delay()
+
+                if server._should_fail():
+                    headers = {'Retry-After': '1'} if server.error_status == 429 else {}
+                    self._send(server.error_status, b'injected error', 'text/plain', head, headers)
+                    return
+
+                body = server._body(route, query, page_size)
+                if body is None:
+                    self._send(404, b'not found', 'text/plain', head)
+                else:
+                    self._send(200, body[0], body[1], head)
+
+            def _send(self, status: int, body: bytes, content_type: str, head: bool,
+                      headers: Optional[Dict[str, str]] = None):
+                self.send_response(status)
+                self.send_header('Content-Type', content_type)
+                self.send_header('Content-Length', str(len(body)))
+                for name, value in (headers or {}).items():
+                    self.send_header(name, value)
+                self.end_headers()
+                if not head:
+                    self.wfile.write(body)
+
+        return Handler
+
+def main():
+    parser = argparse.ArgumentParser(description='Replay server for portfolio monitor benchmarks')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8765)
+    parser.add_argument('--latency-ms', type=float, default=0, help='Added latency per request')
+    parser.add_argument('--jitter-ms', type=float, default=0, help='Uniform +/- jitter on the latency')
+    parser.add_argument('--error-rate', type=float, default=0, help='Fraction of requests answered with an error')
+    parser.add_argument('--error-status', type=int, default=503, help='Status code for injected errors')
+    parser.add_argument('--articles', type=int, default=20, help='Synthetic articles per feed')
+    parser.add_argument('--serp-noise-kb', type=int, default=150, help='Filler markup per results page')
+    parser.add_argument('--linkedin-rss', action='store_true', help='Serve LinkedIn company RSS feeds instead of 404')
+    args = parser.parse_args()
+
+    server = ReplayServer(
+        args.host, args.port, latency_ms=args.latency_ms, jitter_ms=args.jitter_ms,
+        error_rate=args.error_rate, error_status=args.error_status,
+        articles_per_feed=args.articles, serp_noise_kb=args.serp_noise_kb,
+        linkedin_rss=args.linkedin_rss
+    )
+    print(f"Replay server listening on {server.url}")
+    print("Point the monitors at it with:")
+    for name, value in server.endpoints().items():
+        print(f"  export {name}={value}")
+
+    server.start()
+    try:
+        while True:
+            time.sleep(3600)
+    except KeyboardInterrupt:
+        server.stop()
+
+if __name__ == "__main__":
+    main()
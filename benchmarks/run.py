@@ -0,0 +1,609 @@
+#!/usr/bin/env python3
+"""
+Offline benchmarks for the ScaleX Ventures portfolio monitor
+Runs the monitors against the local replay server and times relevance
+filtering, sentiment, ingest and stats queries
+
+Usage:
+    python benchmarks/run.py
+    python benchmarks/run.py cycle ingest --latency-ms 80 --cycles 5
+    python benchmarks/run.py --json results.json --compare baseline.json
+"""
+
+import argparse
+import asyncio
+import contextlib
+import json
+import logging
+import os
+import shutil
+import sqlite3
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+from typing import Callable, Dict, Iterable, List, Optional
+from unittest import mock
+
+BENCHMARKS_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCHMARKS_DIR))
+
+from corpus import (
+    FIXTURES_DIR, render_google_news_rss, render_google_serp_html, synthetic_articles, synthetic_mentions
+)
+from import_time import BUDGETS_MS, check_budget, run_entry_point
+from replay_server import ReplayServer
+
+MONITORS = {
+    'news': ('news_monitor', 'NewsMonitor'),
+    'complete': ('news_monitor_complete', 'CompleteNewsMonitor'),
+    'minimal': ('news_monitor_minimal', 'MinimalNewsMonitor'),
+    'linkedin-free': ('linkedin_monitor_free', 'FreeLinkedInMonitor'),
+}
+
+def percentile(values: List[float], pct: float) -> float:
+    """Nearest-rank percentile"""
+    if not values:
+        return 0.0
+    ordered = sorted(values)
+    index = max(0, min(len(ordered) - 1, int(round(pct / 100 * len(ordered) + 0.5)) - 1))
+    return ordered[index]
+
+def summarize(name: str, timings: List[float], units: int = 0, unit_name: str = 'ops',
+              extra: Optional[Dict] = None) -> Dict:
+    """Throughput and latency percentiles for a list of per-op timings in seconds"""
+    total = sum(timings)
+    units = units or len(timings)
+    result = {
+        'scenario': name,
+        'ops': len(timings),
+        'total_s': total,
+        'throughput': units / total if total else 0.0,
+        'unit': unit_name,
+        'p50_ms': percentile(timings, 50) * 1000,
+        'p99_ms': percentile(timings, 99) * 1000,
+    }
+    result.update(extra or {})
+    return result
+
+def time_each(fn: Callable, items: Iterable) -> List[float]:
+    timings = []
+    for item in items:
+        start = time.perf_counter()
+        fn(item)
+        timings.append(time.perf_counter() - start)
+    return timings
+
+def load_monitor(kind: str):
+    module_name, class_name = MONITORS[kind]
+    module = __import__(module_name)
+    return module, getattr(module, class_name)
+
+async def _no_wait(self, interval: Optional[float] = None):
+    pass
+
+def without_politeness(args) -> contextlib.ExitStack:
+    """Patch out the monitors' politeness sleeps and async host pacing unless --keep-sleeps"""
+    stack = contextlib.ExitStack()
+    if not args.keep_sleeps:
+        stack.enter_context(mock.patch('time.sleep'))
+        stack.enter_context(mock.patch('async_http.AsyncRateLimiter.wait', _no_wait))
+    return stack
+
+class Workspace:
+    """Temporary directory holding throwaway benchmark databases"""
+
+    def __init__(self):
+        self.path = tempfile.mkdtemp(prefix='portfolio-bench-')
+        self._count = 0
+
+    def database(self):
+        from database import MentionDatabase
+        self._count += 1
+        return MentionDatabase(os.path.join(self.path, f"bench_{self._count}.db"))
+
+    def cleanup(self):
+        shutil.rmtree(self.path, ignore_errors=True)
+
+def scenario_cycle(args, server: ReplayServer, workspace: Workspace) -> List[Dict]:
+    """Full monitor_all_companies cycles: the first on an empty database, the rest warm"""
+    module, monitor_class = load_monitor(args.monitor)
+    companies = module.PORTFOLIO_COMPANIES
+    db = workspace.database()
+    monitor = monitor_class(db)
+
+    def served():
+        return sum(server.requests_served.values()), server.connections
+
+    cold, warm = [], []
+    found = 0
+    before = served()
+    for cycle in range(args.cycles):
+        if args.fresh_monitor and cycle:
+            monitor = monitor_class(db)
+        # Politeness sleeps would dominate the timing; the server supplies latency
+        with without_politeness(args):
+            start = time.perf_counter()
+            mentions = monitor.monitor_all_companies()
+            elapsed = time.perf_counter() - start
+        (cold if cycle == 0 else warm).append(elapsed)
+        found += len(mentions)
+        if cycle == 0:
+            after_cold = served()
+
+    after = served()
+    results = [summarize(
+        f"cycle[{args.monitor}] cold", cold, units=len(companies), unit_name='companies',
+        extra={'requests': after_cold[0] - before[0], 'connections': after_cold[1] - before[1],
+               'new_mentions': found}
+    )]
+    if warm:
+        results.append(summarize(f"cycle[{args.monitor}] warm", warm, units=len(companies) * len(warm),
+                                 unit_name='companies',
+                                 extra={'requests': after[0] - after_cold[0], 'connections': after[1] - after_cold[1]}))
+    return results
+
+def _articles_for(companies: List[Dict], size: int) -> List[tuple]:
+    per_company = max(1, size // len(companies))
+    return [
+        (company, {'title': article['title'], 'description': article['description'], 'content': article['description']})
+        for company in companies
+        for article in synthetic_articles(company['keywords'][0], per_company, seed=1)
+    ]
+
+def scenario_relevance(args, server: ReplayServer, workspace: Workspace) -> List[Dict]:
+    """_is_relevant_mention over synthetic articles"""
+    module, monitor_class = load_monitor(args.monitor)
+    monitor = monitor_class(workspace.database())
+    items = _articles_for(module.PORTFOLIO_COMPANIES, args.size)
+    matched = sum(1 for company, article in items if monitor._is_relevant_mention(article, company))
+    timings = time_each(lambda item: monitor._is_relevant_mention(item[1], item[0]), items)
+    return [summarize('relevance', timings, unit_name='articles', extra={'relevant': matched})]
+
+def scenario_sentiment(args, server: ReplayServer, workspace: Workspace) -> List[Dict]:
+    """TextBlob sentiment over article title plus summary"""
+    module, monitor_class = load_monitor(args.monitor)
+    monitor = monitor_class(workspace.database())
+    texts = [f"{a['title']} {a['description']}" for _, a in _articles_for(module.PORTFOLIO_COMPANIES, args.size)]
+    monitor.analyze_sentiment(texts[0])  # first call loads the corpus
+    timings = time_each(monitor.analyze_sentiment, texts)
+    return [summarize('sentiment', timings, unit_name='texts')]
+
+def _rss_corpus(companies: List[Dict], size: int) -> List[bytes]:
+    """Recorded Google News feeds plus a full-page synthetic feed per company keyword"""
+    feeds = []
+    recorded_dir = os.path.join(FIXTURES_DIR, 'google_news_rss')
+    for name in sorted(os.listdir(recorded_dir)) if os.path.isdir(recorded_dir) else []:
+        with open(os.path.join(recorded_dir, name), 'rb') as f:
+            feeds.append(f.read())
+    for company in companies:
+        for keyword in company['keywords'][:2]:
+            feeds.append(render_google_news_rss(keyword, synthetic_articles(keyword, size)).encode('utf-8'))
+    return feeds
+
+def scenario_rss(args, server: ReplayServer, workspace: Workspace) -> List[Dict]:
+    """Google News feed parsing: the lxml streaming parser against feedparser"""
+    from rss_parser import _fast_parse, parse_feed
+    module, _ = load_monitor(args.monitor)
+    feeds = _rss_corpus(module.PORTFOLIO_COMPANIES, min(args.size, 100))
+    entries = sum(len(parse_feed(feed)) for feed in feeds)
+
+    mismatched = sum(1 for feed in feeds if _fast_parse(feed) != parse_feed(feed))
+    if mismatched:
+        raise RuntimeError(f"fast RSS parser disagrees with feedparser on {mismatched} feed(s)")
+
+    results = []
+    for name, parse in (('feedparser', parse_feed), ('lxml iterparse', _fast_parse)):
+        timings = time_each(parse, feeds)
+        results.append(summarize(f"rss {name}", timings, units=entries, unit_name='entries'))
+    return results
+
+def _serp_full_tree(content: bytes, max_results: Optional[int]) -> List[Dict]:
+    """The LinkedIn monitors' original parse: a whole-page BeautifulSoup tree"""
+    from bs4 import BeautifulSoup
+    soup = BeautifulSoup(content, 'html.parser')
+    results = []
+    for container in soup.find_all('div', class_='g')[:max_results]:
+        results.append({'title': container.find('h3'), 'url': container.find('a')})
+    return results
+
+def _serp_parsers() -> Dict[str, Callable]:
+    from serp_parser import _soup_results, _stream_results
+    return {
+        'bs4 full tree': _serp_full_tree,
+        'bs4 SoupStrainer': _soup_results,
+        'lxml streaming': _stream_results,
+    }
+
+# Run in a fresh interpreter: peak RSS growth while parsing one page, so memory
+# allocated inside libxml2 counts as well as Python objects. VmHWM rather than
+# ru_maxrss, which Linux carries over from the parent process across exec
+_PEAK_MEMORY_CHECK = """
+import sys
+from run import _serp_parsers
+
+def peak_kb():
+    with open('/proc/self/status') as f:
+        return next(int(line.split()[1]) for line in f if line.startswith('VmHWM:'))
+
+parse = _serp_parsers()[sys.argv[1]]
+content = open(sys.argv[2], 'rb').read()
+parse(content[:2048], 1)
+before = peak_kb()
+parse(content, int(sys.argv[3]))
+print(peak_kb() - before)
+"""
+
+def scenario_serp(args, server: ReplayServer, workspace: Workspace) -> List[Dict]:
+    """Google results page parsing for the LinkedIn monitors: time and peak memory per page"""
+    module, _ = load_monitor(args.monitor)
+    pages = [render_google_serp_html(keyword, synthetic_articles(keyword, 10), server.serp_noise_kb).encode('utf-8')
+             for company in module.PORTFOLIO_COMPANIES for keyword in company['keywords'][:2]]
+    # LinkedInGoogleSource reads the first 5 results of a page
+    max_results = 5
+    page_path = os.path.join(workspace.path, 'serp.html')
+    with open(page_path, 'wb') as f:
+        f.write(max(pages, key=len))
+
+    results = []
+    for name, parse in _serp_parsers().items():
+        timings = time_each(lambda page: parse(page, max_results), pages)
+        check = subprocess.run([sys.executable, '-c', _PEAK_MEMORY_CHECK, name, page_path, str(max_results)],
+                               cwd=BENCHMARKS_DIR, capture_output=True, text=True)
+        peak_kb = int(check.stdout.strip()) if check.returncode == 0 else None
+        results.append(summarize(f"serp {name}", timings, unit_name='pages',
+                                 extra={'peak_rss_kb': peak_kb, 'page_kb': len(pages[0]) // 1024}))
+    return results
+
+def scenario_ingest(args, server: ReplayServer, workspace: Workspace) -> List[Dict]:
+    """MentionDatabase.add_mention for new mentions, then again for duplicates"""
+    module, _ = load_monitor(args.monitor)
+    companies = module.PORTFOLIO_COMPANIES
+    mentions = synthetic_mentions(companies, max(1, args.size // len(companies)), seed=2)
+    db = workspace.database()
+
+    new_timings = time_each(lambda m: db.add_mention(dict(m)), mentions)
+    duplicate_timings = time_each(lambda m: db.add_mention(dict(m)), mentions)
+
+    # The same mentions queued with the writer thread, which commits them in groups
+    writer = workspace.database().get_writer()
+    start = time.perf_counter()
+    ids = [future.result() for future in [writer.add_mention(dict(m)) for m in mentions]]
+    grouped = time.perf_counter() - start
+    return [
+        summarize('ingest new', new_timings, unit_name='mentions'),
+        summarize('ingest duplicate', duplicate_timings, unit_name='mentions'),
+        summarize('ingest new (group commit)', [grouped], units=len(mentions), unit_name='mentions',
+                  extra={'stored': sum(1 for mention_id in ids if mention_id)}),
+    ]
+
+def _populate(db, companies: List[Dict], size: int):
+    """Bulk-load mentions spread over the last week so stats queries have data"""
+    mentions = synthetic_mentions(companies, max(1, size // len(companies)), seed=3)
+    with sqlite3.connect(db.db_path) as conn:
+        conn.executemany("""
+            INSERT OR IGNORE INTO mentions (
+                company_name, title, content, url, source, published_date,
+                sentiment_score, hash, created_at
+            ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, datetime('now', ?))
+        """, [(
+            m['company_name'], m['title'], m['content'], m['url'], m['source'], m['published_date'],
+            m['sentiment_score'], db.generate_hash(m['title'], m['url'], m['company_name']),
+            f"-{i % (7 * 24 * 60)} minutes"
+        ) for i, m in enumerate(mentions)])
+        conn.commit()
+    return len(mentions)
+
+def scenario_stats(args, server: ReplayServer, workspace: Workspace) -> List[Dict]:
+    """Dashboard queries against a populated database"""
+    module, _ = load_monitor(args.monitor)
+    companies = module.PORTFOLIO_COMPANIES
+    db = workspace.database()
+    rows = _populate(db, companies, args.stats_rows)
+
+    repeats = range(args.repeat)
+    return [
+        summarize('stats get_statistics', time_each(lambda _: db.get_statistics(), repeats),
+                  unit_name='queries', extra={'rows': rows}),
+        summarize('stats get_recent_mentions', time_each(lambda _: db.get_recent_mentions(24), repeats),
+                  unit_name='queries'),
+        summarize('stats get_mentions_by_company',
+                  time_each(lambda c: db.get_mentions_by_company(c['name']), companies * args.repeat),
+                  unit_name='queries'),
+    ]
+
+def _cycle_mentions(args, server: ReplayServer, workspace: Workspace, batch_queries: bool):
+    """One cold cycle; returns its time, request count and the (company, url) pairs it found"""
+    _, monitor_class = load_monitor(args.monitor)
+    monitor = monitor_class(workspace.database())
+    monitor.engine.batch_queries = batch_queries
+    monitor.engine.incremental = False
+
+    requests_before = sum(server.requests_served.values())
+    with without_politeness(args):
+        start = time.perf_counter()
+        mentions = monitor.monitor_all_companies()
+        elapsed = time.perf_counter() - start
+    found = {(mention['company_name'], mention['url']) for mention in mentions}
+    return elapsed, sum(server.requests_served.values()) - requests_before, found
+
+class _ThreadPeak:
+    """Samples the monitor's live threads in the background and keeps the highest count"""
+
+    def __init__(self):
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._sample, daemon=True)
+        self.peak = self._count()
+
+    def _count(self) -> int:
+        # The replay server's handler threads and the sampler itself live in this process too
+        return sum(1 for thread in threading.enumerate()
+                   if thread is not self._thread and 'process_request_thread' not in thread.name)
+
+    def _sample(self):
+        while not self._stop.wait(0.002):
+            self.peak = max(self.peak, self._count())
+
+    def __enter__(self):
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+def _watchlist(size: int) -> List[Dict]:
+    """Synthetic companies, served from the synthetic corpus"""
+    return [{
+        'name': f"Watchlist{i:03d}",
+        'keywords': [f"Watchlist{i:03d}", f"Watchlist{i:03d} platform"],
+        'description': f"Watchlist{i:03d} platform",
+    } for i in range(size)]
+
+def scenario_scale(args, server: ReplayServer, workspace: Workspace) -> List[Dict]:
+    """
+    One cold cycle over a synthetic watchlist of --scale-companies companies,
+    on the thread pool and then as asyncio tasks with up to --scale-in-flight
+    requests at once (the replay server stands in for every host)
+    """
+    from async_http import AsyncHTTPClient
+
+    _, monitor_class = load_monitor(args.monitor)
+    companies = _watchlist(args.scale_companies)
+
+    results = []
+    for mode in ('threads', 'async'):
+        monitor = monitor_class(workspace.database())
+        engine = monitor.engine
+        requests_before = sum(server.requests_served.values())
+        with without_politeness(args), _ThreadPeak() as threads:
+            start = time.perf_counter()
+            if mode == 'threads':
+                mentions = engine.run(companies)
+            else:
+                client = AsyncHTTPClient(max_in_flight=args.scale_in_flight, per_host=args.scale_in_flight)
+                mentions = asyncio.run(engine.arun(companies, client))
+            elapsed = time.perf_counter() - start
+        results.append(summarize(
+            f"scale[{args.monitor}] {mode}", [elapsed], units=len(companies), unit_name='companies',
+            extra={'requests': sum(server.requests_served.values()) - requests_before,
+                   'new_mentions': len(mentions), 'peak_threads': threads.peak}
+        ))
+        print(f"  {mode}: {len(mentions)} mentions, peak {threads.peak} threads")
+    return results
+
+def _worker_without_politeness():
+    """Shard worker initializer: without_politeness() for the worker's whole life"""
+    without_politeness(argparse.Namespace(keep_sleeps=False)).__enter__()
+
+def scenario_shards(args, server: ReplayServer, workspace: Workspace) -> List[Dict]:
+    """
+    One cold cycle over the --scale-companies watchlist split across each of
+    --shard-counts worker processes, with speedup over a single worker (process
+    start-up included; the replay server stands in for every host)
+    """
+    from sharding import run_sharded
+
+    _, monitor_class = load_monitor(args.monitor)
+    companies = _watchlist(args.scale_companies)
+    initializer = None if args.keep_sleeps else _worker_without_politeness
+
+    results = []
+    single = None
+    for shards in args.shard_counts:
+        db = workspace.database()
+        requests_before = sum(server.requests_served.values())
+        start = time.perf_counter()
+        mentions, = run_sharded([monitor_class], companies, db, shards, initializer=initializer)
+        elapsed = time.perf_counter() - start
+        single = single or elapsed
+        results.append(summarize(
+            f"shards[{args.monitor}] {shards}", [elapsed], units=len(companies), unit_name='companies',
+            extra={'requests': sum(server.requests_served.values()) - requests_before,
+                   'new_mentions': len(mentions), 'speedup': single / elapsed, 'cpus': os.cpu_count()}
+        ))
+        print(f"  {shards} shards: {len(mentions)} mentions, {single / elapsed:.2f}x one shard")
+    return results
+
+def scenario_backfill(args, server: ReplayServer, workspace: Workspace) -> List[Dict]:
+    """
+    --backfill-days of history for --backfill-companies watchlist companies,
+    one window at a time (as a hand-run loop would) and then with every window
+    in flight, followed by a resumed run over the checkpoints
+    """
+    from datetime import date, timedelta
+
+    from async_http import AsyncHTTPClient
+    from backfill import Backfill
+
+    _, monitor_class = load_monitor(args.monitor)
+    companies = _watchlist(args.backfill_companies)
+    end = date.today() + timedelta(days=1)
+    start = end - timedelta(days=args.backfill_days)
+
+    results = []
+    db = None
+    for run, in_flight in (('one window at a time', 1), ('parallel windows', args.scale_in_flight), ('resumed', 1)):
+        if run != 'resumed':
+            db = workspace.database()
+        backfill = Backfill(monitor_class(db).engine)
+        requests_before = sum(server.requests_served.values())
+        with without_politeness(args):
+            start_time = time.perf_counter()
+            summary = backfill.run(companies, start, end, AsyncHTTPClient(max_in_flight=in_flight))
+            elapsed = time.perf_counter() - start_time
+        windows = sum(counts['windows'] for counts in summary.values())
+        resumed = sum(counts['resumed'] for counts in summary.values())
+        new_mentions = sum(counts['new_mentions'] for counts in summary.values())
+        results.append(summarize(
+            f"backfill[{args.monitor}] {run}", [elapsed], units=windows + resumed, unit_name='windows',
+            extra={'requests': sum(server.requests_served.values()) - requests_before, 'new_mentions': new_mentions,
+                   'resumed': resumed}
+        ))
+        print(f"  {run}: {windows} windows, {new_mentions} new mentions")
+    return results
+
+def scenario_recall(args, server: ReplayServer, workspace: Workspace) -> List[Dict]:
+    """
+    Batched OR queries against the per-keyword baseline: request count, and the
+    share of the baseline's (company, url) mentions the batched cycle still finds
+    """
+    # Recorded fixtures only cover single keywords, so compare on the synthetic corpus
+    server.use_recorded(False)
+    try:
+        base_time, base_requests, base = _cycle_mentions(args, server, workspace, batch_queries=False)
+        batch_time, batch_requests, batched = _cycle_mentions(args, server, workspace, batch_queries=True)
+    finally:
+        server.use_recorded(True)
+
+    recall = len(base & batched) / len(base) if base else 1.0
+    return [
+        summarize(f"recall[{args.monitor}] per-keyword", [base_time], unit_name='cycles',
+                  extra={'requests': base_requests, 'mentions': len(base)}),
+        summarize(f"recall[{args.monitor}] batched", [batch_time], unit_name='cycles',
+                  extra={'requests': batch_requests, 'mentions': len(batched), 'recall': recall,
+                         'extra_mentions': len(batched - base)}),
+    ]
+
+def scenario_imports(args, server: ReplayServer, workspace: Workspace) -> List[Dict]:
+    """Fresh-interpreter import time of each entry point, checked against its budget"""
+    results = []
+    for module in BUDGETS_MS:
+        result = run_entry_point(module, args.import_runs)
+        results.append(summarize(
+            f"import {module}", [ms / 1000 for ms in result['timings_ms']], unit_name='imports',
+            extra={'budget_ms': BUDGETS_MS[module], 'problems': check_budget(result)}
+        ))
+    return results
+
+SCENARIOS = {
+    'cycle': scenario_cycle,
+    'recall': scenario_recall,
+    'scale': scenario_scale,
+    'shards': scenario_shards,
+    'backfill': scenario_backfill,
+    'relevance': scenario_relevance,
+    'sentiment': scenario_sentiment,
+    'rss': scenario_rss,
+    'serp': scenario_serp,
+    'ingest': scenario_ingest,
+    'stats': scenario_stats,
+    'imports': scenario_imports,
+}
+
+def print_results(results: List[Dict], baseline: Optional[Dict[str, Dict]] = None):
+    header = f"{'scenario':<32} {'ops':>7} {'total s':>9} {'throughput':>18} {'p50 ms':>9} {'p99 ms':>9}"
+    if baseline:
+        header += f" {'vs base':>9}"
+    print(header)
+    print('-' * len(header))
+    for r in results:
+        line = (f"{r['scenario']:<32} {r['ops']:>7} {r['total_s']:>9.3f} "
+                f"{r['throughput']:>10.1f} {r['unit'] + '/s':<7} {r['p50_ms']:>9.3f} {r['p99_ms']:>9.3f}")
+        if baseline and r['scenario'] in baseline and baseline[r['scenario']]['throughput']:
+            change = r['throughput'] / baseline[r['scenario']]['throughput'] - 1
+            line += f" {change:>+8.1%}"
+        print(line)
+
+def main():
+    parser = argparse.ArgumentParser(description='Offline benchmarks for the portfolio monitor')
+    parser.add_argument('scenarios', nargs='*', help=f"Scenarios to run: {', '.join(SCENARIOS)} (default: all)")
+    parser.add_argument('--monitor', choices=list(MONITORS), default='news', help='Monitor implementation')
+    parser.add_argument('--cycles', type=int, default=3, help='Monitoring cycles to time')
+    parser.add_argument('--size', type=int, default=600, help='Articles for relevance/sentiment/ingest')
+    parser.add_argument('--scale-companies', type=int, default=200, help='Synthetic watchlist size for scale')
+    parser.add_argument('--shard-counts', type=lambda value: [int(n) for n in value.split(',')], default=[1, 2, 4],
+                        help='Comma-separated worker process counts for shards')
+    parser.add_argument('--backfill-days', type=int, default=365, help='Days of history for backfill')
+    parser.add_argument('--backfill-companies', type=int, default=5, help='Watchlist companies for backfill')
+    parser.add_argument('--scale-in-flight', type=int, default=100, help='Requests in flight at once in async scale runs')
+    parser.add_argument('--stats-rows', type=int, default=20000, help='Mentions loaded for the stats scenario')
+    parser.add_argument('--repeat', type=int, default=20, help='Repetitions of each stats query')
+    parser.add_argument('--import-runs', type=int, default=5, help='Fresh-interpreter imports per entry point')
+    parser.add_argument('--latency-ms', type=float, default=50, help='Replay server latency per request')
+    parser.add_argument('--jitter-ms', type=float, default=10)
+    parser.add_argument('--error-rate', type=float, default=0)
+    parser.add_argument('--error-status', type=int, default=503)
+    parser.add_argument('--articles', type=int, default=20, help='Articles per replayed feed')
+    parser.add_argument('--fresh-monitor', action='store_true',
+                        help='Build a new monitor for every cycle, as app_vercel does per request')
+    parser.add_argument('--keep-sleeps', action='store_true', help='Keep the monitors\' politeness sleeps')
+    parser.add_argument('--json', help='Write results to this file')
+    parser.add_argument('--compare', help='Baseline results file to compare throughput against')
+    parser.add_argument('--verbose', action='store_true', help='Show monitor logging')
+    args = parser.parse_args()
+    unknown = [name for name in args.scenarios if name not in SCENARIOS]
+    if unknown:
+        parser.error(f"unknown scenario(s): {', '.join(unknown)}")
+
+    logging.basicConfig(level=logging.INFO if args.verbose else logging.CRITICAL)
+
+    server = ReplayServer(
+        latency_ms=args.latency_ms, jitter_ms=args.jitter_ms, error_rate=args.error_rate,
+        error_status=args.error_status, articles_per_feed=args.articles
+    ).start()
+
+    # Endpoints and a NewsAPI key must be in place before the config modules are imported
+    os.environ.update(server.endpoints())
+    os.environ.setdefault('NEWS_API_KEY', 'benchmark')
+
+    workspace = Workspace()
+    results = []
+    try:
+        for name in args.scenarios or list(SCENARIOS):
+            results.extend(SCENARIOS[name](args, server, workspace))
+    finally:
+        workspace.cleanup()
+        server.stop()
+
+    baseline = None
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = {r['scenario']: r for r in json.load(f)['results']}
+
+    print_results(results, baseline)
+    for r in results:
+        if 'peak_rss_kb' in r:
+            peak = f"{r['peak_rss_kb']} KiB" if r['peak_rss_kb'] is not None else 'n/a'
+            print(f"{r['scenario']}: peak memory per {r['page_kb']} KiB page {peak}")
+    for r in results:
+        if 'recall' in r:
+            base = next(b for b in results if b['scenario'] == r['scenario'].replace('batched', 'per-keyword'))
+            print(f"\n{r['scenario']}: {r['requests']} requests vs {base['requests']}, "
+                  f"recall {r['recall']:.1%} of {base['mentions']} mentions, {r['extra_mentions']} found only batched")
+    problems = [problem for r in results for problem in r.get('problems', [])]
+    if problems:
+        print('\nImport-time budget exceeded:')
+        for problem in problems:
+            print(f"  {problem}")
+    if server.errors_injected:
+        print(f"\nInjected errors: {server.errors_injected}")
+
+    if args.json:
+        with open(args.json, 'w') as f:
+            json.dump({'args': vars(args), 'results': results}, f, indent=2)
+        print(f"\nResults written to {args.json}")
+
+if __name__ == "__main__":
+    main()
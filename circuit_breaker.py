@@ -0,0 +1,180 @@
+"""
+Circuit breakers for the mention sources
+Each source, and each endpoint (URL without its query string) within it, has a
+breaker tracking the outcomes of its recent requests. Once enough of them fail
+the breaker opens and requests are skipped without touching the network; after
+a cooldown a single probe request is let through, closing the breaker again on
+success and doubling the cooldown on failure. State and a health score survive
+restarts in the source_health table
+"""
+
+import logging
+import threading
+import time
+from collections import deque
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import urlsplit
+
+from config import (
+    CIRCUIT_BREAKER_WINDOW, CIRCUIT_BREAKER_FAILURE_RATE, CIRCUIT_BREAKER_MIN_CALLS,
+    CIRCUIT_BREAKER_COOLDOWN_SECONDS, CIRCUIT_BREAKER_MAX_COOLDOWN_SECONDS
+)
+
+logger = logging.getLogger(__name__)
+
+CLOSED = 'closed'
+OPEN = 'open'
+HALF_OPEN = 'half_open'
+
+# Weight of the previous health score when folding in a new outcome
+HEALTH_DECAY = 0.8
+
+# Endpoint name of a source's own breaker
+SOURCE_ENDPOINT = ''
+
+def endpoint_of(url: str) -> str:
+    """Endpoint a URL belongs to: scheme, host and path"""
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}{parts.path}"
+
+class CircuitBreaker:
+    def __init__(self, window: int = CIRCUIT_BREAKER_WINDOW, failure_rate: float = CIRCUIT_BREAKER_FAILURE_RATE,
+                 min_calls: int = CIRCUIT_BREAKER_MIN_CALLS, cooldown: float = CIRCUIT_BREAKER_COOLDOWN_SECONDS,
+                 max_cooldown: float = CIRCUIT_BREAKER_MAX_COOLDOWN_SECONDS):
+        self.failure_rate = failure_rate
+        self.min_calls = min_calls
+        self.base_cooldown = cooldown
+        self.max_cooldown = max(cooldown, max_cooldown)
+        # Recent outcomes while closed, True for success
+        self.outcomes = deque(maxlen=max(window, min_calls))
+        self.state = CLOSED
+        self.cooldown = cooldown
+        self.open_until = 0.0
+        self.health = 1.0
+        self.probing = False
+
+    def available(self, now: float) -> bool:
+        """Whether a request may go out now (does not claim a half-open probe)"""
+        if self.state == CLOSED:
+            return True
+        if self.state == OPEN and now < self.open_until:
+            return False
+        return not self.probing
+
+    def start(self, now: float):
+        """Claim the probe when the breaker is due one; call only after available()"""
+        if self.state == OPEN and now >= self.open_until:
+            self.state = HALF_OPEN
+        if self.state == HALF_OPEN:
+            self.probing = True
+
+    def record(self, ok: bool, now: float):
+        self.health = HEALTH_DECAY * self.health + (1 - HEALTH_DECAY) * (1.0 if ok else 0.0)
+        if self.state == HALF_OPEN:
+            if not self.probing:
+                return
+            self.probing = False
+            if ok:
+                self.state = CLOSED
+                self.cooldown = self.base_cooldown
+                self.outcomes.clear()
+            else:
+                self._open(now, min(self.cooldown * 2, self.max_cooldown))
+            return
+        if self.state == OPEN:
+            # A request that was already in flight when the breaker opened
+            return
+
+        self.outcomes.append(ok)
+        failures = self.outcomes.count(False)
+        if len(self.outcomes) >= self.min_calls and failures / len(self.outcomes) >= self.failure_rate:
+            self._open(now, self.cooldown)
+
+    def _open(self, now: float, cooldown: float):
+        self.state = OPEN
+        self.cooldown = cooldown
+        self.open_until = now + cooldown
+        self.outcomes.clear()
+
+    def to_row(self) -> Tuple[str, float, str, float, float]:
+        """(state, health, outcomes, cooldown_seconds, open_until) for MentionDatabase.save_source_health"""
+        # An unanswered probe is not persisted; the next process probes again
+        state = OPEN if self.state == HALF_OPEN else self.state
+        return state, self.health, ''.join('1' if ok else '0' for ok in self.outcomes), self.cooldown, self.open_until
+
+    def load_row(self, state: str, health: float, outcomes: str, cooldown: float, open_until: float):
+        self.state = state if state in (CLOSED, OPEN) else OPEN
+        self.health = health
+        self.outcomes.extend(char == '1' for char in outcomes or '')
+        self.cooldown = cooldown or self.base_cooldown
+        self.open_until = open_until or 0.0
+
+class CircuitBreakers:
+    """Breakers for every source and endpoint, persisted through a MentionDatabase"""
+
+    def __init__(self, db=None, **settings):
+        self.db = db
+        self.settings = settings
+        self._breakers: Dict[Tuple[str, str], CircuitBreaker] = {}
+        # Breakers with outcomes since the last save; other engines save the rest
+        self._changed = set()
+        self._lock = threading.Lock()
+        if db is not None:
+            for row in db.get_source_health():
+                self._breaker(row['source'], row['endpoint']).load_row(
+                    row['state'], row['health'], row['outcomes'], row['cooldown_seconds'], row['open_until'])
+
+    def _breaker(self, source: str, endpoint: str) -> CircuitBreaker:
+        breaker = self._breakers.get((source, endpoint))
+        if breaker is None:
+            breaker = self._breakers[(source, endpoint)] = CircuitBreaker(**self.settings)
+        return breaker
+
+    def allow(self, source: str, endpoint: str) -> bool:
+        """Whether a request to the endpoint may go out; claims any half-open probes it uses"""
+        now = time.time()
+        with self._lock:
+            breakers = (self._breaker(source, SOURCE_ENDPOINT), self._breaker(source, endpoint))
+            if not all(breaker.available(now) for breaker in breakers):
+                return False
+            for breaker in breakers:
+                breaker.start(now)
+            return True
+
+    def record(self, source: str, endpoint: str, endpoint_ok: bool, source_ok: Optional[bool] = None):
+        """
+        Outcome of a request; source_ok defaults to endpoint_ok and is False only
+        when the failure says something about the source as a whole
+        """
+        now = time.time()
+        with self._lock:
+            source_breaker = self._breaker(source, SOURCE_ENDPOINT)
+            endpoint_breaker = self._breaker(source, endpoint)
+            before = (source_breaker.state, endpoint_breaker.state)
+            source_breaker.record(endpoint_ok if source_ok is None else source_ok, now)
+            endpoint_breaker.record(endpoint_ok, now)
+            self._changed.update(((source, SOURCE_ENDPOINT), (source, endpoint)))
+            source_opened = source_breaker.state == OPEN and before[0] != OPEN
+            endpoint_opened = endpoint_breaker.state == OPEN and before[1] != OPEN
+        if source_opened:
+            logger.warning(f"Circuit opened for source {source} for {source_breaker.cooldown:.0f}s")
+        if endpoint_opened:
+            logger.warning(f"Circuit opened for {source} endpoint {endpoint} for {endpoint_breaker.cooldown:.0f}s")
+
+    def snapshot(self) -> List[Dict]:
+        """Every breaker's state, least healthy first"""
+        with self._lock:
+            rows = [{
+                'source': source, 'endpoint': endpoint, 'state': breaker.state,
+                'health': round(breaker.health, 3), 'open_until': breaker.open_until,
+            } for (source, endpoint), breaker in self._breakers.items()]
+        return sorted(rows, key=lambda row: row['health'])
+
+    def save(self):
+        if self.db is None:
+            return
+        with self._lock:
+            rows = [(source, endpoint, *self._breakers[(source, endpoint)].to_row())
+                    for source, endpoint in self._changed]
+            self._changed.clear()
+        self.db.save_source_health(rows)
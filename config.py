@@ -44,14 +44,36 @@ NEWS_API_KEY = os.getenv('NEWS_API_KEY', '')
 GOOGLE_NEWS_API_KEY = os.getenv('GOOGLE_NEWS_API_KEY', '')
 LINKEDIN_ACCESS_TOKEN = os.getenv('LINKEDIN_ACCESS_TOKEN', '')
 
+# Source endpoints - overridable so benchmarks can point the monitors at a local replay server
+NEWSAPI_URL = os.getenv('NEWSAPI_URL', 'https://newsapi.org/v2/everything')
+GOOGLE_NEWS_RSS_URL = os.getenv('GOOGLE_NEWS_RSS_URL', 'https://news.google.com/rss/search')
+GOOGLE_SEARCH_URL = os.getenv('GOOGLE_SEARCH_URL', 'https://www.google.com/search')
+LINKEDIN_BASE_URL = os.getenv('LINKEDIN_BASE_URL', 'https://www.linkedin.com')
+
 # Alert Configuration
 SLACK_WEBHOOK_URL = os.getenv('SLACK_WEBHOOK_URL', '')
 EMAIL_SMTP_SERVER = os.getenv('EMAIL_SMTP_SERVER', 'smtp.gmail.com')
 EMAIL_SMTP_PORT = int(os.getenv('EMAIL_SMTP_PORT', '587'))
 EMAIL_USERNAME = os.getenv('EMAIL_USERNAME', '')
 EMAIL_PASSWORD = os.getenv('EMAIL_PASSWORD', '')
+EMAIL_USE_TLS = os.getenv('EMAIL_USE_TLS', 'true').lower() == 'true'
+EMAIL_SMTP_TIMEOUT = int(os.getenv('EMAIL_SMTP_TIMEOUT', '30'))
 ALERT_EMAIL_RECIPIENTS = os.getenv('ALERT_EMAIL_RECIPIENTS', '').split(',')
 
+# Alert Outbox Configuration
+ALERT_MAX_ATTEMPTS = int(os.getenv('ALERT_MAX_ATTEMPTS', '5'))
+ALERT_RETRY_BASE_SECONDS = int(os.getenv('ALERT_RETRY_BASE_SECONDS', '30'))
+ALERT_RETRY_MAX_SECONDS = int(os.getenv('ALERT_RETRY_MAX_SECONDS', '3600'))
+ALERT_DISPATCH_INTERVAL_SECONDS = int(os.getenv('ALERT_DISPATCH_INTERVAL_SECONDS', '30'))
+ALERT_DISPATCH_WORKERS = int(os.getenv('ALERT_DISPATCH_WORKERS', '4'))
+
+# Alert Digest Configuration - each channel gets one consolidated alert per company
+# for the mentions due together. With a window, new mentions are also held per company
+# until the window elapses or enough mentions pile up (0 sends them on the next drain,
+# so a lone mention is never held back)
+ALERT_DIGEST_WINDOW_MINUTES = int(os.getenv('ALERT_DIGEST_WINDOW_MINUTES', '0'))
+ALERT_DIGEST_MAX_MENTIONS = int(os.getenv('ALERT_DIGEST_MAX_MENTIONS', '25'))
+
 # Database Configuration
 DATABASE_URL = os.getenv('DATABASE_URL', 'sqlite:///portfolio_mentions.db')
 
@@ -59,6 +81,92 @@ DATABASE_URL = os.getenv('DATABASE_URL', 'sqlite:///portfolio_mentions.db')
 CHECK_INTERVAL_MINUTES = int(os.getenv('CHECK_INTERVAL_MINUTES', '30'))
 MAX_ARTICLES_PER_CHECK = int(os.getenv('MAX_ARTICLES_PER_CHECK', '50'))
 DAYS_LOOKBACK = int(os.getenv('DAYS_LOOKBACK', '1'))
+# Incremental fetching - each (company, source, keyword) remembers the newest item
+# it has seen and later cycles skip older items before relevance and sentiment run.
+# Items published up to the overlap before that mark are still let through once,
+# since feeds often surface articles some time after their publish date
+INCREMENTAL_FETCH = os.getenv('INCREMENTAL_FETCH', 'true').lower() == 'true'
+SOURCE_CURSOR_OVERLAP_MINUTES = int(os.getenv('SOURCE_CURSOR_OVERLAP_MINUTES', '360'))
+# Companies fetched concurrently per monitoring cycle (mentions are still stored from one thread)
+MONITOR_MAX_WORKERS = int(os.getenv('MONITOR_MAX_WORKERS', '4'))
+# Query batching - sources that accept boolean OR queries (NewsAPI, Google News) are
+# searched with each company's keywords in one query, and with the relevance filter
+# sorting results back out, several companies' keywords per query
+QUERY_BATCHING = os.getenv('QUERY_BATCHING', 'true').lower() == 'true'
+QUERY_BATCH_MAX_TERMS = int(os.getenv('QUERY_BATCH_MAX_TERMS', '6'))
+# Circuit breakers - a source or endpoint whose recent requests mostly fail is skipped
+# until a cooldown passes, then probed with one request (cooldown doubles while it fails)
+CIRCUIT_BREAKER_ENABLED = os.getenv('CIRCUIT_BREAKER_ENABLED', 'true').lower() == 'true'
+CIRCUIT_BREAKER_WINDOW = int(os.getenv('CIRCUIT_BREAKER_WINDOW', '20'))
+CIRCUIT_BREAKER_FAILURE_RATE = float(os.getenv('CIRCUIT_BREAKER_FAILURE_RATE', '0.5'))
+CIRCUIT_BREAKER_MIN_CALLS = int(os.getenv('CIRCUIT_BREAKER_MIN_CALLS', '4'))
+CIRCUIT_BREAKER_COOLDOWN_SECONDS = float(os.getenv('CIRCUIT_BREAKER_COOLDOWN_SECONDS', '600'))
+CIRCUIT_BREAKER_MAX_COOLDOWN_SECONDS = float(os.getenv('CIRCUIT_BREAKER_MAX_COOLDOWN_SECONDS', '21600'))
+# LinkedIn company page slugs - remember which spelling answers (at most one feed request
+# per company per cycle) and that none do, rechecking known misses after this many days
+LINKEDIN_SLUG_CACHE = os.getenv('LINKEDIN_SLUG_CACHE', 'true').lower() == 'true'
+LINKEDIN_SLUG_RECHECK_DAYS = float(os.getenv('LINKEDIN_SLUG_RECHECK_DAYS', '30'))
+
+# Database writer - mentions and alert records are written by one thread per database,
+# which commits them in groups of up to DB_WRITER_BATCH_ROWS rows or every
+# DB_WRITER_FLUSH_MS milliseconds, whichever comes first (false writes them inline)
+DB_WRITER_ENABLED = os.getenv('DB_WRITER_ENABLED', 'true').lower() == 'true'
+DB_WRITER_BATCH_ROWS = int(os.getenv('DB_WRITER_BATCH_ROWS', '200'))
+DB_WRITER_FLUSH_MS = float(os.getenv('DB_WRITER_FLUSH_MS', '50'))
+
+# Near-duplicate story clustering - how far back syndicated copies are matched
+STORY_CLUSTER_LOOKBACK_DAYS = int(os.getenv('STORY_CLUSTER_LOOKBACK_DAYS', '14'))
+
+# Redirect resolution - Google News and shortener links are resolved to the
+# publisher URL once and cached for the TTL
+REDIRECT_CACHE_TTL_HOURS = int(os.getenv('REDIRECT_CACHE_TTL_HOURS', '168'))
+REDIRECT_MAX_CONCURRENT = int(os.getenv('REDIRECT_MAX_CONCURRENT', '8'))
+REDIRECT_TIMEOUT = int(os.getenv('REDIRECT_TIMEOUT', '10'))
+
+# Shared HTTP client - per-host connection pools sized to the most concurrent
+# requests (engine workers or redirect lookups), kept open with TCP keep-alive,
+# default timeouts for calls that set none and a short-lived DNS cache (0 disables it)
+HTTP_POOL_CONNECTIONS = int(os.getenv('HTTP_POOL_CONNECTIONS', '32'))
+HTTP_POOL_MAXSIZE = int(os.getenv('HTTP_POOL_MAXSIZE', str(max(MONITOR_MAX_WORKERS, REDIRECT_MAX_CONCURRENT))))
+HTTP_CONNECT_TIMEOUT = float(os.getenv('HTTP_CONNECT_TIMEOUT', '5'))
+HTTP_READ_TIMEOUT = float(os.getenv('HTTP_READ_TIMEOUT', '30'))
+HTTP_DNS_CACHE_SECONDS = float(os.getenv('HTTP_DNS_CACHE_SECONDS', '300'))
+
+# Monitoring cycle mode - 'threads' runs companies on a worker pool, 'async' runs every
+# company and source as an asyncio task (aiohttp when installed, else the shared
+# sessions on worker threads) with in-flight caps and a rate limit per host
+MONITOR_MODE = os.getenv('MONITOR_MODE', 'threads').lower()
+ASYNC_HTTP_BACKEND = os.getenv('ASYNC_HTTP_BACKEND', 'auto').lower()
+ASYNC_MAX_IN_FLIGHT = int(os.getenv('ASYNC_MAX_IN_FLIGHT', '100'))
+ASYNC_PER_HOST_LIMIT = int(os.getenv('ASYNC_PER_HOST_LIMIT', str(HTTP_POOL_MAXSIZE)))
+ASYNC_HOST_RATE_PER_SECOND = float(os.getenv('ASYNC_HOST_RATE_PER_SECOND', '10'))
+# Sharded cycles - with more than one shard the scheduler and CLI split the companies
+# across that many worker processes (by a stable hash of the name), each fetching and
+# scoring its share on its own core while the calling process alone writes to SQLite.
+# Per-host politeness delays and rate limits apply per worker process
+MONITOR_SHARDS = int(os.getenv('MONITOR_SHARDS', '1'))
+# Historical backfill - the `backfill` command fetches BACKFILL_DAYS of a company's
+# history from the dated sources (NewsAPI from/to, Google News after:/before:) in
+# windows of BACKFILL_WINDOW_DAYS days, all in flight at once under the async client's
+# per-host limits. A window cut off at the upstream's page limit is split in half down to
+# single days, and a single day still cut off is paged through up to BACKFILL_MAX_PAGES
+# pages where the upstream allows. Completed windows are checkpointed, so an interrupted
+# backfill resumes where it stopped. NewsAPI is only asked for the last
+# BACKFILL_NEWSAPI_MAX_DAYS days and pages only up to BACKFILL_NEWSAPI_MAX_RESULTS
+# results (the developer plan's archive depth and result cap; 0 = no limit)
+BACKFILL_DAYS = int(os.getenv('BACKFILL_DAYS', '365'))
+BACKFILL_WINDOW_DAYS = int(os.getenv('BACKFILL_WINDOW_DAYS', '7'))
+BACKFILL_MAX_PAGES = int(os.getenv('BACKFILL_MAX_PAGES', '5'))
+BACKFILL_NEWSAPI_MAX_DAYS = int(os.getenv('BACKFILL_NEWSAPI_MAX_DAYS', '30'))
+BACKFILL_NEWSAPI_MAX_RESULTS = int(os.getenv('BACKFILL_NEWSAPI_MAX_RESULTS', '100'))
+
+# Slow-query log - statements slower than this are logged with their EXPLAIN QUERY
+# PLAN and listed at /debug/queries (0 disables the log, totals are still kept)
+SLOW_QUERY_MS = float(os.getenv('SLOW_QUERY_MS', '100'))
+SLOW_QUERY_LOG_SIZE = int(os.getenv('SLOW_QUERY_LOG_SIZE', '50'))
+# Debug routes (/debug/..., POST /api/profile-next-cycle) are only served to requests
+# carrying this token in an X-Debug-Token header or ?token= parameter; unset, they answer 404
+DEBUG_ROUTES_TOKEN = os.getenv('DEBUG_ROUTES_TOKEN', '')
 
 # Sentiment Analysis
 ENABLE_SENTIMENT_ANALYSIS = os.getenv('ENABLE_SENTIMENT_ANALYSIS', 'true').lower() == 'true'
@@ -67,3 +175,11 @@ ENABLE_SENTIMENT_ANALYSIS = os.getenv('ENABLE_SENTIMENT_ANALYSIS', 'true').lower
 LOG_LEVEL = os.getenv('LOG_LEVEL', 'INFO')
 LOG_FILE = os.getenv('LOG_FILE', 'portfolio_monitor.log')
 
+
+# Profiling - a cycle is profiled when PROFILE_NEXT_CYCLE is set at startup or the
+# trigger file exists (created by POST /api/profile-next-cycle, which needs DEBUG_ROUTES_TOKEN)
+PROFILE_DIR = os.getenv('PROFILE_DIR', 'profiles')
+PROFILE_TRIGGER_FILE = os.getenv('PROFILE_TRIGGER_FILE', 'profile_next_cycle')
+PROFILE_SAMPLER = os.getenv('PROFILE_SAMPLER', 'auto')  # auto (py-spy if installed), py-spy or builtin
+PROFILE_SAMPLE_INTERVAL_MS = float(os.getenv('PROFILE_SAMPLE_INTERVAL_MS', '5'))
+PROFILE_TRACEMALLOC_TOP = int(os.getenv('PROFILE_TRACEMALLOC_TOP', '25'))
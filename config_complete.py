@@ -223,6 +223,12 @@ NEWS_API_KEY = os.getenv('NEWS_API_KEY', '')
 GOOGLE_NEWS_API_KEY = os.getenv('GOOGLE_NEWS_API_KEY', '')
 LINKEDIN_ACCESS_TOKEN = os.getenv('LINKEDIN_ACCESS_TOKEN', '')
 
+# Source endpoints - overridable so benchmarks can point the monitors at a local replay server
+NEWSAPI_URL = os.getenv('NEWSAPI_URL', 'https://newsapi.org/v2/everything')
+GOOGLE_NEWS_RSS_URL = os.getenv('GOOGLE_NEWS_RSS_URL', 'https://news.google.com/rss/search')
+GOOGLE_SEARCH_URL = os.getenv('GOOGLE_SEARCH_URL', 'https://www.google.com/search')
+LINKEDIN_BASE_URL = os.getenv('LINKEDIN_BASE_URL', 'https://www.linkedin.com')
+
 # Demo Alert Configuration
 DEMO_MODE = os.getenv('DEMO_MODE', 'true').lower() == 'true'
 DEMO_ALERT_EMAIL = os.getenv('DEMO_ALERT_EMAIL', 'demo@scalexventures.com')
@@ -44,6 +44,12 @@ PORTFOLIO_COMPANIES = [
 NEWS_API_KEY = os.getenv('NEWS_API_KEY', '')
 # If no NewsAPI key, we'll use free Google News RSS feeds
 
+# Source endpoints - overridable so benchmarks can point the monitors at a local replay server
+NEWSAPI_URL = os.getenv('NEWSAPI_URL', 'https://newsapi.org/v2/everything')
+GOOGLE_NEWS_RSS_URL = os.getenv('GOOGLE_NEWS_RSS_URL', 'https://news.google.com/rss/search')
+GOOGLE_SEARCH_URL = os.getenv('GOOGLE_SEARCH_URL', 'https://www.google.com/search')
+LINKEDIN_BASE_URL = os.getenv('LINKEDIN_BASE_URL', 'https://www.linkedin.com')
+
 # DEMO Alert Configuration - Uses simple print statements instead of email/Slack
 DEMO_MODE = os.getenv('DEMO_MODE', 'true').lower() == 'true'
 
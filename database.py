@@ -5,36 +5,73 @@ Database models and operations for the portfolio monitoring system
 import sqlite3
 import hashlib
 from datetime import datetime
-from typing import List, Dict, Optional
+from typing import List, Dict, Optional, Tuple
 import logging
+import threading
+
+from config import STORY_CLUSTER_LOOKBACK_DAYS
+from query_log import connect
+from story_clustering import StoryClusterIndex, simhash, story_text, to_signed, to_unsigned
+from url_canonicalizer import canonicalize_url
 
 logger = logging.getLogger(__name__)
 
+# Bumped whenever init_database needs to rebuild existing tables (PRAGMA user_version)
+SCHEMA_VERSION = 1
+
+MENTIONS_TABLE_SQL = """
+    CREATE TABLE IF NOT EXISTS {table} (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        company_name TEXT NOT NULL,
+        title TEXT NOT NULL,
+        content TEXT,
+        url TEXT UNIQUE NOT NULL,
+        source TEXT NOT NULL,
+        published_date TEXT,
+        sentiment_score REAL,
+        hash INTEGER UNIQUE NOT NULL,
+        created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+        simhash INTEGER,
+        story_id INTEGER,
+        canonical_url TEXT
+    )
+"""
+
 class MentionDatabase:
     def __init__(self, db_path: str = "portfolio_mentions.db"):
         self.db_path = db_path
+        # Alert channels that get a pending outbox row for every new mention
+        self.alert_types: List[str] = []
+        self._story_index: Optional[StoryClusterIndex] = None
+        self._story_index_lock = threading.Lock()
+        self._writer = None
+        self._writer_lock = threading.Lock()
         self.init_database()
     
+    def _connect(self) -> sqlite3.Connection:
+        """Connection whose statements are timed into the slow-query log"""
+        return connect(self.db_path)
+    
     def init_database(self):
         """Initialize the database with required tables"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             
+            cursor.execute("PRAGMA user_version")
+            schema_version = cursor.fetchone()[0]
+            cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = 'mentions'")
+            is_new_database = cursor.fetchone() is None
+            
             # Create mentions table
-            cursor.execute("""
-                CREATE TABLE IF NOT EXISTS mentions (
-                    id INTEGER PRIMARY KEY AUTOINCREMENT,
-                    company_name TEXT NOT NULL,
-                    title TEXT NOT NULL,
-                    content TEXT,
-                    url TEXT UNIQUE NOT NULL,
-                    source TEXT NOT NULL,
-                    published_date TEXT,
-                    sentiment_score REAL,
-                    hash TEXT UNIQUE NOT NULL,
-                    created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
-                )
-            """)
+            cursor.execute(MENTIONS_TABLE_SQL.format(table='mentions'))
+            
+            # Near-duplicate story clustering columns on databases older than them
+            self._ensure_columns(cursor, 'mentions', {
+                'simhash': 'INTEGER',
+                'story_id': 'INTEGER',
+                'canonical_url': 'TEXT'
+            })
+            self._backfill_canonical_urls(cursor)
             
             # Create alerts table
             cursor.execute("""
@@ -45,10 +82,89 @@ class MentionDatabase:
                     status TEXT DEFAULT 'pending',
                     sent_at TIMESTAMP,
                     error_message TEXT,
+                    idempotency_key TEXT,
+                    attempts INTEGER DEFAULT 0,
+                    next_attempt_at TIMESTAMP,
+                    created_at TIMESTAMP,
                     FOREIGN KEY (mention_id) REFERENCES mentions (id)
                 )
             """)
             
+            # Upgrade alerts tables created before the outbox columns existed
+            self._ensure_columns(cursor, 'alerts', {
+                'idempotency_key': 'TEXT',
+                'attempts': 'INTEGER DEFAULT 0',
+                'next_attempt_at': 'TIMESTAMP',
+                'created_at': 'TIMESTAMP'
+            })
+            
+            # Create url_redirects table (redirect URL -> final publisher URL)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS url_redirects (
+                    url TEXT PRIMARY KEY,
+                    final_url TEXT NOT NULL,
+                    resolved_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            
+            # Create source_cursors table (newest item seen per company, source and keyword)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS source_cursors (
+                    company_name TEXT NOT NULL,
+                    source TEXT NOT NULL,
+                    keyword TEXT NOT NULL,
+                    last_published TEXT,
+                    seen_guids TEXT,
+                    split INTEGER NOT NULL DEFAULT 0,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (company_name, source, keyword)
+                )
+            """)
+            
+            # Split marks on OR query cursors, on databases older than them
+            self._ensure_columns(cursor, 'source_cursors', {'split': 'INTEGER NOT NULL DEFAULT 0'})
+            
+            # Create source_health table (circuit breaker state per source and endpoint)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS source_health (
+                    source TEXT NOT NULL,
+                    endpoint TEXT NOT NULL,
+                    state TEXT NOT NULL,
+                    health REAL NOT NULL,
+                    outcomes TEXT,
+                    cooldown_seconds REAL,
+                    open_until REAL,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (source, endpoint)
+                )
+            """)
+            
+            # Create company_page_slugs table (which page slug answers for each company)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS company_page_slugs (
+                    source TEXT NOT NULL,
+                    company_name TEXT NOT NULL,
+                    slug TEXT,
+                    next_candidate INTEGER NOT NULL DEFAULT 0,
+                    checked_at REAL,
+                    updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (source, company_name)
+                )
+            """)
+            
+            # Create backfill_windows table (date windows a backfill has stored, per company and source)
+            cursor.execute("""
+                CREATE TABLE IF NOT EXISTS backfill_windows (
+                    company_name TEXT NOT NULL,
+                    source TEXT NOT NULL,
+                    window_start TEXT NOT NULL,
+                    window_end TEXT NOT NULL,
+                    new_mentions INTEGER NOT NULL DEFAULT 0,
+                    completed_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                    PRIMARY KEY (company_name, source, window_start, window_end)
+                )
+            """)
+            
             # Create portfolio_companies table
             cursor.execute("""
                 CREATE TABLE IF NOT EXISTS portfolio_companies (
@@ -61,18 +177,100 @@ class MentionDatabase:
                 )
             """)
             
+            # Rebuilt before the indexes below, which are dropped along with the old table
+            if not is_new_database and schema_version < 1:
+                self._migrate_integer_hash(cursor)
+            
             # Create indexes for better performance
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_company_name ON mentions (company_name)")
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_source ON mentions (source)")
             cursor.execute("CREATE INDEX IF NOT EXISTS idx_published_date ON mentions (published_date)")
-            cursor.execute("CREATE INDEX IF NOT EXISTS idx_hash ON mentions (hash)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_story_id ON mentions (story_id)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_created_at ON mentions (created_at)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_canonical_url ON mentions (canonical_url, company_name)")
+            cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS idx_alerts_idempotency ON alerts (idempotency_key)")
+            cursor.execute("CREATE INDEX IF NOT EXISTS idx_alerts_due ON alerts (status, next_attempt_at)")
+            cursor.execute(f"PRAGMA user_version = {SCHEMA_VERSION}")
             
             conn.commit()
             logger.info("Database initialized successfully")
     
+    def _ensure_columns(self, cursor, table: str, columns: Dict[str, str]):
+        """Add any missing columns to an existing table"""
+        cursor.execute(f"PRAGMA table_info({table})")
+        existing = {row[1] for row in cursor.fetchall()}
+        
+        for name, declaration in columns.items():
+            if name not in existing:
+                cursor.execute(f"ALTER TABLE {table} ADD COLUMN {name} {declaration}")
+                logger.info(f"Added column {table}.{name}")
+    
+    def _migrate_integer_hash(self, cursor, batch_size: int = 5000):
+        """
+        Rebuild mentions with an 8-byte integer hash instead of 32-char hex text
+        The UNIQUE constraint's index is the only hash index left; the redundant
+        idx_hash is dropped along with the old table
+        """
+        logger.info("Migrating mentions.hash to integer keys")
+        cursor.execute("DROP TABLE IF EXISTS mentions_migration")
+        cursor.execute(MENTIONS_TABLE_SQL.format(table='mentions_migration'))
+        
+        columns = ('id, company_name, title, content, url, source, published_date, '
+                   'sentiment_score, hash, created_at, simhash, story_id, canonical_url')
+        hash_position = 8
+        migrated = 0
+        skipped = 0
+        last_id = 0
+        while True:
+            cursor.execute(f"SELECT {columns} FROM mentions WHERE id > ? ORDER BY id LIMIT ?", (last_id, batch_size))
+            rows = cursor.fetchall()
+            if not rows:
+                break
+            
+            batch = []
+            for row in rows:
+                row = list(row)
+                if isinstance(row[hash_position], str):
+                    row[hash_position] = self._hash_key(bytes.fromhex(row[hash_position]))
+                batch.append(row)
+            
+            before = cursor.connection.total_changes
+            cursor.executemany(f"""
+                INSERT OR IGNORE INTO mentions_migration ({columns})
+                VALUES ({', '.join('?' * 13)})
+            """, batch)
+            inserted = cursor.connection.total_changes - before
+            migrated += inserted
+            skipped += len(batch) - inserted
+            last_id = rows[-1][0]
+        
+        cursor.execute("DROP TABLE mentions")
+        cursor.execute("ALTER TABLE mentions_migration RENAME TO mentions")
+        # init_database creates the mentions indexes once the migration is done
+        
+        if skipped:
+            logger.warning(f"Skipped {skipped} mentions whose integer hash collided during migration")
+        logger.info(f"Migrated {migrated} mentions to integer hash keys")
+    
+    def _backfill_canonical_urls(self, cursor, batch_size: int = 1000):
+        """Canonicalize the URLs of mentions stored before canonical_url existed"""
+        cursor.execute("SELECT id, url FROM mentions WHERE canonical_url IS NULL")
+        rows = cursor.fetchall()
+        for start in range(0, len(rows), batch_size):
+            cursor.executemany(
+                "UPDATE mentions SET canonical_url = ? WHERE id = ?",
+                [(canonicalize_url(url), mention_id) for mention_id, url in rows[start:start + batch_size]]
+            )
+        if rows:
+            logger.info(f"Canonicalized URLs of {len(rows)} existing mentions")
+    
+    def register_alert_types(self, alert_types: List[str]):
+        """Enqueue a pending alert of each given type whenever a new mention is added"""
+        self.alert_types = list(alert_types)
+    
     def populate_portfolio_companies(self, companies_data):
         """Populate the portfolio_companies table with company data"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             
             for company in companies_data:
@@ -94,59 +292,312 @@ class MentionDatabase:
             conn.commit()
             logger.info(f"Populated portfolio_companies table with {len(companies_data)} companies")
     
-    def generate_hash(self, title: str, url: str, company: str) -> str:
+    @staticmethod
+    def _hash_key(digest: bytes) -> int:
+        """First 8 bytes of a digest as a signed 64-bit SQLite INTEGER"""
+        return int.from_bytes(digest[:8], 'big', signed=True)
+    
+    def generate_hash(self, title: str, url: str, company: str) -> int:
         """Generate a unique hash for a mention to avoid duplicates"""
         content = f"{title}|{url}|{company}"
-        return hashlib.md5(content.encode()).hexdigest()
+        return self._hash_key(hashlib.md5(content.encode()).digest())
     
-    def mention_exists(self, hash_value: str) -> bool:
-        """Check if a mention already exists in the database"""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT 1 FROM mentions WHERE hash = ?", (hash_value,))
+    def mention_exists(self, hash_value: int, canonical_url: Optional[str] = None,
+                       company: Optional[str] = None) -> bool:
+        """Check if a mention already exists, by hash or by canonical URL for the company"""
+        with self._connect() as conn:
+            return self._mention_exists(conn.cursor(), hash_value, canonical_url, company)
+    
+    def _mention_exists(self, cursor: sqlite3.Cursor, hash_value: int, canonical_url: Optional[str],
+                        company: Optional[str]) -> bool:
+        cursor.execute("SELECT 1 FROM mentions WHERE hash = ?", (hash_value,))
+        if cursor.fetchone() is not None:
+            return True
+        
+        if canonical_url and company:
+            cursor.execute(
+                "SELECT 1 FROM mentions WHERE canonical_url = ? AND company_name = ?",
+                (canonical_url, company)
+            )
             return cursor.fetchone() is not None
+        return False
     
     def add_mention(self, mention_data: Dict) -> Optional[int]:
         """Add a new mention to the database"""
+        with self._connect() as conn:
+            mention_id = self.insert_mention(conn.cursor(), mention_data)
+            conn.commit()
+        return mention_id
+    
+    def insert_mention(self, cursor: sqlite3.Cursor, mention_data: Dict) -> Optional[int]:
+        """
+        add_mention() inside the caller's transaction, which the caller commits
+        (or rolls back and then calls reset_story_index()). created_at defaults to
+        now; a backfill passes the article's date ('YYYY-MM-DD HH:MM:SS', UTC)
+        """
+        # Dedup on the canonical URL so tracking parameters and www/http
+        # variants of the same article are not stored twice
+        canonical_url = canonicalize_url(mention_data['url'])
         hash_value = self.generate_hash(
             mention_data['title'], 
-            mention_data['url'], 
+            canonical_url, 
             mention_data['company_name']
         )
         
-        if self.mention_exists(hash_value):
+        # Checked on the caller's cursor, so mentions earlier in the same transaction count
+        if self._mention_exists(cursor, hash_value, canonical_url, mention_data['company_name']):
             logger.debug(f"Mention already exists: {mention_data['title']}")
             return None
         
-        with sqlite3.connect(self.db_path) as conn:
+        # Syndicated copies of a story join the cluster of the first copy seen
+        story_index = self._get_story_index(cursor)
+        signature = simhash(story_text(mention_data['title'], mention_data.get('content', '')))
+        story_id = story_index.find(mention_data['company_name'], signature)
+        
+        try:
+            cursor.execute("""
+                INSERT INTO mentions (
+                    company_name, title, content, url, source, 
+                    published_date, sentiment_score, hash, simhash, story_id, canonical_url, created_at
+                ) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, COALESCE(?, CURRENT_TIMESTAMP))
+            """, (
+                mention_data['company_name'],
+                mention_data['title'],
+                mention_data.get('content', ''),
+                mention_data['url'],
+                mention_data['source'],
+                mention_data.get('published_date', ''),
+                mention_data.get('sentiment_score'),
+                hash_value,
+                to_signed(signature),
+                story_id,
+                canonical_url,
+                mention_data.get('created_at')
+            ))
+        except sqlite3.IntegrityError as e:
+            logger.warning(f"Failed to add mention due to integrity constraint: {e}")
+            return None
+        mention_id = cursor.lastrowid
+        
+        # A mention that matches no earlier story starts its own cluster
+        if story_id is None:
+            story_id = mention_id
+            cursor.execute("UPDATE mentions SET story_id = ? WHERE id = ?", (story_id, mention_id))
+        
+        # Enqueue outbox rows in the same transaction as the mention
+        for alert_type in self.alert_types:
+            cursor.execute("""
+                INSERT OR IGNORE INTO alerts (
+                    mention_id, alert_type, status, idempotency_key, created_at
+                ) VALUES (?, ?, 'pending', ?, CURRENT_TIMESTAMP)
+            """, (mention_id, alert_type, f"{hash_value}:{alert_type}"))
+        
+        story_index.add(mention_data['company_name'], signature, story_id)
+        mention_data['story_id'] = story_id
+        logger.info(f"Added new mention for {mention_data['company_name']}: {mention_data['title']}")
+        return mention_id
+    
+    def get_writer(self) -> 'DatabaseWriter':
+        """This database's writer thread for mentions and alert records, created on first use"""
+        with self._writer_lock:
+            if self._writer is None:
+                from db_writer import DatabaseWriter
+                self._writer = DatabaseWriter(self)
+            return self._writer
+    
+    def _get_story_index(self, cursor: Optional[sqlite3.Cursor] = None) -> StoryClusterIndex:
+        """
+        Load the story cluster index from recent mentions on first use, on the
+        caller's cursor (and transaction) when given
+        """
+        with self._story_index_lock:
+            if self._story_index is None:
+                index = StoryClusterIndex()
+                if cursor is not None:
+                    self._load_story_index(cursor, index)
+                else:
+                    with self._connect() as conn:
+                        self._load_story_index(conn.cursor(), index)
+                        conn.commit()
+                self._story_index = index
+            return self._story_index
+    
+    def _load_story_index(self, cursor: sqlite3.Cursor, index: StoryClusterIndex):
+        cursor.execute("""
+            SELECT company_name, simhash, story_id FROM mentions
+            WHERE simhash IS NOT NULL
+            AND created_at >= datetime('now', '-' || ? || ' days')
+        """, (STORY_CLUSTER_LOOKBACK_DAYS,))
+        for company_name, signature, story_id in cursor.fetchall():
+            index.add(company_name, to_unsigned(signature), story_id)
+        
+        # Fingerprint recent mentions stored before clustering existed
+        cursor.execute("""
+            SELECT id, company_name, title, content FROM mentions
+            WHERE simhash IS NULL
+            AND created_at >= datetime('now', '-' || ? || ' days')
+            ORDER BY id
+        """, (STORY_CLUSTER_LOOKBACK_DAYS,))
+        updates = []
+        for mention_id, company_name, title, content in cursor.fetchall():
+            signature = simhash(story_text(title, content or ''))
+            story_id = index.find(company_name, signature) or mention_id
+            index.add(company_name, signature, story_id)
+            updates.append((to_signed(signature), story_id, mention_id))
+        
+        if updates:
+            cursor.executemany("UPDATE mentions SET simhash = ?, story_id = ? WHERE id = ?", updates)
+            logger.info(f"Assigned story clusters to {len(updates)} existing mentions")
+    
+    def reset_story_index(self):
+        """Drop the story cluster index so it is reloaded, after a rolled-back insert_mention()"""
+        with self._story_index_lock:
+            self._story_index = None
+    
+    def get_cached_redirects(self, urls: List[str], ttl_hours: int) -> Dict[str, str]:
+        """Get cached final URLs for redirect URLs resolved within the TTL"""
+        resolved = {}
+        with self._connect() as conn:
             cursor = conn.cursor()
-            try:
-                cursor.execute("""
-                    INSERT INTO mentions (
-                        company_name, title, content, url, source, 
-                        published_date, sentiment_score, hash
-                    ) VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-                """, (
-                    mention_data['company_name'],
-                    mention_data['title'],
-                    mention_data.get('content', ''),
-                    mention_data['url'],
-                    mention_data['source'],
-                    mention_data.get('published_date', ''),
-                    mention_data.get('sentiment_score'),
-                    hash_value
-                ))
-                mention_id = cursor.lastrowid
-                conn.commit()
-                logger.info(f"Added new mention for {mention_data['company_name']}: {mention_data['title']}")
-                return mention_id
-            except sqlite3.IntegrityError as e:
-                logger.warning(f"Failed to add mention due to integrity constraint: {e}")
-                return None
+            # Stay well under SQLite's bound parameter limit
+            for start in range(0, len(urls), 500):
+                batch = urls[start:start + 500]
+                cursor.execute(f"""
+                    SELECT url, final_url FROM url_redirects
+                    WHERE url IN ({','.join('?' * len(batch))})
+                    AND resolved_at >= datetime('now', '-' || ? || ' hours')
+                """, (*batch, ttl_hours))
+                resolved.update(cursor.fetchall())
+        return resolved
+    
+    def save_redirects(self, redirects: Dict[str, str]):
+        """Cache resolved redirect URLs"""
+        if not redirects:
+            return
+        
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.executemany("""
+                INSERT OR REPLACE INTO url_redirects (url, final_url, resolved_at)
+                VALUES (?, ?, CURRENT_TIMESTAMP)
+            """, redirects.items())
+            conn.commit()
+    
+    def get_source_cursors(self, company_name: str) -> Dict[Tuple[str, str], Tuple[Optional[str], Optional[str], int]]:
+        """(source, keyword) -> (last_published, seen_guids JSON, split) for one company"""
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT source, keyword, last_published, seen_guids, split
+                FROM source_cursors WHERE company_name = ?
+            """, (company_name,))
+            return {(source, keyword): (published, seen, split)
+                    for source, keyword, published, seen, split in cursor.fetchall()}
+    
+    def save_source_cursors(self, company_name: str, rows: List[Tuple[str, str, Optional[str], str, int]]):
+        """Upsert (source, keyword, last_published, seen_guids JSON, split) rows for one company"""
+        if not rows:
+            return
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.executemany("""
+                INSERT OR REPLACE INTO source_cursors
+                    (company_name, source, keyword, last_published, seen_guids, split, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+            """, [(company_name, *row) for row in rows])
+            conn.commit()
+    
+    def delete_stale_source_cursors(self, company_name: str, days: float) -> int:
+        """Delete a company's cursors that have not been saved for `days` days"""
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                DELETE FROM source_cursors
+                WHERE company_name = ? AND updated_at < datetime('now', '-' || ? || ' days')
+            """, (company_name, days))
+            conn.commit()
+            return cursor.rowcount
+    
+    def get_source_health(self) -> List[Dict]:
+        """Persisted circuit breaker rows for every source and endpoint"""
+        with self._connect() as conn:
+            conn.row_factory = sqlite3.Row
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT source, endpoint, state, health, outcomes, cooldown_seconds, open_until, updated_at
+                FROM source_health ORDER BY health, source, endpoint
+            """)
+            return [dict(row) for row in cursor.fetchall()]
+    
+    def save_source_health(self, rows: List[Tuple[str, str, str, float, str, float, float]]):
+        """Upsert (source, endpoint, state, health, outcomes, cooldown_seconds, open_until) rows"""
+        if not rows:
+            return
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.executemany("""
+                INSERT OR REPLACE INTO source_health
+                    (source, endpoint, state, health, outcomes, cooldown_seconds, open_until, updated_at)
+                VALUES (?, ?, ?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+            """, rows)
+            conn.commit()
+    
+    def get_page_slugs(self, source: str) -> Dict[str, Tuple[Optional[str], int, Optional[float]]]:
+        """company_name -> (slug, next_candidate, checked_at) for one source"""
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT company_name, slug, next_candidate, checked_at
+                FROM company_page_slugs WHERE source = ?
+            """, (source,))
+            return {name: (slug, candidate, checked) for name, slug, candidate, checked in cursor.fetchall()}
+    
+    def save_page_slugs(self, source: str, rows: List[Tuple[str, Optional[str], int, Optional[float]]]):
+        """Upsert (company_name, slug, next_candidate, checked_at) rows for one source"""
+        if not rows:
+            return
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.executemany("""
+                INSERT OR REPLACE INTO company_page_slugs
+                    (source, company_name, slug, next_candidate, checked_at, updated_at)
+                VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+            """, [(source, *row) for row in rows])
+            conn.commit()
+    
+    def get_backfill_windows(self, company_name: str) -> Dict[Tuple[str, str, str], int]:
+        """(source, window_start, window_end) -> new mentions for each window backfilled for a company"""
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT source, window_start, window_end, new_mentions
+                FROM backfill_windows WHERE company_name = ?
+            """, (company_name,))
+            return {(source, start, end): count for source, start, end, count in cursor.fetchall()}
+    
+    def save_backfill_window(self, company_name: str, source: str, window_start: str, window_end: str,
+                             new_mentions: int):
+        """Checkpoint one backfilled window once its mentions are stored"""
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                INSERT OR REPLACE INTO backfill_windows
+                    (company_name, source, window_start, window_end, new_mentions, completed_at)
+                VALUES (?, ?, ?, ?, ?, CURRENT_TIMESTAMP)
+            """, (company_name, source, window_start, window_end, new_mentions))
+            conn.commit()
+    
+    def clear_backfill_windows(self, company_name: str) -> int:
+        """Forget a company's backfill checkpoints, so its next backfill starts over"""
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute("DELETE FROM backfill_windows WHERE company_name = ?", (company_name,))
+            conn.commit()
+            return cursor.rowcount
     
     def get_recent_mentions(self, hours: int = 24) -> List[Dict]:
         """Get mentions from the last N hours"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT * FROM mentions 
@@ -159,7 +610,7 @@ class MentionDatabase:
     
     def get_mentions_by_company(self, company_name: str, limit: int = 50) -> List[Dict]:
         """Get mentions for a specific company"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             cursor.execute("""
                 SELECT * FROM mentions 
@@ -173,28 +624,119 @@ class MentionDatabase:
     
     def add_alert_record(self, mention_id: int, alert_type: str, status: str = 'pending'):
         """Record an alert attempt"""
-        with sqlite3.connect(self.db_path) as conn:
+        self.add_alert_records([(mention_id, alert_type, status)])
+    
+    def add_alert_records(self, rows: List[Tuple[int, str, str]]):
+        """Record many alert attempts in one transaction; rows are (mention_id, alert_type, status)"""
+        if not rows:
+            return
+        
+        with self._connect() as conn:
+            self.insert_alert_records(conn.cursor(), rows)
+            conn.commit()
+    
+    def insert_alert_records(self, cursor: sqlite3.Cursor, rows: List[Tuple[int, str, str]]):
+        """add_alert_records() inside the caller's transaction"""
+        cursor.executemany("""
+            INSERT INTO alerts (mention_id, alert_type, status, created_at)
+            VALUES (?, ?, ?, CURRENT_TIMESTAMP)
+        """, rows)
+    
+    def update_alert_status(self, alert_id: int, status: str, error_message: str = None,
+                            retry_in_seconds: Optional[int] = None):
+        """Update the status of an alert after a delivery attempt"""
+        self.update_alert_statuses([(alert_id, status, error_message, retry_in_seconds)])
+    
+    def update_alert_statuses(self, rows: List[Tuple]):
+        """
+        Update many alerts in one transaction
+        Rows are (alert_id, status, error_message[, retry_in_seconds])
+        """
+        if not rows:
+            return
+        
+        params = []
+        for row in rows:
+            alert_id, status, error_message = row[:3]
+            retry_in_seconds = row[3] if len(row) > 3 else None
+            params.append((status, error_message, retry_in_seconds, retry_in_seconds, alert_id))
+        
+        with self._connect() as conn:
             cursor = conn.cursor()
-            cursor.execute("""
-                INSERT INTO alerts (mention_id, alert_type, status)
-                VALUES (?, ?, ?)
-            """, (mention_id, alert_type, status))
+            cursor.executemany("""
+                UPDATE alerts 
+                SET status = ?, sent_at = CURRENT_TIMESTAMP, error_message = ?,
+                    attempts = COALESCE(attempts, 0) + 1,
+                    next_attempt_at = CASE WHEN ? IS NULL THEN NULL
+                                           ELSE datetime('now', '+' || ? || ' seconds') END
+                WHERE id = ?
+            """, params)
             conn.commit()
     
-    def update_alert_status(self, alert_id: int, status: str, error_message: str = None):
-        """Update the status of an alert"""
-        with sqlite3.connect(self.db_path) as conn:
+    def claim_due_alerts(self, limit: int = 100, lease_seconds: int = 300,
+                         digest_window_minutes: int = 0, digest_max_size: int = 0) -> List[Dict]:
+        """
+        Claim pending alerts that are due for delivery
+        Claimed rows move to 'sending' with a lease, so concurrent dispatchers never
+        deliver the same row twice and rows from a crashed dispatcher become due again.
+        With a digest window, new rows are held per (alert type, company) until the
+        oldest has waited the window or the company has digest_max_size rows queued.
+        """
+        with self._connect() as conn:
             cursor = conn.cursor()
+            cursor.execute("BEGIN IMMEDIATE")
             cursor.execute("""
+                WITH ready AS (
+                    SELECT a.alert_type, m.company_name
+                    FROM alerts a
+                    JOIN mentions m ON m.id = a.mention_id
+                    WHERE a.status = 'pending'
+                    GROUP BY a.alert_type, m.company_name
+                    HAVING (? > 0 AND COUNT(*) >= ?)
+                        OR MIN(COALESCE(a.created_at, '')) <= datetime('now', '-' || ? || ' minutes')
+                )
+                SELECT a.id AS alert_id, a.alert_type, a.attempts, a.idempotency_key, m.*
+                FROM alerts a
+                JOIN mentions m ON m.id = a.mention_id
+                WHERE (a.status = 'pending'
+                       AND (? <= 0 OR (a.alert_type, m.company_name) IN (SELECT alert_type, company_name FROM ready)))
+                   OR (a.status = 'retry' AND a.next_attempt_at <= CURRENT_TIMESTAMP)
+                   OR (a.status = 'sending' AND a.next_attempt_at <= CURRENT_TIMESTAMP)
+                ORDER BY a.id
+                LIMIT ?
+            """, (digest_max_size, digest_max_size, digest_window_minutes, digest_window_minutes, limit))
+            
+            columns = [description[0] for description in cursor.description]
+            alerts = [dict(zip(columns, row)) for row in cursor.fetchall()]
+            
+            cursor.executemany("""
                 UPDATE alerts 
-                SET status = ?, sent_at = CURRENT_TIMESTAMP, error_message = ?
+                SET status = 'sending', next_attempt_at = datetime('now', '+' || ? || ' seconds')
                 WHERE id = ?
-            """, (status, error_message, alert_id))
+            """, [(lease_seconds, alert['alert_id']) for alert in alerts])
             conn.commit()
+            
+            return alerts
+    
+    def get_pending_digests(self) -> List[Dict]:
+        """Get queued alert counts per (alert type, company) still waiting in the digest window"""
+        with self._connect() as conn:
+            cursor = conn.cursor()
+            cursor.execute("""
+                SELECT a.alert_type, m.company_name, COUNT(*) AS pending, MIN(a.created_at) AS oldest
+                FROM alerts a
+                JOIN mentions m ON m.id = a.mention_id
+                WHERE a.status = 'pending'
+                GROUP BY a.alert_type, m.company_name
+                ORDER BY oldest
+            """)
+            
+            columns = [description[0] for description in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor.fetchall()]
     
     def clean_false_positives(self) -> int:
         """Remove false positive mentions from the database"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             
             # Define false positive patterns
@@ -249,7 +791,7 @@ class MentionDatabase:
     
     def get_statistics(self) -> Dict:
         """Get monitoring statistics"""
-        with sqlite3.connect(self.db_path) as conn:
+        with self._connect() as conn:
             cursor = conn.cursor()
             
             # Total mentions
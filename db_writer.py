@@ -0,0 +1,203 @@
+"""
+Single writer thread for mentions and alert records
+Callers queue writes and get a future back straight away; the writer thread owns
+the write connection and commits queued writes in groups, every batch_rows rows
+or flush_ms milliseconds, then resolves each future with its mention id. While
+another process holds the database lock the writer backs off and retries the
+group, so callers never wait on disk or on "database is locked". The thread
+exits when it has been idle for a while and is restarted by the next write
+"""
+
+import logging
+import queue
+import sqlite3
+import threading
+import time
+from concurrent.futures import Future
+from typing import Dict, List, Optional, Tuple
+
+from config import DB_WRITER_ENABLED, DB_WRITER_BATCH_ROWS, DB_WRITER_FLUSH_MS
+from metrics import metrics
+from query_log import connect
+
+logger = logging.getLogger(__name__)
+
+# Idle seconds after which the writer thread exits
+IDLE_SECONDS = 1.0
+# Attempts at a group while the database is locked, and the first backoff in seconds
+LOCK_RETRIES = 6
+LOCK_BACKOFF_SECONDS = 0.05
+
+MENTION = 'mention'
+ALERTS = 'alerts'
+FLUSH = 'flush'
+
+def _is_locked(error: sqlite3.OperationalError) -> bool:
+    message = str(error).lower()
+    return 'locked' in message or 'busy' in message
+
+def stored(pending: List[Tuple[Dict, Future]]) -> List[Dict]:
+    """The new mentions among (mention, future) pairs, with their ids set, once the writes are committed"""
+    new_mentions = []
+    for mention, future in pending:
+        mention_id = future.result()
+        if mention_id:
+            mention['id'] = mention_id
+            new_mentions.append(mention)
+    return new_mentions
+
+class DatabaseWriter:
+    def __init__(self, db, batch_rows: int = DB_WRITER_BATCH_ROWS, flush_ms: float = DB_WRITER_FLUSH_MS,
+                 enabled: bool = DB_WRITER_ENABLED):
+        self.db = db
+        self.batch_rows = max(1, batch_rows)
+        self.flush_seconds = max(0.0, flush_ms) / 1000
+        # Disabled, writes happen in the calling thread and the futures come back resolved
+        self.enabled = enabled
+        self._queue: queue.Queue = queue.Queue()
+        self._lock = threading.Lock()
+        self._thread: Optional[threading.Thread] = None
+
+    def add_mention(self, mention: Dict) -> Future:
+        """Queue a mention; the future gives its new id, or None for a duplicate"""
+        if not self.enabled:
+            return self._inline(self.db.add_mention, mention)
+        return self._submit(MENTION, mention)
+
+    def add_alert_records(self, rows: List[Tuple[int, str, str]]) -> Future:
+        """Queue (mention_id, alert_type, status) rows, written in one transaction"""
+        if not self.enabled or not rows:
+            return self._inline(self.db.add_alert_records, rows)
+        return self._submit(ALERTS, rows)
+
+    def flush(self, timeout: Optional[float] = None):
+        """Commit everything queued so far without waiting for the group to fill"""
+        if self.enabled:
+            self._submit(FLUSH, None).result(timeout)
+
+    @staticmethod
+    def _inline(write, payload) -> Future:
+        future = Future()
+        try:
+            future.set_result(write(payload))
+        except Exception as e:
+            future.set_exception(e)
+        return future
+
+    def _submit(self, kind: str, payload) -> Future:
+        future = Future()
+        with self._lock:
+            self._queue.put((kind, payload, future))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._run, name='db-writer')
+                self._thread.start()
+        return future
+
+    def _run(self):
+        # Not a daemon thread, so queued writes are committed before the interpreter exits
+        conn, connect_error = None, None
+        try:
+            conn = connect(self.db.db_path)
+        except Exception as e:
+            connect_error = e
+        try:
+            while True:
+                try:
+                    first = self._queue.get(timeout=IDLE_SECONDS)
+                except queue.Empty:
+                    with self._lock:
+                        if self._queue.empty():
+                            self._thread = None
+                            return
+                    continue
+                group = self._group(first)
+                try:
+                    if connect_error is not None:
+                        raise connect_error
+                    self._write(conn, group)
+                except Exception as e:
+                    # Anything _write does not handle fails the group rather than the thread
+                    logger.error(f"Failed to write {len(group)} queued writes: {e}")
+                    for _, _, future in group:
+                        if not future.done():
+                            future.set_exception(e)
+                    if connect_error is not None:
+                        # Writes still queued get a new thread, which connects again
+                        return
+        finally:
+            with self._lock:
+                # However this thread ended, writes queued since get a new one rather than waiting forever
+                if self._thread is threading.current_thread():
+                    self._thread = None
+                if not self._queue.empty() and self._thread is None:
+                    self._thread = threading.Thread(target=self._run, name='db-writer')
+                    self._thread.start()
+            if conn is not None:
+                conn.close()
+
+    def _group(self, first: Tuple) -> List[Tuple]:
+        """The first write plus whatever arrives before the group is full or due"""
+        group = [first]
+        rows = self._rows(first)
+        deadline = time.monotonic() + self.flush_seconds
+        while rows < self.batch_rows and group[-1][0] != FLUSH:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                item = self._queue.get(timeout=remaining)
+            except queue.Empty:
+                break
+            group.append(item)
+            rows += self._rows(item)
+        return group
+
+    @staticmethod
+    def _rows(item: Tuple) -> int:
+        kind, payload, _ = item
+        return len(payload) if kind == ALERTS else 1 if kind == MENTION else 0
+
+    def _write(self, conn: sqlite3.Connection, group: List[Tuple]):
+        for attempt in range(LOCK_RETRIES):
+            try:
+                with metrics.timed('db_write'):
+                    results = self._apply(conn.cursor(), group)
+                    conn.commit()
+                break
+            except sqlite3.Error as e:
+                conn.rollback()
+                # Mentions of the rolled-back group were added to the story index
+                self.db.reset_story_index()
+                if isinstance(e, sqlite3.OperationalError) and _is_locked(e) and attempt < LOCK_RETRIES - 1:
+                    delay = LOCK_BACKOFF_SECONDS * 2 ** attempt
+                    logger.warning(f"Database locked, retrying {len(group)} writes in {delay:.2f}s")
+                    time.sleep(delay)
+                    continue
+                logger.error(f"Failed to write {len(group)} queued writes: {e}")
+                for _, _, future in group:
+                    future.set_exception(e)
+                return
+
+        for (_, _, future), result in zip(group, results):
+            if isinstance(result, Exception):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
+    def _apply(self, cursor: sqlite3.Cursor, group: List[Tuple]) -> List:
+        """Run a group's writes in one transaction; a write's own error is its result"""
+        results = []
+        for kind, payload, _ in group:
+            try:
+                if kind == MENTION:
+                    results.append(self.db.insert_mention(cursor, payload))
+                else:
+                    if kind == ALERTS:
+                        self.db.insert_alert_records(cursor, payload)
+                    results.append(None)
+            except sqlite3.Error:
+                raise
+            except Exception as e:
+                # A malformed mention fails before it writes anything
+                results.append(e)
+        return results
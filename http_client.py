@@ -0,0 +1,149 @@
+"""
+Shared HTTP client for every outbound request
+Sessions keep a connection pool per host sized to the monitor's concurrency,
+with TCP keep-alive on the pooled sockets, so repeated requests to the same
+hosts skip the TCP and TLS handshakes. They also ask for compressed responses
+(brotli too when a brotli module is installed), apply default connect/read
+timeouts to calls that pass none, and resolve hostnames through a small DNS
+cache in front of urllib3's connects
+"""
+
+import ipaddress
+import socket
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.connection import HTTPConnection
+from urllib3.util import connection as urllib3_connection
+from urllib3.util import make_headers
+
+from config import (
+    HTTP_POOL_CONNECTIONS, HTTP_POOL_MAXSIZE, HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT, HTTP_DNS_CACHE_SECONDS
+)
+
+DEFAULT_USER_AGENT = 'ScaleX Ventures Portfolio Monitor/1.0'
+# LinkedIn and Google answer scripted user agents with errors or captchas
+BROWSER_USER_AGENT = ('Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 '
+                      '(KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36')
+
+# gzip and deflate, plus br and zstd when urllib3 has a decoder for them
+ACCEPT_ENCODING = make_headers(accept_encoding=True)['accept-encoding']
+
+def _keepalive_options() -> List[Tuple[int, int, int]]:
+    options = [(socket.SOL_SOCKET, socket.SO_KEEPALIVE, 1)]
+    # Probe idle pooled connections after a minute so dead ones are noticed
+    for name, value in (('TCP_KEEPIDLE', 60), ('TCP_KEEPINTVL', 15), ('TCP_KEEPCNT', 4)):
+        if hasattr(socket, name):
+            options.append((socket.IPPROTO_TCP, getattr(socket, name), value))
+    return HTTPConnection.default_socket_options + options
+
+KEEPALIVE_OPTIONS = _keepalive_options()
+
+class DNSCache:
+    """getaddrinfo answers per (host, port), reused for ttl seconds"""
+
+    def __init__(self, ttl: float = HTTP_DNS_CACHE_SECONDS, max_entries: int = 256):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries: Dict[Tuple[str, int], Tuple[float, List[str]]] = {}
+        self._lock = threading.Lock()
+
+    def lookup(self, host: str, port: int) -> List[str]:
+        """Addresses to connect to, or [] when the host should be resolved as usual"""
+        if self.ttl <= 0 or _is_ip(host):
+            return []
+        key = (host, port)
+        now = time.monotonic()
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is not None and entry[0] > now:
+            return entry[1]
+
+        infos = socket.getaddrinfo(host, port, urllib3_connection.allowed_gai_family(), socket.SOCK_STREAM)
+        addresses = list(dict.fromkeys(info[4][0] for info in infos))
+        with self._lock:
+            if key not in self._entries and len(self._entries) >= self.max_entries:
+                # Oldest first, as dicts keep insertion order
+                del self._entries[next(iter(self._entries))]
+            self._entries[key] = (now + self.ttl, addresses)
+        return addresses
+
+    def forget(self, host: str, port: int):
+        with self._lock:
+            self._entries.pop((host, port), None)
+
+def _is_ip(host: str) -> bool:
+    try:
+        ipaddress.ip_address(host.strip('[]'))
+        return True
+    except ValueError:
+        return False
+
+dns_cache = DNSCache()
+
+_urllib3_create_connection = urllib3_connection.create_connection
+
+def _create_connection(address, *args, **kwargs):
+    """urllib3's create_connection, trying the cached addresses of the host in turn"""
+    host, port = address
+    addresses = dns_cache.lookup(host, port)
+    if not addresses:
+        return _urllib3_create_connection(address, *args, **kwargs)
+
+    error: Optional[OSError] = None
+    for ip in addresses:
+        try:
+            return _urllib3_create_connection((ip, port), *args, **kwargs)
+        except OSError as e:
+            error = e
+    # The host may have moved; resolve it afresh next time
+    dns_cache.forget(host, port)
+    raise error
+
+_install_lock = threading.Lock()
+
+def install_dns_cache():
+    """Route urllib3's connects, process-wide, through the DNS cache (idempotent)"""
+    with _install_lock:
+        if urllib3_connection.create_connection is not _create_connection:
+            urllib3_connection.create_connection = _create_connection
+
+class PooledAdapter(HTTPAdapter):
+    """HTTPAdapter whose pooled sockets use TCP keep-alive and whose requests get a default timeout"""
+    __attrs__ = HTTPAdapter.__attrs__ + ['timeout']
+
+    def __init__(self, timeout: Tuple[float, float] = (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT), **kwargs):
+        self.timeout = timeout
+        super().__init__(**kwargs)
+
+    def init_poolmanager(self, *args, **kwargs):
+        kwargs.setdefault('socket_options', KEEPALIVE_OPTIONS)
+        super().init_poolmanager(*args, **kwargs)
+
+    def send(self, request, timeout=None, **kwargs):
+        return super().send(request, timeout=self.timeout if timeout is None else timeout, **kwargs)
+
+def create_session(user_agent: str = DEFAULT_USER_AGENT, pool_connections: int = HTTP_POOL_CONNECTIONS,
+                   pool_maxsize: int = HTTP_POOL_MAXSIZE,
+                   timeout: Tuple[float, float] = (HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT)) -> requests.Session:
+    """A new session with pooled keep-alive connections; most callers want get_session()"""
+    install_dns_cache()
+    session = requests.Session()
+    adapter = PooledAdapter(timeout=timeout, pool_connections=pool_connections, pool_maxsize=pool_maxsize)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+    session.headers.update({'User-Agent': user_agent, 'Accept-Encoding': ACCEPT_ENCODING})
+    return session
+
+_sessions: Dict[str, requests.Session] = {}
+_sessions_lock = threading.Lock()
+
+def get_session(user_agent: str = DEFAULT_USER_AGENT) -> requests.Session:
+    """The process-wide session for a user agent, so every caller shares its connection pools"""
+    with _sessions_lock:
+        if user_agent not in _sessions:
+            _sessions[user_agent] = create_session(user_agent)
+        return _sessions[user_agent]
@@ -4,36 +4,32 @@ Note: LinkedIn's API has restrictions on public post access.
 This module provides multiple approaches including web scraping and third-party services.
 """
 
-import requests
 import logging
-from datetime import datetime, timedelta
 from typing import List, Dict, Optional
-import time
-import json
-from bs4 import BeautifulSoup
-from textblob import TextBlob
 
-from config import PORTFOLIO_COMPANIES, LINKEDIN_ACCESS_TOKEN
+from config import PORTFOLIO_COMPANIES, LINKEDIN_ACCESS_TOKEN, GOOGLE_SEARCH_URL, LINKEDIN_BASE_URL, LINKEDIN_SLUG_CACHE
 from database import MentionDatabase
+from http_client import BROWSER_USER_AGENT, get_session
+from monitor_engine import MonitorEngine, analyze_sentiment
+from sources import LinkedInGoogleSource, LinkedInRSSSource, SlugCache
 
 logger = logging.getLogger(__name__)
 
 class LinkedInMonitor:
     def __init__(self, db: MentionDatabase):
         self.db = db
-        self.session = requests.Session()
-        self.session.headers.update({
-            'User-Agent': 'Mozilla/5.0 (Macintosh; Intel Mac OS X 10_15_7) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
-        })
+        self.session = get_session(BROWSER_USER_AGENT)
+        self.linkedin_google = LinkedInGoogleSource(self.session, url=GOOGLE_SEARCH_URL, max_keywords=3,  # Limit to avoid rate limiting
+                                                    source_label='LinkedIn (via Google)', delay=2)
+        self.linkedin_rss = LinkedInRSSSource(self.session, base_url=LINKEDIN_BASE_URL, source_label='LinkedIn RSS',
+                                              slug_variations=False, max_items=10, timeout=30,
+                                              slug_cache=SlugCache(db) if LINKEDIN_SLUG_CACHE else None)
+        # Google site search results are not filtered further; the query already names the company
+        self.engine = MonitorEngine(db, [self.linkedin_google, self.linkedin_rss], session=self.session)
     
     def analyze_sentiment(self, text: str) -> float:
         """Analyze sentiment of text using TextBlob"""
-        try:
-            blob = TextBlob(text)
-            return blob.sentiment.polarity
-        except Exception as e:
-            logger.warning(f"Sentiment analysis failed: {e}")
-            return 0.0
+        return analyze_sentiment(text)
     
     def search_linkedin_api(self, company: Dict) -> List[Dict]:
         """
@@ -77,91 +73,14 @@ class LinkedInMonitor:
         Search for LinkedIn mentions using Google site search
         Format: site:linkedin.com "company name"
         """
-        mentions = []
-        
-        for keyword in company['keywords'][:3]:  # Limit to avoid rate limiting
-            try:
-                # Google search for LinkedIn posts
-                query = f'site:linkedin.com "{keyword}"'
-                url = "https://www.google.com/search"
-                params = {
-                    'q': query,
-                    'num': 10,
-                    'tbm': 'nws'  # News search
-                }
-                
-                response = self.session.get(url, params=params, timeout=30)
-                
-                if response.status_code == 200:
-                    soup = BeautifulSoup(response.content, 'html.parser')
-                    
-                    # Parse Google search results
-                    for result in soup.find_all('div', class_='g')[:5]:  # Limit results
-                        title_elem = result.find('h3')
-                        link_elem = result.find('a')
-                        snippet_elem = result.find('span', class_='st')
-                        
-                        if title_elem and link_elem and 'linkedin.com' in link_elem.get('href', ''):
-                            title = title_elem.get_text()
-                            url = link_elem.get('href')
-                            snippet = snippet_elem.get_text() if snippet_elem else ''
-                            
-                            mention = {
-                                'company_name': company['name'],
-                                'title': title,
-                                'content': snippet,
-                                'url': url,
-                                'source': 'LinkedIn (via Google)',
-                                'published_date': datetime.now().isoformat(),
-                                'sentiment_score': self.analyze_sentiment(f"{title} {snippet}")
-                            }
-                            mentions.append(mention)
-                
-                # Rate limiting to avoid being blocked
-                time.sleep(2)
-                
-            except Exception as e:
-                logger.error(f"LinkedIn Google search failed for {keyword}: {e}")
-        
-        return mentions
+        return self.engine.collect(company, [self.linkedin_google])
     
     def search_linkedin_rss_feeds(self, company: Dict) -> List[Dict]:
         """
         Monitor LinkedIn company RSS feeds if available
         Note: LinkedIn has limited RSS feed availability
         """
-        mentions = []
-        
-        # Some LinkedIn company pages have RSS feeds
-        # Format: https://www.linkedin.com/company/COMPANY_NAME/rss/
-        company_name_slug = company['name'].lower().replace(' ', '-')
-        rss_url = f"https://www.linkedin.com/company/{company_name_slug}/rss/"
-        
-        try:
-            import feedparser
-            
-            response = self.session.get(rss_url, timeout=30)
-            if response.status_code == 200:
-                feed = feedparser.parse(response.content)
-                
-                for entry in feed.entries[:10]:  # Limit entries
-                    mention = {
-                        'company_name': company['name'],
-                        'title': entry.title,
-                        'content': entry.get('summary', ''),
-                        'url': entry.link,
-                        'source': 'LinkedIn RSS',
-                        'published_date': entry.get('published', ''),
-                        'sentiment_score': self.analyze_sentiment(
-                            f"{entry.title} {entry.get('summary', '')}"
-                        )
-                    }
-                    mentions.append(mention)
-            
-        except Exception as e:
-            logger.error(f"LinkedIn RSS search failed for {company['name']}: {e}")
-        
-        return mentions
+        return self.engine.collect(company, [self.linkedin_rss])
     
     def search_third_party_apis(self, company: Dict) -> List[Dict]:
         """
@@ -187,7 +106,7 @@ class LinkedInMonitor:
             if mention_api_key:
                 url = "https://web.mention.com/api/accounts/ACCOUNT_ID/alerts/ALERT_ID/mentions"
                 headers = {'Authorization': f'Bearer {mention_api_key}'}
-                response = requests.get(url, headers=headers)
+                response = self.session.get(url, headers=headers)
                 # Process response...
             """
             
@@ -200,38 +119,22 @@ class LinkedInMonitor:
     
     def monitor_all_companies(self) -> List[Dict]:
         """Monitor all portfolio companies for LinkedIn mentions"""
-        all_mentions = []
-        
         logger.info("Starting LinkedIn monitoring for all portfolio companies")
         
-        for company in PORTFOLIO_COMPANIES:
-            logger.info(f"Monitoring LinkedIn for {company['name']}")
-            
-            # Use multiple search methods
-            google_mentions = self.search_linkedin_google(company)
-            rss_mentions = self.search_linkedin_rss_feeds(company)
-            # api_mentions = self.search_linkedin_api(company)  # Limited availability
-            # third_party_mentions = self.search_third_party_apis(company)  # Requires additional APIs
-            
-            company_mentions = google_mentions + rss_mentions
-            
-            # Store new mentions in database
-            new_mentions = []
-            for mention in company_mentions:
-                mention_id = self.db.add_mention(mention)
-                if mention_id:
-                    mention['id'] = mention_id
-                    new_mentions.append(mention)
-            
-            all_mentions.extend(new_mentions)
-            logger.info(f"Found {len(new_mentions)} new LinkedIn mentions for {company['name']}")
-            
-            # Rate limiting between companies
-            time.sleep(1)
+        # api_mentions = self.search_linkedin_api(company)  # Limited availability
+        # third_party_mentions = self.search_third_party_apis(company)  # Requires additional APIs
+        all_mentions = self.engine.run(PORTFOLIO_COMPANIES)
         
         logger.info(f"Total new LinkedIn mentions found: {len(all_mentions)}")
         return all_mentions
     
+    async def amonitor_all_companies(self, client: Optional['AsyncHTTPClient'] = None) -> List[Dict]:
+        """monitor_all_companies() on the running event loop, optionally through a shared client"""
+        logger.info("Starting LinkedIn monitoring for all portfolio companies")
+        all_mentions = await self.engine.arun(PORTFOLIO_COMPANIES, client)
+        logger.info(f"Total new LinkedIn mentions found: {len(all_mentions)}")
+        return all_mentions
+    
     def get_linkedin_insights(self, hours: int = 24) -> Dict:
         """Get LinkedIn-specific insights"""
         recent_mentions = [
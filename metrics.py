@@ -0,0 +1,169 @@
+"""
+Per-stage timing metrics for the portfolio monitoring pipeline
+Records fetch, parse, relevance, sentiment, DB write and alert timings per
+source and company in histograms, exposed in Prometheus text format and
+summarized once per monitoring cycle
+"""
+
+import bisect
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+# Histogram bucket upper bounds in seconds, from per-article work up to slow fetches
+DEFAULT_BUCKETS = (0.0001, 0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+STAGES = ('fetch', 'parse', 'relevance', 'sentiment', 'resolve', 'db_write', 'alert')
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+class Histogram:
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * (len(buckets) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        self.counts[bisect.bisect_left(self.buckets, value)] += 1
+        self.sum += value
+        self.count += 1
+
+class _Timer:
+    """Context manager timing a block with a monotonic clock"""
+    __slots__ = ('registry', 'stage', 'labels', 'start')
+
+    def __init__(self, registry: 'MetricsRegistry', stage: str, labels: Dict):
+        self.registry = registry
+        self.stage = stage
+        self.labels = labels
+
+    def __enter__(self):
+        self.start = time.perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        self.registry.observe(self.stage, time.perf_counter() - self.start, **self.labels)
+        return False
+
+class MetricsRegistry:
+    def __init__(self, buckets: Tuple[float, ...] = DEFAULT_BUCKETS):
+        self.buckets = buckets
+        self._histograms: Dict[Tuple[str, LabelKey], Histogram] = {}
+        self._lock = threading.Lock()
+        self._cycle_started: Optional[float] = None
+        self._cycle_stages: Dict[str, List[float]] = {}
+        self._cycle_slowest: Dict[str, Tuple[float, LabelKey]] = {}
+        self._cycle_companies: Dict[str, float] = {}
+        self.cycles_completed = 0
+        self.last_cycle_seconds = 0.0
+
+    def observe(self, stage: str, seconds: float, **labels):
+        """Record one timing for a stage"""
+        key = tuple(sorted((name, str(value)) for name, value in labels.items() if value is not None))
+        with self._lock:
+            histogram = self._histograms.get((stage, key))
+            if histogram is None:
+                histogram = self._histograms[(stage, key)] = Histogram(self.buckets)
+            histogram.observe(seconds)
+
+            if self._cycle_started is not None:
+                totals = self._cycle_stages.setdefault(stage, [0.0, 0])
+                totals[0] += seconds
+                totals[1] += 1
+                slowest = self._cycle_slowest.get(stage)
+                if slowest is None or seconds > slowest[0]:
+                    self._cycle_slowest[stage] = (seconds, key)
+                company = labels.get('company')
+                if company:
+                    self._cycle_companies[company] = self._cycle_companies.get(company, 0.0) + seconds
+
+    def timed(self, stage: str, **labels) -> _Timer:
+        """Time the enclosed block: `with metrics.timed('fetch', source=..., company=...):`"""
+        return _Timer(self, stage, labels)
+
+    def start_cycle(self):
+        """Begin collecting a per-cycle summary"""
+        with self._lock:
+            self._cycle_started = time.perf_counter()
+            self._cycle_stages = {}
+            self._cycle_slowest = {}
+            self._cycle_companies = {}
+
+    def end_cycle(self) -> str:
+        """Finish the current cycle and return its one-line timing summary"""
+        with self._lock:
+            started = self._cycle_started
+            self._cycle_started = None
+            elapsed = time.perf_counter() - started if started is not None else 0.0
+            self.cycles_completed += 1
+            self.last_cycle_seconds = elapsed
+            stages = dict(self._cycle_stages)
+            slowest = dict(self._cycle_slowest)
+            companies = dict(self._cycle_companies)
+
+        parts = [f"cycle {elapsed:.2f}s"]
+        for stage in sorted(stages, key=lambda s: STAGES.index(s) if s in STAGES else len(STAGES)):
+            total, count = stages[stage]
+            parts.append(f"{stage} {total:.2f}s/{count}")
+        if 'fetch' in slowest:
+            seconds, key = slowest['fetch']
+            where = ' '.join(f"{name}={value}" for name, value in key)
+            parts.append(f"slowest fetch {seconds:.2f}s ({where})")
+        if companies:
+            company = max(companies, key=companies.get)
+            parts.append(f"slowest company {company} {companies[company]:.2f}s")
+        return 'Cycle timing: ' + ', '.join(parts)
+
+    def snapshot(self) -> Dict[str, Dict]:
+        """Totals per stage across all label sets"""
+        with self._lock:
+            summary = {}
+            for (stage, _), histogram in self._histograms.items():
+                totals = summary.setdefault(stage, {'count': 0, 'sum': 0.0})
+                totals['count'] += histogram.count
+                totals['sum'] += histogram.sum
+            return summary
+
+    def render_prometheus(self) -> str:
+        """All histograms in Prometheus text exposition format"""
+        lines = [
+            '# HELP portfolio_stage_duration_seconds Time spent per pipeline stage',
+            '# TYPE portfolio_stage_duration_seconds histogram',
+        ]
+        with self._lock:
+            items = sorted(self._histograms.items())
+            for (stage, key), histogram in items:
+                labels = [('stage', stage)] + list(key)
+                cumulative = 0
+                for bound, count in zip(self.buckets, histogram.counts):
+                    cumulative += count
+                    lines.append(f"portfolio_stage_duration_seconds_bucket{_labels(labels + [('le', repr(bound))])} {cumulative}")
+                lines.append(f"portfolio_stage_duration_seconds_bucket{_labels(labels + [('le', '+Inf')])} {histogram.count}")
+                lines.append(f"portfolio_stage_duration_seconds_sum{_labels(labels)} {histogram.sum:.6f}")
+                lines.append(f"portfolio_stage_duration_seconds_count{_labels(labels)} {histogram.count}")
+
+            lines.extend([
+                '# HELP portfolio_cycles_total Monitoring cycles completed',
+                '# TYPE portfolio_cycles_total counter',
+                f"portfolio_cycles_total {self.cycles_completed}",
+                '# HELP portfolio_last_cycle_seconds Duration of the last monitoring cycle',
+                '# TYPE portfolio_last_cycle_seconds gauge',
+                f"portfolio_last_cycle_seconds {self.last_cycle_seconds:.6f}",
+            ])
+        return '\n'.join(lines) + '\n'
+
+    def reset(self):
+        with self._lock:
+            self._histograms.clear()
+            self.cycles_completed = 0
+            self.last_cycle_seconds = 0.0
+
+def _escape(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+def _labels(pairs: List[Tuple[str, str]]) -> str:
+    return '{' + ','.join(f'{name}="{_escape(value)}"' for name, value in pairs) + '}'
+
+# Process-wide registry used by the monitors, database and alerting
+metrics = MetricsRegistry()
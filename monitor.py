@@ -8,7 +8,7 @@ import argparse
 import logging
 import os
 import sys
-from datetime import datetime
+from datetime import date, datetime, timedelta
 
 # Import our modules
 from news_monitor_complete import CompleteNewsMonitor
@@ -19,10 +19,13 @@ try:
 except Exception:
     SlackAlertSystem = None  # Fallback if module not available
 from database import MentionDatabase
+from metrics import metrics
+from profiling import maybe_profile
 from config_complete import (
     LOG_LEVEL, LOG_FILE, DEMO_MODE, PORTFOLIO_COMPANIES,
     TOTAL_COMPANIES, FUND_I_COMPANIES, ACQUIRED_COMPANIES, ANGEL_COMPANIES
 )
+from config import MONITOR_SHARDS, BACKFILL_DAYS, BACKFILL_WINDOW_DAYS
 
 def setup_logging():
     """Set up logging configuration"""
@@ -44,8 +47,8 @@ def setup_logging():
     logging.getLogger('requests').setLevel(logging.WARNING)
     logging.getLogger('urllib3').setLevel(logging.WARNING)
 
-def run_complete_demo():
-    """Run complete demo with ALL portfolio companies"""
+def run_complete_demo(shards: int = 1):
+    """Run complete demo with ALL portfolio companies (across worker processes when shards > 1)"""
     print("🚀 ScaleX Ventures Portfolio Monitor - COMPLETE DEMO")
     print("=" * 70)
     print(f"✨ Monitoring ALL {TOTAL_COMPANIES} portfolio companies!")
@@ -67,17 +70,26 @@ def run_complete_demo():
     print("\n🔍 Starting complete monitoring cycle...")
     print("-" * 50)
     
+    metrics.start_cycle()
     all_mentions = []
     
-    # Monitor news sources
-    print("\n📰 Monitoring NEWS sources...")
-    news_mentions = news_monitor.monitor_all_companies()
-    all_mentions.extend(news_mentions)
-    
-    # Monitor LinkedIn
-    print("\n💼 Monitoring LINKEDIN sources...")
-    linkedin_mentions = linkedin_monitor.monitor_all_companies()
-    all_mentions.extend(linkedin_mentions)
+    if shards > 1:
+        # Workers fetch and score their share of the companies; this process stores the mentions
+        from sharding import run_sharded
+        print(f"\n📰💼 Monitoring NEWS and LINKEDIN sources on {shards} shards...")
+        news_mentions, linkedin_mentions = run_sharded(
+            [CompleteNewsMonitor, FreeLinkedInMonitor], PORTFOLIO_COMPANIES, db, shards)
+        all_mentions.extend(news_mentions + linkedin_mentions)
+    else:
+        # Monitor news sources
+        print("\n📰 Monitoring NEWS sources...")
+        news_mentions = news_monitor.monitor_all_companies()
+        all_mentions.extend(news_mentions)
+        
+        # Monitor LinkedIn
+        print("\n💼 Monitoring LINKEDIN sources...")
+        linkedin_mentions = linkedin_monitor.monitor_all_companies()
+        all_mentions.extend(linkedin_mentions)
     
     if all_mentions:
         print(f"\n🎉 Found {len(all_mentions)} total new mentions!")
@@ -87,13 +99,17 @@ def run_complete_demo():
         
         # Send alerts (Slack if available, otherwise console)
         if hasattr(alert_system, 'send_slack_alert'):
-            alert_system.send_slack_alert(all_mentions)
+            with metrics.timed('alert', channel='slack'):
+                alert_system.send_slack_alert(all_mentions)
         else:
-            alert_system.send_alerts(all_mentions)
+            with metrics.timed('alert', channel='console'):
+                alert_system.send_alerts(all_mentions)
     else:
         print("\nℹ️  No new mentions found this time")
         print("💡 This is normal - the system is working correctly!")
     
+    print(f"\n⏱️  {metrics.end_cycle()}")
+    
     # Show comprehensive statistics
     stats = db.get_statistics()
     print(f"\n📊 Complete Portfolio Statistics:")
@@ -166,6 +182,47 @@ def run_fund_i_demo():
     print(f"\n✅ Fund I demo completed!")
     print("=" * 60)
 
+def run_backfill(company_names=None, since: date = None, until: date = None,
+                 window_days: int = BACKFILL_WINDOW_DAYS, restart: bool = False):
+    """Fetch the news history of the given companies (default: all) in parallel date windows"""
+    from backfill import Backfill
+    
+    until = until or date.today()
+    since = since or until - timedelta(days=BACKFILL_DAYS)
+    companies = PORTFOLIO_COMPANIES
+    if company_names:
+        wanted = {name.lower() for name in company_names}
+        companies = [c for c in PORTFOLIO_COMPANIES if c['name'].lower() in wanted]
+        unknown = wanted - {c['name'].lower() for c in companies}
+        if unknown:
+            raise ValueError(f"Unknown portfolio companies: {', '.join(sorted(unknown))}")
+    
+    print("🚀 ScaleX Ventures Portfolio Monitor - BACKFILL")
+    print("=" * 60)
+    print(f"🗓️  {since} to {until} in {window_days}-day windows for {len(companies)} companies")
+    print("📰 NewsAPI + Google News (no alerts are sent for historical mentions)")
+    print("=" * 60)
+    
+    db = MentionDatabase()
+    if restart:
+        for company in companies:
+            db.clear_backfill_windows(company['name'])
+    backfill = Backfill(CompleteNewsMonitor(db).engine, window_days)
+    
+    metrics.start_cycle()
+    summary = backfill.run(companies, since, until + timedelta(days=1))
+    
+    print(f"\n📈 Backfilled mentions:")
+    for name, counts in summary.items():
+        failed = f", {counts['failed']} windows to retry" if counts['failed'] else ""
+        print(f"   {name}: {counts['new_mentions']} new ({counts['windows']} windows fetched, "
+              f"{counts['resumed']} already done{failed})")
+    total = sum(counts['new_mentions'] for counts in summary.values())
+    print(f"\n🎉 Stored {total} historical mentions")
+    if any(counts['failed'] for counts in summary.values()):
+        print("💡 Run the same backfill again to retry the failed windows")
+    print(f"\n⏱️  {metrics.end_cycle()}")
+
 def show_complete_portfolio():
     """Show ALL portfolio companies organized by fund"""
     print("🏢 ScaleX Ventures Complete Portfolio")
@@ -252,6 +309,10 @@ COMPLETE PORTFOLIO COMMANDS:
   python3 main_complete.py fund-i       # Monitor Fund I companies only
   python3 main_complete.py portfolio    # Show complete portfolio
   python3 main_complete.py status       # Show current status
+  python3 main_complete.py complete --profile --tracemalloc   # Profile the cycle
+  python3 main_complete.py complete --shards 4   # Spread the companies over 4 processes
+  python3 main_complete.py backfill --company Kuzudb   # Fetch a year of history (resumable)
+  python3 main_complete.py backfill --since 2024-01-01 --window-days 14
 
 This complete version monitors:
 ✅ ALL {TOTAL_COMPANIES} portfolio companies
@@ -264,10 +325,60 @@ This complete version monitors:
     
     parser.add_argument(
         'command',
-        choices=['complete', 'fund-i', 'portfolio', 'status'],
+        choices=['complete', 'fund-i', 'portfolio', 'status', 'backfill'],
         help='Command to execute'
     )
     
+    parser.add_argument(
+        '--profile',
+        action='store_true',
+        help='Profile the monitoring cycle (writes .prof and .collapsed files to PROFILE_DIR)'
+    )
+    
+    parser.add_argument(
+        '--tracemalloc',
+        action='store_true',
+        help='With --profile, also report the top allocation sites'
+    )
+    
+    parser.add_argument(
+        '--shards',
+        type=int,
+        default=MONITOR_SHARDS,
+        help='Worker processes to split the companies across for complete (default: MONITOR_SHARDS; 1 runs in-process)'
+    )
+    
+    parser.add_argument(
+        '--company',
+        action='append',
+        help='Company to backfill (repeatable; default: every portfolio company)'
+    )
+    
+    parser.add_argument(
+        '--since',
+        type=date.fromisoformat,
+        help=f'First day to backfill, YYYY-MM-DD (default: {BACKFILL_DAYS} days before --until)'
+    )
+    
+    parser.add_argument(
+        '--until',
+        type=date.fromisoformat,
+        help='Last day to backfill, YYYY-MM-DD (default: today)'
+    )
+    
+    parser.add_argument(
+        '--window-days',
+        type=int,
+        default=BACKFILL_WINDOW_DAYS,
+        help='Days per backfill window (default: BACKFILL_WINDOW_DAYS)'
+    )
+    
+    parser.add_argument(
+        '--restart',
+        action='store_true',
+        help='Ignore earlier backfill checkpoints and fetch every window again'
+    )
+    
     args = parser.parse_args()
     
     # Set up logging
@@ -283,13 +394,17 @@ This complete version monitors:
     # Execute command
     try:
         if args.command == 'complete':
-            run_complete_demo()
+            with maybe_profile('complete', force=args.profile, trace_allocations=args.tracemalloc):
+                run_complete_demo(args.shards)
         elif args.command == 'fund-i':
-            run_fund_i_demo()
+            with maybe_profile('fund-i', force=args.profile, trace_allocations=args.tracemalloc):
+                run_fund_i_demo()
         elif args.command == 'portfolio':
             show_complete_portfolio()
         elif args.command == 'status':
             show_status()
+        elif args.command == 'backfill':
+            run_backfill(args.company, args.since, args.until, args.window_days, args.restart)
             
     except Exception as e:
         logger.error(f"Unexpected error: {e}")
@@ -0,0 +1,366 @@
+"""
+Concurrent monitoring engine shared by every monitor variant
+Fetches, filters and scores each company's mentions on a worker pool and queues
+them with the database's writer thread (db_writer), which commits them in groups,
+so SQLite only ever sees one writer. Sources that
+accept OR queries are searched with batched keywords planned by query_planner,
+and their results are sorted back out to companies by the relevance filter.
+arun() does the same on an event loop, with the requests in flight as asyncio
+tasks and CPU-bound work and redirect resolution handed to threads
+"""
+
+import logging
+import threading
+from concurrent.futures import Executor, Future, ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta
+from typing import Awaitable, Callable, Dict, Iterable, List, Optional, Tuple
+
+import requests
+
+from circuit_breaker import CircuitBreakers
+from config import (
+    CIRCUIT_BREAKER_ENABLED, INCREMENTAL_FETCH, MONITOR_MAX_WORKERS, MONITOR_MODE, QUERY_BATCHING,
+    QUERY_BATCH_MAX_TERMS
+)
+from database import MentionDatabase
+from db_writer import stored
+from metrics import metrics
+from query_planner import QueryBatch, halves, plan_queries
+from sources import Source, SourceCursor
+from url_canonicalizer import RedirectResolver
+
+logger = logging.getLogger(__name__)
+
+# Batched queries cover several companies, so their cursors are stored under this name
+QUERY_CURSOR_SCOPE = '*'
+# Batched query cursors not saved for this many days belong to queries no longer planned
+STALE_QUERY_CURSOR_DAYS = 7
+
+_textblob_lock = threading.Lock()
+
+def analyze_sentiment(text: str) -> float:
+    """Polarity of text from -1 to 1 using TextBlob"""
+    # TextBlob loads its corpora on import, so it is only paid for when sentiment is computed
+    from textblob import TextBlob
+    try:
+        # The analyzer loads its lexicon lazily on first use, which is not thread-safe
+        with _textblob_lock:
+            return TextBlob(text).sentiment.polarity
+    except Exception as e:
+        logger.warning(f"Sentiment analysis failed: {e}")
+        return 0.0
+
+class MonitorEngine:
+    def __init__(self, db: MentionDatabase, sources: List[Source],
+                 relevance: Optional[Callable[[Dict, Dict], bool]] = None,
+                 lookback_days: Optional[int] = None, max_workers: int = MONITOR_MAX_WORKERS,
+                 resolver: Optional[RedirectResolver] = None,
+                 session: Optional[requests.Session] = None, incremental: bool = INCREMENTAL_FETCH,
+                 batch_queries: bool = QUERY_BATCHING, max_query_terms: int = QUERY_BATCH_MAX_TERMS,
+                 breakers: Optional[CircuitBreakers] = None, mode: str = MONITOR_MODE):
+        if mode not in ('threads', 'async'):
+            raise ValueError(f"Unknown monitor mode '{mode}' (use threads or async)")
+        self.db = db
+        self.sources = sources
+        self.relevance = relevance
+        self.lookback_days = lookback_days
+        self.max_workers = max(1, max_workers)
+        # run() uses a worker pool, or with 'async' runs arun() on a new event loop
+        self.mode = mode
+        self.resolver = resolver or RedirectResolver(db, session=session)
+        # Skip items seen in earlier cycles using cursors persisted per (company, source, keyword)
+        self.incremental = incremental
+        self.batch_queries = batch_queries
+        self.max_query_terms = max(1, max_query_terms)
+        # Failing sources and endpoints are skipped until they recover; state is saved after each run
+        if breakers is None and CIRCUIT_BREAKER_ENABLED:
+            breakers = CircuitBreakers(db)
+        self.breakers = breakers
+        for source in sources:
+            source.breakers = breakers
+
+    def since(self) -> Optional[datetime]:
+        return datetime.now() - timedelta(days=self.lookback_days) if self.lookback_days else None
+
+    def load_cursors(self, company_name: str) -> Dict[str, Dict[str, SourceCursor]]:
+        """Persisted cursors for a company as {source name: {keyword: SourceCursor}}"""
+        cursors: Dict[str, Dict[str, SourceCursor]] = {}
+        for (source, keyword), row in self.db.get_source_cursors(company_name).items():
+            cursors.setdefault(source, {})[keyword] = SourceCursor.from_row(*row)
+        return cursors
+
+    def batched(self, source: Source) -> bool:
+        return self.batch_queries and source.query_limits is not None
+
+    def plan(self, source: Source, companies: List[Dict],
+             cursors: Optional[Dict[str, SourceCursor]] = None) -> List[QueryBatch]:
+        """
+        OR queries covering the source's keywords for the given companies; a query
+        whose cursor is marked split (cut off at the result limit before) is
+        replaced by its halves
+        """
+        # Results of a shared query can only be told apart by the relevance filter
+        combine = len(companies) > 1 and bool(self.relevance and source.filter_relevance)
+        batches = plan_queries([(company, source.keywords(company)) for company in companies],
+                               source.query_limits, self.max_query_terms, combine)
+        return [part for batch in batches for part in self._split(batch, cursors)]
+
+    def _split(self, batch: QueryBatch, cursors: Optional[Dict[str, SourceCursor]]) -> List[QueryBatch]:
+        cursor = cursors.get(batch.query) if cursors else None
+        if cursor is None or not cursor.split or len(batch.terms) < 2:
+            return [batch]
+        cursor.used = True
+        return [part for half in halves(batch) for part in self._split(half, cursors)]
+
+    def collect(self, company: Dict, sources: Optional[Iterable[Source]] = None,
+                cursors: Optional[Dict[str, Dict[str, SourceCursor]]] = None) -> List[Dict]:
+        """
+        Relevant, sentiment-scored mentions of one company from the given sources (default: all)
+        With cursors, items seen in earlier cycles are skipped before any filtering
+        and the cursors are advanced in place
+        """
+        since = self.since()
+        mentions = []
+        for source in sources if sources is not None else self.sources:
+            source_cursors = cursors.setdefault(source.name, {}) if cursors is not None else None
+            if self.batched(source):
+                for batch in self.plan(source, [company], source_cursors):
+                    for item in source.fetch_batch(batch, since, source_cursors):
+                        mentions.extend(self._mentions(source, item, [company]))
+            else:
+                for item in source.fetch(company, since, source_cursors):
+                    mentions.extend(self._mentions(source, item, [company]))
+        return mentions
+
+    def collect_batch(self, source: Source, batch: QueryBatch,
+                      cursors: Optional[Dict[str, SourceCursor]] = None) -> Dict[str, List[Dict]]:
+        """Mentions from one OR query as {company name: mentions}; cursors are keyed by query"""
+        return self.mentions_by_company(source, list(source.fetch_batch(batch, self.since(), cursors)),
+                                        batch.companies)
+
+    def _mentions(self, source: Source, item: Dict, companies: List[Dict]) -> List[Dict]:
+        """Mentions of each company the item is relevant to"""
+        mentions = []
+        sentiment = None
+        for company in companies:
+            if self.relevance and source.filter_relevance:
+                with metrics.timed('relevance', source=source.name, company=company['name']):
+                    relevant = self.relevance(item, company)
+                if not relevant:
+                    continue
+
+            if sentiment is None:
+                with metrics.timed('sentiment', source=source.name, company=company['name']):
+                    sentiment = analyze_sentiment(f"{item['title']} {item['description']}")
+
+            mentions.append({
+                'company_name': company['name'],
+                'title': item['title'],
+                'content': item['description'],
+                'url': item['url'],
+                'source': item['source'],
+                'published_date': item['published_date'],
+                'sentiment_score': sentiment
+            })
+        return mentions
+
+    def store(self, company: Dict, mentions: List[Dict]) -> List[Dict]:
+        """Resolve redirect links, then store mentions; returns the ones that were new"""
+        return stored(self.submit(company, mentions))
+
+    def submit(self, company: Dict, mentions: List[Dict]) -> List[Tuple[Dict, Future]]:
+        """
+        Resolve redirect links, then queue mentions with the database's writer
+        thread; returns (mention, future) pairs, each future giving the new id or None
+        """
+        # Resolve Google News redirect links to the publisher's URL before dedup
+        with metrics.timed('resolve', company=company['name']):
+            self.resolver.resolve_mentions(mentions)
+
+        writer = self.db.get_writer()
+        return [(mention, writer.add_mention(mention)) for mention in mentions]
+
+    def save_cursors(self, company_name: str, cursors: Dict[str, Dict[str, SourceCursor]]):
+        with metrics.timed('db_write', company=company_name):
+            self.db.save_source_cursors(company_name, [
+                (source, keyword, *cursor.to_row())
+                for source, by_keyword in cursors.items()
+                for keyword, cursor in by_keyword.items()
+                if cursor.used and (cursor.published or cursor.split)
+            ])
+
+    def run(self, companies: List[Dict], submit: Optional[Callable[[Dict, List[Dict]], List]] = None) -> List[Dict]:
+        """
+        Monitor companies concurrently, queueing their mentions with the writer
+        thread as each task completes, and return the new ones once they are
+        committed; submit(company, mentions) replaces submit()
+        """
+        if self.mode == 'async':
+            import asyncio
+            return asyncio.run(self.arun(companies, submit=submit))
+
+        per_company, batched, cursors = self._start_run(companies)
+        by_name = {company['name']: company for company in companies}
+        new_counts = {company['name']: 0 for company in companies}
+        failed = set()
+        pending = []
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='monitor') as executor:
+            futures = {}
+            for source in batched:
+                source_cursors = cursors[QUERY_CURSOR_SCOPE].setdefault(source.name, {}) if cursors is not None else None
+                for batch in self.plan(source, companies, source_cursors):
+                    future = executor.submit(self.collect_batch, source, batch, source_cursors)
+                    futures[future] = [company['name'] for company in batch.companies] + [QUERY_CURSOR_SCOPE]
+            if per_company:
+                for company in companies:
+                    future = executor.submit(self._collect_company, company, per_company,
+                                             cursors[company['name']] if cursors is not None else None)
+                    futures[future] = [company['name']]
+
+            for future in as_completed(futures):
+                try:
+                    pending.append((futures[future], self._submit_results(future.result(), by_name, submit)))
+                except Exception as e:
+                    names = ', '.join(name for name in futures[future] if name != QUERY_CURSOR_SCOPE)
+                    logger.error(f"Monitoring failed for {names}: {e}")
+                    failed.update(futures[future])
+
+        all_mentions = self._stored(pending, new_counts, failed)
+        self._finish_run(companies, cursors, failed, new_counts if submit is None else None)
+        return all_mentions
+
+    async def arun(self, companies: List[Dict], client: Optional['AsyncHTTPClient'] = None,
+                   submit: Optional[Callable[[Dict, List[Dict]], List]] = None) -> List[Dict]:
+        """
+        run() on the running event loop: every batched query and every (company,
+        source) pair is a task under one TaskGroup, requests go through client
+        (a new one closed afterwards when not given), parsing, relevance and
+        sentiment run on a worker pool, and redirects are resolved on one thread
+        """
+        # asyncio and the async client are only imported by runs that use them
+        import asyncio
+        from async_http import AsyncHTTPClient
+
+        per_company, batched, cursors = self._start_run(companies)
+        by_name = {company['name']: company for company in companies}
+        new_counts = {company['name']: 0 for company in companies}
+        failed = set()
+        pending = []
+        loop = asyncio.get_running_loop()
+
+        async def task(names: List[str], collect: Awaitable[Dict[str, List[Dict]]]):
+            # Failures stay with their task; the TaskGroup would cancel every other task
+            try:
+                results = await collect
+                pending.append((names, await loop.run_in_executor(resolver, self._submit_results, results,
+                                                                  by_name, submit)))
+            except Exception as e:
+                logger.error(f"Monitoring failed for {', '.join(n for n in names if n != QUERY_CURSOR_SCOPE)}: {e}")
+                failed.update(names)
+
+        owned = client is None
+        client = client or AsyncHTTPClient()
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='monitor') as executor, \
+                ThreadPoolExecutor(max_workers=1, thread_name_prefix='monitor-resolver') as resolver:
+            try:
+                async with asyncio.TaskGroup() as group:
+                    for source in batched:
+                        source_cursors = cursors[QUERY_CURSOR_SCOPE].setdefault(source.name, {}) if cursors is not None else None
+                        for batch in self.plan(source, companies, source_cursors):
+                            names = [company['name'] for company in batch.companies] + [QUERY_CURSOR_SCOPE]
+                            group.create_task(task(names, self.acollect_batch(source, batch, source_cursors,
+                                                                              client, executor)))
+                    for company in companies:
+                        company_cursors = cursors[company['name']] if cursors is not None else None
+                        for source in per_company:
+                            group.create_task(task([company['name']], self.acollect(company, source, company_cursors,
+                                                                                    client, executor)))
+            finally:
+                if owned:
+                    await client.close()
+            all_mentions = await loop.run_in_executor(resolver, self._stored, pending, new_counts, failed)
+
+        self._finish_run(companies, cursors, failed, new_counts if submit is None else None)
+        return all_mentions
+
+    async def acollect(self, company: Dict, source: Source, cursors: Optional[Dict[str, Dict[str, SourceCursor]]],
+                       client: 'AsyncHTTPClient', executor: Executor) -> Dict[str, List[Dict]]:
+        """One company's mentions from one unbatched source, as {company name: mentions}"""
+        import asyncio
+        source_cursors = cursors.setdefault(source.name, {}) if cursors is not None else None
+        items = await source.afetch(company, self.since(), source_cursors, client, executor)
+        return await asyncio.get_running_loop().run_in_executor(
+            executor, self.mentions_by_company, source, items, [company])
+
+    async def acollect_batch(self, source: Source, batch: QueryBatch, cursors: Optional[Dict[str, SourceCursor]],
+                             client: 'AsyncHTTPClient', executor: Executor) -> Dict[str, List[Dict]]:
+        """collect_batch() for the asyncio cycle"""
+        import asyncio
+        items = await source.afetch_batch(batch, self.since(), cursors, client, executor)
+        return await asyncio.get_running_loop().run_in_executor(
+            executor, self.mentions_by_company, source, items, batch.companies)
+
+    def mentions_by_company(self, source: Source, items: List[Dict], companies: List[Dict]) -> Dict[str, List[Dict]]:
+        """Relevant, sentiment-scored mentions of raw items as {company name: mentions}"""
+        mentions: Dict[str, List[Dict]] = {company['name']: [] for company in companies}
+        for item in items:
+            for mention in self._mentions(source, item, companies):
+                mentions[mention['company_name']].append(mention)
+        return mentions
+
+    def _start_run(self, companies: List[Dict]):
+        """Sources searched per company, sources searched by batched query, and the run's cursors"""
+        per_company = [source for source in self.sources if not self.batched(source)]
+        batched = [source for source in self.sources if self.batched(source)]
+        cursors = None
+        if self.incremental:
+            cursors = {company['name']: self.load_cursors(company['name']) for company in companies}
+            if batched:
+                cursors[QUERY_CURSOR_SCOPE] = self.load_cursors(QUERY_CURSOR_SCOPE)
+        return per_company, batched, cursors
+
+    def _submit_results(self, results: Dict[str, List[Dict]], by_name: Dict[str, Dict],
+                        submit: Optional[Callable] = None) -> List[Tuple[Dict, Future]]:
+        return [pair for name, mentions in results.items() for pair in (submit or self.submit)(by_name[name], mentions)]
+
+    def _stored(self, pending: List[Tuple[List[str], List[Tuple[Dict, Future]]]], new_counts: Dict[str, int],
+                failed: set) -> List[Dict]:
+        """New mentions of every task once the writer has committed them"""
+        all_mentions = []
+        for names, submitted in pending:
+            try:
+                new_mentions = stored(submitted)
+            except Exception as e:
+                logger.error(f"Storing mentions failed for {', '.join(n for n in names if n != QUERY_CURSOR_SCOPE)}: {e}")
+                failed.update(names)
+                continue
+            for mention in new_mentions:
+                new_counts[mention['company_name']] += 1
+            all_mentions.extend(new_mentions)
+        return all_mentions
+
+    def _finish_run(self, companies: List[Dict], cursors: Optional[Dict], failed: set,
+                    new_counts: Optional[Dict[str, int]]):
+        if self.breakers is not None:
+            self.breakers.save()
+        for source in self.sources:
+            source.save()
+        # Saved last, so a failed cycle fetches the same items again next time
+        if cursors is not None:
+            for name, company_cursors in cursors.items():
+                if name not in failed:
+                    self.save_cursors(name, company_cursors)
+            # Every query planned this cycle was just saved, so older rows are from earlier plans
+            if QUERY_CURSOR_SCOPE in cursors and QUERY_CURSOR_SCOPE not in failed:
+                with metrics.timed('db_write', company=QUERY_CURSOR_SCOPE):
+                    self.db.delete_stale_source_cursors(QUERY_CURSOR_SCOPE, STALE_QUERY_CURSOR_DAYS)
+        # A custom submit decides which mentions are new, so it reports the counts
+        if new_counts is None:
+            return
+        for company in companies:
+            if company['name'] not in failed:
+                logger.info(f"Found {new_counts[company['name']]} new mentions for {company['name']}")
+
+    def _collect_company(self, company: Dict, sources: List[Source],
+                         cursors: Optional[Dict[str, Dict[str, SourceCursor]]]) -> Dict[str, List[Dict]]:
+        return {company['name']: self.collect(company, sources, cursors)}
@@ -0,0 +1,207 @@
+"""
+On-demand profiling of monitoring cycles
+Wraps a cycle in cProfile and a stack sampler, writing a .prof file and a
+collapsed-stack file (flamegraph.pl / speedscope input) per run, plus the top
+allocation sites when tracemalloc is requested
+"""
+
+import cProfile
+import logging
+import os
+import shutil
+import signal
+import subprocess
+import sys
+import threading
+import time
+import tracemalloc
+from contextlib import contextmanager
+from datetime import datetime
+from typing import Dict, Optional
+
+from config import (
+    PROFILE_DIR, PROFILE_TRIGGER_FILE, PROFILE_SAMPLER,
+    PROFILE_SAMPLE_INTERVAL_MS, PROFILE_TRACEMALLOC_TOP
+)
+
+logger = logging.getLogger(__name__)
+
+_requested: Optional[Dict] = None
+_requested_lock = threading.Lock()
+
+class StackSampler:
+    """Samples every thread's stack from a background thread via sys._current_frames"""
+
+    def __init__(self, interval_ms: float = PROFILE_SAMPLE_INTERVAL_MS):
+        self.interval = interval_ms / 1000
+        self.counts: Dict[str, int] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self):
+        self._thread = threading.Thread(target=self._run, name='stack-sampler', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        if self._thread:
+            self._thread.join()
+
+    def _run(self):
+        own_id = threading.get_ident()
+        while not self._stop.wait(self.interval):
+            names = {thread.ident: thread.name for thread in threading.enumerate()}
+            for thread_id, frame in sys._current_frames().items():
+                if thread_id == own_id:
+                    continue
+                stack = []
+                while frame is not None:
+                    code = frame.f_code
+                    stack.append(f"{code.co_name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})")
+                    frame = frame.f_back
+                stack.append(names.get(thread_id, str(thread_id)))
+                key = ';'.join(reversed(stack))
+                self.counts[key] = self.counts.get(key, 0) + 1
+
+    def write_collapsed(self, path: str):
+        with open(path, 'w') as f:
+            for stack, count in sorted(self.counts.items()):
+                f.write(f"{stack} {count}\n")
+
+class PySpySampler:
+    """Samples this process with py-spy, which sees through C extensions and the GIL"""
+
+    def __init__(self, output_path: str, interval_ms: float = PROFILE_SAMPLE_INTERVAL_MS):
+        self.output_path = output_path
+        self.rate = max(1, int(1000 / interval_ms))
+        self.process: Optional[subprocess.Popen] = None
+
+    def start(self) -> bool:
+        """Attach py-spy; False when it cannot attach (e.g. no ptrace permission)"""
+        self.process = subprocess.Popen(
+            ['py-spy', 'record', '--pid', str(os.getpid()), '--format', 'raw',
+             '--rate', str(self.rate), '--threads', '--output', self.output_path],
+            stdout=subprocess.DEVNULL, stderr=subprocess.PIPE
+        )
+        time.sleep(0.3)
+        if self.process.poll() is not None:
+            error = self.process.stderr.read().decode(errors='replace').strip()
+            logger.warning(f"py-spy could not attach, using built-in sampler: {error}")
+            return False
+        return True
+
+    def stop(self):
+        if self.process and self.process.poll() is None:
+            self.process.send_signal(signal.SIGINT)
+            try:
+                self.process.wait(timeout=30)
+            except subprocess.TimeoutExpired:
+                self.process.kill()
+
+def request_profile(trace_allocations: bool = False, trigger_file: str = PROFILE_TRIGGER_FILE):
+    """
+    Ask for the next monitoring cycle to be profiled
+    Writes the trigger file so a scheduler in another process picks it up too
+    """
+    global _requested
+    with _requested_lock:
+        _requested = {'trace_allocations': trace_allocations}
+    with open(trigger_file, 'w') as f:
+        f.write('tracemalloc\n' if trace_allocations else 'profile\n')
+    logger.info("Profiling requested for the next monitoring cycle")
+
+def take_profile_request(trigger_file: str = PROFILE_TRIGGER_FILE) -> Optional[Dict]:
+    """Consume a pending profiling request from the API, trigger file or PROFILE_NEXT_CYCLE"""
+    global _requested
+    with _requested_lock:
+        request = _requested
+        _requested = None
+
+    if os.path.exists(trigger_file):
+        try:
+            with open(trigger_file) as f:
+                contents = f.read()
+            os.remove(trigger_file)
+        except OSError:
+            contents = ''
+        request = request or {}
+        request['trace_allocations'] = request.get('trace_allocations') or 'tracemalloc' in contents
+
+    # The environment variable applies once, to the first cycle after startup
+    env_value = os.environ.pop('PROFILE_NEXT_CYCLE', '').strip().lower()
+    if env_value and env_value not in ('0', 'false', 'no'):
+        request = request or {}
+        request['trace_allocations'] = request.get('trace_allocations') or env_value == 'tracemalloc'
+
+    return request
+
+@contextmanager
+def profile_cycle(label: str = 'cycle', output_dir: str = PROFILE_DIR,
+                  trace_allocations: bool = False, sampler: str = PROFILE_SAMPLER):
+    """Profile the enclosed block and write its .prof, .collapsed and allocation reports"""
+    os.makedirs(output_dir, exist_ok=True)
+    base = os.path.join(output_dir, f"{label}-{datetime.now().strftime('%Y%m%d-%H%M%S')}")
+    outputs = {'prof': f"{base}.prof", 'collapsed': f"{base}.collapsed"}
+
+    spy = None
+    if sampler in ('auto', 'py-spy') and shutil.which('py-spy'):
+        spy = PySpySampler(outputs['collapsed'])
+        if not spy.start():
+            spy = None
+    elif sampler == 'py-spy':
+        logger.warning("py-spy not found on PATH, using built-in sampler")
+    builtin = None
+    if spy is None:
+        builtin = StackSampler()
+        builtin.start()
+
+    if trace_allocations:
+        tracemalloc.start(10)
+        baseline = tracemalloc.take_snapshot()
+
+    profiler = cProfile.Profile()
+    started = time.perf_counter()
+    profiler.enable()
+    try:
+        yield outputs
+    finally:
+        profiler.disable()
+        elapsed = time.perf_counter() - started
+
+        if spy:
+            spy.stop()
+        if builtin:
+            builtin.stop()
+            builtin.write_collapsed(outputs['collapsed'])
+        profiler.dump_stats(outputs['prof'])
+
+        if trace_allocations:
+            snapshot = tracemalloc.take_snapshot()
+            tracemalloc.stop()
+            outputs['allocations'] = f"{base}.alloc.txt"
+            _write_allocations(snapshot.compare_to(baseline, 'lineno'), outputs['allocations'])
+
+        logger.info(f"Profiled {label} in {elapsed:.2f}s: " + ', '.join(outputs.values()))
+
+def _write_allocations(diffs, path: str, top: int = PROFILE_TRACEMALLOC_TOP):
+    """Write and log the allocation sites that grew the most during the cycle"""
+    lines = [f"Top {top} allocation sites by growth during the cycle"]
+    for diff in diffs[:top]:
+        frame = diff.traceback[0]
+        lines.append(f"{diff.size_diff / 1024:+10.1f} KiB {diff.count_diff:+8d} blocks  {frame.filename}:{frame.lineno}")
+    with open(path, 'w') as f:
+        f.write('\n'.join(lines) + '\n')
+    for line in lines[:11]:
+        logger.info(line)
+
+@contextmanager
+def maybe_profile(label: str = 'cycle', force: bool = False, trace_allocations: bool = False):
+    """Profile the enclosed cycle when forced or when a profiling request is pending"""
+    request = take_profile_request()
+    if not force and request is None:
+        yield None
+        return
+
+    trace_allocations = trace_allocations or bool(request and request.get('trace_allocations'))
+    with profile_cycle(label, trace_allocations=trace_allocations) as outputs:
+        yield outputs
@@ -0,0 +1,208 @@
+"""
+SQLite query instrumentation for the portfolio monitoring system
+Times every statement run through connect(), keeps per-statement totals and
+logs statements slower than SLOW_QUERY_MS together with their EXPLAIN QUERY PLAN
+"""
+
+import logging
+import re
+import sqlite3
+import threading
+import time
+from collections import deque
+from functools import lru_cache
+from datetime import datetime
+from typing import Deque, Dict, List, Optional
+
+from config import SLOW_QUERY_MS, SLOW_QUERY_LOG_SIZE
+
+logger = logging.getLogger(__name__)
+
+_WHITESPACE = re.compile(r'\s+')
+_PLACEHOLDER_LIST = re.compile(r'\?(\s*,\s*\?)+')
+
+# Statements EXPLAIN QUERY PLAN says nothing useful about
+_NO_PLAN_PREFIXES = ('PRAGMA', 'CREATE', 'DROP', 'ALTER', 'BEGIN', 'COMMIT', 'ROLLBACK', 'EXPLAIN', 'VACUUM', 'ANALYZE')
+
+@lru_cache(maxsize=1024)
+def normalize_sql(sql: str) -> str:
+    """Collapse whitespace and IN (?, ?, ...) lists so batches of any size share a key"""
+    return _PLACEHOLDER_LIST.sub('?, ...', _WHITESPACE.sub(' ', sql).strip())
+
+class StatementStats:
+    __slots__ = ('sql', 'count', 'total', 'max', 'slow')
+
+    def __init__(self, sql: str):
+        self.sql = sql
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+        self.slow = 0
+
+    def to_dict(self) -> Dict:
+        return {
+            'sql': self.sql,
+            'count': self.count,
+            'total_ms': round(self.total * 1000, 3),
+            'avg_ms': round(self.total * 1000 / self.count, 3) if self.count else 0.0,
+            'max_ms': round(self.max * 1000, 3),
+            'slow': self.slow,
+        }
+
+class QueryLog:
+    """Per-statement timing totals plus a ring buffer of recent slow statements"""
+
+    def __init__(self, slow_ms: float = SLOW_QUERY_MS, keep: int = SLOW_QUERY_LOG_SIZE):
+        self.slow_seconds = slow_ms / 1000 if slow_ms > 0 else None
+        self._stats: Dict[str, StatementStats] = {}
+        self._slow: Deque[Dict] = deque(maxlen=keep)
+        self._lock = threading.Lock()
+
+    def record(self, key: str, seconds: float, new_execution: bool, running: float) -> bool:
+        """
+        Add time spent on one execution of a statement
+        Returns True when this call pushed the execution over the slow threshold
+        """
+        with self._lock:
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = StatementStats(key)
+            if new_execution:
+                stats.count += 1
+            stats.total += seconds
+            stats.max = max(stats.max, running)
+            crossed = (self.slow_seconds is not None and running >= self.slow_seconds
+                       and running - seconds < self.slow_seconds)
+            if crossed:
+                stats.slow += 1
+            return crossed
+
+    def log_slow(self, key: str, seconds: float, parameters, plan: List[str]):
+        entry = {
+            'sql': key,
+            'ms': round(seconds * 1000, 3),
+            'parameters': repr(parameters)[:200],
+            'plan': plan,
+            'at': datetime.now().isoformat(timespec='seconds'),
+        }
+        with self._lock:
+            self._slow.append(entry)
+        logger.warning(f"Slow query ({entry['ms']:.1f}ms): {key} params={entry['parameters']}"
+                       + ''.join(f"\n    {line}" for line in plan))
+
+    def snapshot(self, limit: int = 50) -> Dict:
+        """Statements ordered by total time, and the most recent slow ones first"""
+        with self._lock:
+            statements = sorted(self._stats.values(), key=lambda s: s.total, reverse=True)
+            return {
+                'slow_query_ms': self.slow_seconds * 1000 if self.slow_seconds is not None else None,
+                'statements': [s.to_dict() for s in statements[:limit]],
+                'slow_queries': list(reversed(self._slow)),
+            }
+
+    def reset(self):
+        with self._lock:
+            self._stats.clear()
+            self._slow.clear()
+
+# Process-wide query log shared by MentionDatabase and the Flask apps
+query_log = QueryLog()
+
+def explain(conn: sqlite3.Connection, sql: str, parameters=()) -> List[str]:
+    """EXPLAIN QUERY PLAN for a statement, one indented line per plan node"""
+    if not sql or sql.lstrip().upper().startswith(_NO_PLAN_PREFIXES):
+        return []
+    try:
+        rows = sqlite3.Cursor(conn).execute(f"EXPLAIN QUERY PLAN {sql}", parameters).fetchall()
+    except sqlite3.Error as e:
+        return [f"(no plan: {e})"]
+
+    depth = {0: -1}
+    lines = []
+    for node_id, parent, _, detail in rows:
+        depth[node_id] = depth.get(parent, -1) + 1
+        lines.append('  ' * depth[node_id] + detail)
+    return lines
+
+class TimedCursor(sqlite3.Cursor):
+    """
+    Cursor that times execute plus the fetches that follow it
+    SQLite does most of a SELECT's work while rows are stepped, so fetch time is
+    charged to the statement that produced the rows
+    """
+
+    _key: Optional[str] = None
+    _sql: str = ''
+    _parameters = ()
+    _running = 0.0
+
+    def _charge(self, seconds: float, new_execution: bool = False):
+        self._running += seconds
+        if query_log.record(self._key, seconds, new_execution, self._running):
+            query_log.log_slow(self._key, self._running, self._parameters,
+                               explain(self.connection, self._sql, self._parameters))
+
+    def execute(self, sql, parameters=()):
+        self._key, self._sql, self._parameters, self._running = normalize_sql(sql), sql, parameters, 0.0
+        start = time.perf_counter()
+        try:
+            return super().execute(sql, parameters)
+        finally:
+            self._charge(time.perf_counter() - start, new_execution=True)
+
+    def executemany(self, sql, seq_of_parameters):
+        # No single parameter set to explain a batch with, so batches are logged without a plan
+        self._key, self._sql, self._parameters, self._running = normalize_sql(sql), '', (), 0.0
+        start = time.perf_counter()
+        try:
+            return super().executemany(sql, seq_of_parameters)
+        finally:
+            self._charge(time.perf_counter() - start, new_execution=True)
+
+    def fetchone(self):
+        start = time.perf_counter()
+        try:
+            return super().fetchone()
+        finally:
+            if self._key is not None:
+                self._charge(time.perf_counter() - start)
+
+    def fetchmany(self, size=None):
+        start = time.perf_counter()
+        try:
+            return super().fetchmany(self.arraysize if size is None else size)
+        finally:
+            if self._key is not None:
+                self._charge(time.perf_counter() - start)
+
+    def __next__(self):
+        start = time.perf_counter()
+        try:
+            return super().__next__()
+        finally:
+            if self._key is not None:
+                self._charge(time.perf_counter() - start)
+
+    def fetchall(self):
+        start = time.perf_counter()
+        try:
+            return super().fetchall()
+        finally:
+            if self._key is not None:
+                self._charge(time.perf_counter() - start)
+
+class TimedConnection(sqlite3.Connection):
+    """Connection whose cursors, including those behind conn.execute(), are timed"""
+
+    def cursor(self, factory=TimedCursor):
+        return super().cursor(factory)
+
+    def execute(self, sql, parameters=()):
+        return self.cursor().execute(sql, parameters)
+
+    def executemany(self, sql, seq_of_parameters):
+        return self.cursor().executemany(sql, seq_of_parameters)
+
+def connect(db_path: str, **kwargs) -> sqlite3.Connection:
+    """sqlite3.connect with every statement timed into query_log"""
+    return sqlite3.connect(db_path, factory=TimedConnection, **kwargs)
@@ -0,0 +1,97 @@
+"""
+Query planner combining keyword searches into boolean OR queries
+Packs each company's keywords, and where the relevance filter can tell the
+results apart the keywords of several companies, into as few provider queries as
+fit within the provider's query-length limits
+"""
+
+from dataclasses import dataclass
+from typing import Dict, List, Optional, Sequence, Tuple
+
+@dataclass(frozen=True)
+class QueryLimits:
+    """Provider limits on one search query"""
+    max_length: int
+    # Words (terms and operators) the provider reads before ignoring the rest
+    max_words: Optional[int] = None
+    # Most results one query returns, however many keywords it ORs together
+    max_results: int = 100
+
+@dataclass
+class QueryBatch:
+    """One OR query and the companies whose keywords it covers"""
+    terms: List[str]
+    companies: List[Dict]
+
+    @property
+    def query(self) -> str:
+        return or_query(self.terms)
+
+    @property
+    def label(self) -> str:
+        """Company label for metrics"""
+        return '+'.join(company['name'] for company in self.companies)
+
+def query_term(keyword: str) -> str:
+    """A keyword as one OR operand; multi-word keywords keep their all-words-match meaning"""
+    keyword = ' '.join(keyword.split())
+    return f"({keyword})" if ' ' in keyword else keyword
+
+def or_query(terms: Sequence[str]) -> str:
+    """Terms joined into a boolean OR query (a single term is left as it is)"""
+    if len(terms) == 1:
+        return terms[0]
+    return ' OR '.join(query_term(term) for term in terms)
+
+def _fits(terms: Sequence[str], limits: QueryLimits, max_terms: int) -> bool:
+    if len(terms) > max_terms:
+        return False
+    query = or_query(terms)
+    return len(query) <= limits.max_length and (limits.max_words is None or len(query.split()) <= limits.max_words)
+
+def _pack(terms: List[str], limits: QueryLimits, max_terms: int) -> List[List[str]]:
+    """Split one company's terms into runs that each fit a query, keeping their order"""
+    runs: List[List[str]] = []
+    for term in terms:
+        if runs and _fits(runs[-1] + [term], limits, max_terms):
+            runs[-1].append(term)
+        else:
+            runs.append([term])
+    return runs
+
+def plan_queries(groups: Sequence[Tuple[Dict, List[str]]], limits: QueryLimits,
+                 max_terms: int, combine_companies: bool = False) -> List[QueryBatch]:
+    """
+    OR queries covering every (company, keywords) group
+    Each company's keywords are packed together first; with combine_companies,
+    companies whose keywords fit in one query are then packed into shared queries
+    (first fit, largest first). A company is never split across shared queries
+    """
+    batches: List[QueryBatch] = []
+    whole: List[Tuple[Dict, List[str]]] = []
+    for company, keywords in groups:
+        keywords = list(dict.fromkeys(keywords))
+        if not keywords:
+            continue
+        runs = _pack(keywords, limits, max_terms)
+        if combine_companies and len(runs) == 1:
+            whole.append((company, runs[0]))
+        else:
+            batches.extend(QueryBatch(run, [company]) for run in runs)
+
+    shared: List[QueryBatch] = []
+    for company, terms in sorted(whole, key=lambda group: len(or_query(group[1])), reverse=True):
+        for batch in shared:
+            combined = batch.terms + [term for term in terms if term not in batch.terms]
+            if _fits(combined, limits, max_terms):
+                batch.terms = combined
+                batch.companies.append(company)
+                break
+        else:
+            shared.append(QueryBatch(list(terms), [company]))
+    return batches + shared
+
+def halves(batch: QueryBatch) -> List[QueryBatch]:
+    """The two queries an OR query cut off at the result limit is split into, each for all its companies"""
+    half = len(batch.terms) // 2
+    return [QueryBatch(batch.terms[:half], batch.companies), QueryBatch(batch.terms[half:], batch.companies)]
@@ -0,0 +1,252 @@
+"""
+Relevance filters deciding whether an article is about a portfolio company
+Each filter takes an article ({'title', 'description'}) and a company entry from
+PORTFOLIO_COMPANIES; the monitors pick one by name from RELEVANCE_FILTERS
+"""
+
+import re
+from typing import Callable, Dict
+
+# Identifiers specific enough that a plain substring match is a mention
+SPECIFIC_IDENTIFIERS = {
+    'vectroid', 'kuzudb', 'finchnow', 'buluttan', 'opnova', 'hyperbee',
+    'ubicloud', 'icosacomputing', 'kondukto', 'peaka',
+    'flowla', 'figopara', 'altogic', 'atlas-robotics', 'upstash',
+    'locomation', 'invidyo', 'hipporello', 'cerebra', 'genomize', 'genialis',
+    'quantive', 'thundra', 'cybeats', 'resmo', 'datarow'
+}
+
+def _article_text(article: Dict):
+    title = (article.get('title') or '').lower()
+    content = (article.get('description') or article.get('content') or '').lower()
+    return title, content
+
+def keyword_relevance(article: Dict, company: Dict) -> bool:
+    """Company name or any keyword appears in the title or content"""
+    title, content = _article_text(article)
+
+    # Check if company name appears in title or content
+    company_name_lower = company['name'].lower()
+    if company_name_lower in title or company_name_lower in content:
+        return True
+
+    # Check for other relevant keywords
+    for keyword in company['keywords']:
+        if keyword.lower() in title or keyword.lower() in content:
+            return True
+
+    return False
+
+def _company_specific_filter(text: str, company: Dict) -> bool:
+    """Company-specific filtering to remove false positives"""
+    text_lower = text.lower()
+    company_name = company['name'].lower()
+
+    # Finch-specific filters
+    if company_name == 'finch':
+        # Exclude if it's about people with Finch as last name
+        person_indicators = [
+            'obituary', 'died', 'death', 'funeral', 'memorial',
+            'birthday', 'anniversary', 'wedding', 'married',
+            'graduated', 'student', 'teacher', 'professor',
+            'mayor', 'politician', 'election', 'candidate',
+            'chris finch', 'beth finch', 'tess finch', 'spencer finch',
+            'christine finch', 'evelyn finch', 'elisabeth finch',
+            'real estate agent', 'coach', 'athlete', 'player',
+            'timberwolves', 'nba', 'basketball', 'sports'
+        ]
+
+        for indicator in person_indicators:
+            if indicator in text_lower:
+                return False
+
+        # Only include if it has business/tech context
+        business_keywords = [
+            'app', 'platform', 'software', 'startup', 'company',
+            'venue marketing', 'ai-powered', 'technology', 'funding'
+        ]
+
+        has_business_context = any(keyword in text_lower for keyword in business_keywords)
+        if not has_business_context:
+            return False
+
+    # Cerebra-specific filters (exclude cerebral palsy mentions)
+    if company_name == 'cerebra':
+        medical_indicators = [
+            'cerebral palsy', 'cerebral', 'patient', 'medical',
+            'hospital', 'treatment', 'therapy', 'disability',
+            'palsy', 'brain injury', 'neurological'
+        ]
+
+        for indicator in medical_indicators:
+            if indicator in text_lower:
+                return False
+
+        # Only include if it has AI/tech context
+        ai_keywords = [
+            'ai', 'artificial intelligence', 'machine learning',
+            'computer vision', 'startup', 'funding', 'technology'
+        ]
+
+        has_ai_context = any(keyword in text_lower for keyword in ai_keywords)
+        if not has_ai_context:
+            return False
+
+    return True
+
+def _additional_relevance_check(text: str, company: Dict) -> bool:
+    """Additional checks to ensure the mention is relevant"""
+    text_lower = text.lower()
+
+    # Exclude common false positives
+    false_positives = [
+        'recipe', 'cooking', 'food blog', 'restaurant menu',
+        'weather forecast', 'entertainment news', 'movie review',
+        'zelda', 'gaming', 'video game', 'nintendo'
+    ]
+
+    for fp in false_positives:
+        if fp in text_lower:
+            return False
+
+    # Check for business/tech context indicators
+    business_indicators = [
+        'startup', 'company', 'business', 'technology', 'tech',
+        'funding', 'investment', 'venture', 'innovation',
+        'platform', 'software', 'service', 'solution', 'ai',
+        'artificial intelligence', 'machine learning', 'saas'
+    ]
+
+    for indicator in business_indicators:
+        if indicator in text_lower:
+            return True
+
+    return False  # Default to excluding if no clear business context
+
+def business_relevance(article: Dict, company: Dict) -> bool:
+    """Keyword match that also requires business context and passes company-specific filters"""
+    title, content = _article_text(article)
+    full_text = title + ' ' + content
+
+    # Company-specific false positive filtering
+    if not _company_specific_filter(full_text, company):
+        return False
+
+    # Check if company name appears in title or content
+    company_name_lower = company['name'].lower()
+    if company_name_lower in title or company_name_lower in content:
+        # Additional relevance check for company name mentions
+        if _additional_relevance_check(full_text, company):
+            return True
+
+    # Check for other relevant keywords
+    for keyword in company['keywords']:
+        if keyword.lower() in title or keyword.lower() in content:
+            # Additional relevance check to reduce false positives
+            if _additional_relevance_check(full_text, company):
+                return True
+
+    return False
+
+def portfolio_relevance(article: Dict, company: Dict) -> bool:
+    """Whole-word company name or specific identifier, with rules for generically named companies"""
+    title, content = _article_text(article)
+    full_text = f"{title} {content}"
+
+    # Special handling for problematic companies that have generic names (check first!)
+    if company['name'] == 'Finch':
+        # Exclude if it's about people with Finch as last name
+        person_indicators = [
+            'obituary', 'died', 'death', 'funeral', 'memorial',
+            'birthday', 'anniversary', 'wedding', 'married',
+            'graduated', 'student', 'teacher', 'professor',
+            'mayor', 'politician', 'election', 'candidate',
+            'chris finch', 'beth finch', 'tess finch', 'spencer finch',
+            'christine finch', 'evelyn finch', 'elisabeth finch',
+            'real estate agent', 'coach', 'athlete', 'player',
+            'timberwolves', 'nba', 'basketball', 'sports',
+            'olden polynice', 'grey\'s anatomy'
+        ]
+
+        for indicator in person_indicators:
+            if indicator in full_text:
+                return False
+
+        # Only include if it has business/tech context
+        business_keywords = [
+            'app', 'platform', 'software', 'startup', 'company',
+            'venue marketing', 'ai-powered', 'technology', 'funding',
+            'finch app', 'self care', 'productivity'
+        ]
+
+        has_business_context = any(keyword in full_text for keyword in business_keywords)
+        if not has_business_context:
+            return False
+
+    if company['name'] == 'Cerebra':
+        # Exclude cerebral palsy and medical mentions
+        medical_indicators = [
+            'cerebral palsy', 'brain injury', 'palsy',
+            'patient', 'medical', 'hospital', 'therapy', 'disability',
+            'neurological', 'treatment', 'delivery robot', 'mobility scooter',
+            'cerebral approach', 'cerebral arteries'
+        ]
+
+        for indicator in medical_indicators:
+            if indicator in full_text:
+                return False
+
+        # Only include if it has AI/tech context
+        ai_keywords = [
+            'ai', 'artificial intelligence', 'machine learning',
+            'computer vision', 'startup', 'funding', 'technology',
+            'ipo', 'stock', 'nvidia', 'chipmaker'
+        ]
+
+        has_ai_context = any(keyword in full_text for keyword in ai_keywords)
+        if not has_ai_context:
+            return False
+
+    if company['name'] == 'Coqui':
+        # Only match if it's clearly about the AI company, not frogs
+        tech_indicators = ['ai', 'artificial intelligence', 'text-to-speech', 'tts', 'voice', 'speech', 'generative', 'coqui.ai']
+        if any(indicator in full_text for indicator in tech_indicators):
+            return True
+        return False
+
+    if company['name'] == 'The Blue Dot':
+        # Exclude Bluedot Living magazine articles (completely different company)
+        if 'bluedotliving.com' in full_text or 'bluedot living' in full_text:
+            return False
+
+        # Only match if it's clearly about the company, not Android blue dots
+        # Check for negative indicators (Android, text messages, etc.)
+        negative_indicators = ['android', 'text message', 'text messages', 'message', 'notification', 'unread']
+        if any(indicator in full_text for indicator in negative_indicators):
+            return False
+
+        # Check for positive indicators (company-related terms)
+        company_indicators = ['thebluedot', 'thebluedot.co', 'bluedot', 'charging', 'electric car', 'expense management', 'fleet', 'ev charging']
+        if any(indicator in full_text for indicator in company_indicators):
+            return True
+        return False
+
+    # Use word boundaries to ensure exact company name match
+    company_pattern = r'\b' + re.escape(company['name'].lower()) + r'\b'
+    if re.search(company_pattern, title) or re.search(company_pattern, content):
+        return True
+
+    # Check for very specific company identifiers (domain names, exact product names)
+    for kw in company['keywords']:
+        kw_lower = kw.lower()
+        # Only include very specific identifiers that are clearly company-related
+        if ('.com' in kw_lower or kw_lower in SPECIFIC_IDENTIFIERS) and kw_lower in full_text:
+            return True
+
+    return False
+
+RELEVANCE_FILTERS: Dict[str, Callable[[Dict, Dict], bool]] = {
+    'keyword': keyword_relevance,
+    'business': business_relevance,
+    'portfolio': portfolio_relevance,
+}
@@ -16,7 +16,11 @@ from news_monitor import NewsMonitor
 from linkedin_monitor import LinkedInMonitor
 from alerts import AlertSystem
 from database import MentionDatabase
-from config import CHECK_INTERVAL_MINUTES
+from metrics import metrics
+from profiling import maybe_profile
+from config import (
+    CHECK_INTERVAL_MINUTES, ALERT_DISPATCH_INTERVAL_SECONDS, MONITOR_MODE, MONITOR_SHARDS, PORTFOLIO_COMPANIES
+)
 
 logger = logging.getLogger(__name__)
 
@@ -28,6 +32,13 @@ class PortfolioMonitorScheduler:
         self.alert_system = AlertSystem(self.db)
         self.running = False
         self.scheduler_thread = None
+        # In async mode cycles run on the scheduler's own event loop, which keeps one
+        # HTTP client (and its connections) across cycles
+        self.loop = None
+        self.http_client = None
+        if MONITOR_MODE == 'async' and MONITOR_SHARDS <= 1:
+            import asyncio
+            self.loop = asyncio.new_event_loop()
         
         # Set up signal handlers for graceful shutdown
         signal.signal(signal.SIGINT, self._signal_handler)
@@ -40,29 +51,45 @@ class PortfolioMonitorScheduler:
         sys.exit(0)
     
     def run_monitoring_cycle(self):
+        """Run a complete monitoring cycle, profiled when a profiling request is pending"""
+        with maybe_profile('scheduler-cycle'):
+            self._run_monitoring_cycle()
+    
+    def _run_monitoring_cycle(self):
         """Run a complete monitoring cycle"""
         try:
             logger.info("=" * 50)
             logger.info("Starting monitoring cycle")
             logger.info(f"Timestamp: {datetime.now().strftime('%Y-%m-%d %H:%M:%S')}")
             
+            metrics.start_cycle()
             all_new_mentions = []
             
-            # Monitor news sources
-            logger.info("Monitoring news sources...")
-            news_mentions = self.news_monitor.monitor_all_companies()
-            all_new_mentions.extend(news_mentions)
-            
-            # Monitor LinkedIn
-            logger.info("Monitoring LinkedIn...")
-            linkedin_mentions = self.linkedin_monitor.monitor_all_companies()
-            all_new_mentions.extend(linkedin_mentions)
+            if MONITOR_SHARDS > 1:
+                all_new_mentions.extend(self._monitor_sharded())
+            elif self.loop is not None:
+                all_new_mentions.extend(self.loop.run_until_complete(self._monitor_async()))
+            else:
+                # Monitor news sources
+                logger.info("Monitoring news sources...")
+                news_mentions = self.news_monitor.monitor_all_companies()
+                all_new_mentions.extend(news_mentions)
+                
+                # Monitor LinkedIn
+                logger.info("Monitoring LinkedIn...")
+                linkedin_mentions = self.linkedin_monitor.monitor_all_companies()
+                all_new_mentions.extend(linkedin_mentions)
             
-            # Send alerts if new mentions found
+            # New mentions were queued in the alert outbox when they were stored;
+            # wake the dispatcher so they go out without waiting for its next tick.
+            # A one-off run has no later tick, so it also flushes the digest window.
             if all_new_mentions:
-                logger.info(f"Found {len(all_new_mentions)} new mentions, sending alerts...")
-                alert_results = self.alert_system.send_alerts(all_new_mentions)
-                logger.info(f"Alert results: {alert_results}")
+                logger.info(f"Found {len(all_new_mentions)} new mentions, queued for alerting")
+                if self.alert_system.dispatcher.running:
+                    self.alert_system.dispatcher.wake()
+                else:
+                    alert_results = self.alert_system.dispatch_pending(flush_digests=True)
+                    logger.info(f"Alert results: {alert_results}")
             else:
                 logger.info("No new mentions found")
             
@@ -70,6 +97,7 @@ class PortfolioMonitorScheduler:
             stats = self.db.get_statistics()
             logger.info(f"Database statistics: {stats}")
             
+            logger.info(metrics.end_cycle())
             logger.info("Monitoring cycle completed successfully")
             logger.info("=" * 50)
             
@@ -77,6 +105,28 @@ class PortfolioMonitorScheduler:
             logger.error(f"Error during monitoring cycle: {e}")
             raise
     
+    async def _monitor_async(self) -> list:
+        """Both monitors on the scheduler's event loop, one after the other so SQLite keeps a single writer"""
+        if self.http_client is None:
+            from async_http import AsyncHTTPClient
+            self.http_client = AsyncHTTPClient()
+        
+        logger.info("Monitoring news sources...")
+        mentions = await self.news_monitor.amonitor_all_companies(self.http_client)
+        
+        logger.info("Monitoring LinkedIn...")
+        mentions.extend(await self.linkedin_monitor.amonitor_all_companies(self.http_client))
+        return mentions
+    
+    def _monitor_sharded(self) -> list:
+        """Both monitors across MONITOR_SHARDS worker processes, with this process storing every mention"""
+        from sharding import run_sharded
+        
+        logger.info(f"Monitoring news sources and LinkedIn on {MONITOR_SHARDS} shards...")
+        news_mentions, linkedin_mentions = run_sharded([NewsMonitor, LinkedInMonitor], PORTFOLIO_COMPANIES,
+                                                       self.db, MONITOR_SHARDS)
+        return news_mentions + linkedin_mentions
+    
     def run_daily_summary(self):
         """Generate and send daily summary"""
         try:
@@ -141,6 +191,9 @@ class PortfolioMonitorScheduler:
         self.setup_schedule()
         self.running = True
         
+        # Deliver queued alerts (and their retries) independently of the cycles
+        self.alert_system.dispatcher.start(ALERT_DISPATCH_INTERVAL_SECONDS)
+        
         # Run monitoring cycle immediately if requested
         if run_immediately:
             logger.info("Running initial monitoring cycle...")
@@ -170,6 +223,17 @@ class PortfolioMonitorScheduler:
         if self.scheduler_thread and self.scheduler_thread.is_alive():
             self.scheduler_thread.join(timeout=5)
         
+        self.alert_system.dispatcher.stop()
+        self.alert_system.smtp_sender.close()
+        
+        # A cycle still running on the loop (stop from a signal handler) keeps it open
+        if self.loop is not None and not self.loop.is_running():
+            if self.http_client is not None:
+                self.loop.run_until_complete(self.http_client.close())
+                self.http_client = None
+            self.loop.close()
+            self.loop = None
+        
         logger.info("Scheduler stopped")
     
     def run_once(self):
@@ -188,7 +252,8 @@ class PortfolioMonitorScheduler:
                 }
                 for job in schedule.jobs
             ],
-            'database_stats': self.db.get_statistics()
+            'database_stats': self.db.get_statistics(),
+            'pending_digests': self.db.get_pending_digests()
         }
 
 def main():
@@ -0,0 +1,92 @@
+"""
+Result extraction from Google search result pages
+Pages are streamed through lxml's HTML parser and only the div.g result
+containers are kept; everything else is cleared as soon as it closes, and
+parsing stops once enough results have been read. BeautifulSoup restricted by
+a SoupStrainer is the fallback when lxml cannot read a page
+"""
+
+import io
+import logging
+from typing import Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+RESULT_CLASS = 'g'
+
+def _is_result(element) -> bool:
+    return RESULT_CLASS in (element.get('class') or '').split()
+
+def _first(element, tag: str, css_class: Optional[str] = None):
+    for found in element.iter(tag):
+        if css_class is None or css_class in (found.get('class') or '').split():
+            return found
+    return None
+
+def _text(element) -> Optional[str]:
+    return ''.join(element.itertext()) if element is not None else None
+
+def _result(container) -> Dict:
+    link = _first(container, 'a')
+    return {
+        'title': _text(_first(container, 'h3')),
+        'url': link.get('href', '') if link is not None else None,
+        'snippet': _text(_first(container, 'span', 'st')),
+        'cite': _text(_first(container, 'cite')),
+    }
+
+def _stream_results(content: bytes, max_results: Optional[int]) -> List[Dict]:
+    from lxml import etree
+
+    results = []
+    open_results = 0
+    for event, element in etree.iterparse(io.BytesIO(content), events=('start', 'end'), tag='div',
+                                          html=True, no_network=True, recover=True):
+        if event == 'start':
+            if _is_result(element):
+                open_results += 1
+            continue
+
+        if _is_result(element):
+            open_results -= 1
+            # A result nested in another is read as part of the outer one
+            if open_results == 0:
+                results.append(_result(element))
+                if max_results is not None and len(results) >= max_results:
+                    break
+        if open_results == 0:
+            # Nothing inside a closed div outside a result is needed again
+            element.clear()
+    return results
+
+def _soup_results(content: bytes, max_results: Optional[int]) -> List[Dict]:
+    from bs4 import BeautifulSoup, SoupStrainer
+    soup = BeautifulSoup(content, 'html.parser', parse_only=SoupStrainer('div', class_=RESULT_CLASS))
+
+    results = []
+    for container in soup.find_all('div', class_=RESULT_CLASS, recursive=False)[:max_results]:
+        title = container.find('h3')
+        link = container.find('a')
+        snippet = container.find('span', class_='st')
+        cite = container.find('cite')
+        results.append({
+            'title': title.get_text() if title else None,
+            'url': link.get('href', '') if link else None,
+            'snippet': snippet.get_text() if snippet else None,
+            'cite': cite.get_text() if cite else None,
+        })
+    return results
+
+def parse_results(content: bytes, max_results: Optional[int] = None) -> List[Dict]:
+    """
+    The first max_results result containers on a search page, in page order
+    Each is {'title', 'url', 'snippet', 'cite'}, with None for a part the
+    container does not have
+    """
+    if not content:
+        return []
+    try:
+        return _stream_results(content, max_results)
+    except Exception as e:
+        logger.debug(f"Streaming SERP parse failed, using BeautifulSoup: {e}")
+        return _soup_results(content, max_results)
@@ -0,0 +1,212 @@
+"""
+Sharded monitoring cycles across worker processes
+Companies are split across processes by a stable hash of their name. Each worker
+builds the given monitors on a ShardDatabase, fetches, filters and scores its
+shard on their engines, and sends the mentions over a queue to the calling
+process, which hands them to its database writer thread as they arrive and so
+stays SQLite's only writer. The workers' other writes (cursors, circuit breaker
+state, page slugs, resolved redirects) travel over the same queue and are made
+once the mentions queued before them are committed
+"""
+
+import logging
+import multiprocessing
+import zlib
+from concurrent.futures import Future, ProcessPoolExecutor
+from queue import Empty
+from typing import Callable, Dict, List, Optional, Sequence, Tuple
+
+from config import MONITOR_SHARDS
+from database import MentionDatabase
+from metrics import metrics
+from monitor_engine import QUERY_CURSOR_SCOPE
+
+logger = logging.getLogger(__name__)
+
+# Seconds the writer waits on an idle queue before checking whether the workers are done
+POLL_SECONDS = 0.5
+
+def shard_of(company_name: str, shards: int) -> int:
+    """Shard a company belongs to; unlike hash(), the same in every process and run"""
+    return zlib.crc32(company_name.encode('utf-8')) % shards
+
+def partition(companies: List[Dict], shards: int) -> List[List[Dict]]:
+    """Companies split into shards, keeping their order within each shard"""
+    parts: List[List[Dict]] = [[] for _ in range(max(1, shards))]
+    for company in companies:
+        parts[shard_of(company['name'], len(parts))].append(company)
+    return parts
+
+class ShardDatabase(MentionDatabase):
+    """
+    A worker's view of the database: reads go to SQLite, writes are sent to the
+    writer process. Rows read here are only sent back once they change, so a
+    worker never overwrites another shard's newer state with its stale copy
+    """
+    FORWARDED = ('save_source_cursors', 'save_source_health', 'save_page_slugs', 'save_redirects')
+
+    def __init__(self, db_path: str, queue):
+        self.queue = queue
+        self._read: Dict[Tuple, Tuple] = {}
+        super().__init__(db_path)
+
+    def init_database(self):
+        # The writer process created and migrated the schema before starting the workers
+        pass
+
+    def _changed(self, key: Tuple, row: Tuple) -> bool:
+        return self._read.get(key) != row
+
+    def get_source_cursors(self, company_name: str):
+        cursors = super().get_source_cursors(company_name)
+        for (source, keyword), row in cursors.items():
+            self._read[('cursor', company_name, source, keyword)] = tuple(row)
+        return cursors
+
+    def save_source_cursors(self, company_name: str, rows):
+        rows = [row for row in rows if self._changed(('cursor', company_name, row[0], row[1]), tuple(row[2:]))]
+        if rows:
+            self.queue.put(('call', 'save_source_cursors', (company_name, rows)))
+
+    def get_source_health(self) -> List[Dict]:
+        rows = super().get_source_health()
+        for row in rows:
+            self._read[('health', row['source'], row['endpoint'])] = (
+                row['state'], row['health'], row['outcomes'], row['cooldown_seconds'], row['open_until'])
+        return rows
+
+    def save_source_health(self, rows):
+        rows = [row for row in rows if self._changed(('health', row[0], row[1]), tuple(row[2:]))]
+        if rows:
+            self.queue.put(('call', 'save_source_health', (rows,)))
+
+    def delete_stale_source_cursors(self, company_name: str, days: float) -> int:
+        # Unchanged cursors are not sent back, so here a stale updated_at does not mean the query is unused
+        return 0
+
+    def save_page_slugs(self, source: str, rows):
+        if rows:
+            self.queue.put(('call', 'save_page_slugs', (source, rows)))
+
+    def save_redirects(self, redirects: Dict[str, str]):
+        if redirects:
+            self.queue.put(('call', 'save_redirects', (redirects,)))
+
+    def add_mention(self, mention_data: Dict) -> Optional[int]:
+        raise RuntimeError("Shard workers send mentions to the writer process instead of storing them")
+
+_queue = None
+
+def _init_worker(queue, log_level: int, initializer: Optional[Callable]):
+    global _queue
+    _queue = queue
+    logging.basicConfig(level=log_level,
+                        format='%(asctime)s - %(processName)s - %(name)s - %(levelname)s - %(message)s')
+    if initializer is not None:
+        initializer()
+
+def _run_shard(shard: int, monitor_classes: Sequence[type], companies: List[Dict], db_path: str) -> int:
+    """Run every monitor over one shard, sending mentions to the writer; returns the mentions sent"""
+    sent = 0
+    try:
+        db = ShardDatabase(db_path, _queue)
+        for index, monitor_class in enumerate(monitor_classes):
+            engine = monitor_class(db).engine
+
+            def send(company: Dict, mentions: List[Dict]) -> List:
+                nonlocal sent
+                # Resolving redirects is network-bound, so it stays in the worker
+                with metrics.timed('resolve', company=company['name']):
+                    engine.resolver.resolve_mentions(mentions)
+                if mentions:
+                    _queue.put(('mentions', index, mentions))
+                    sent += len(mentions)
+                return []
+
+            engine.run(companies, submit=send)
+    finally:
+        _queue.put(('done', shard))
+    return sent
+
+def run_sharded(monitor_classes: Sequence[type], companies: List[Dict], db: MentionDatabase,
+                shards: int = MONITOR_SHARDS, initializer: Optional[Callable] = None) -> List[List[Dict]]:
+    """
+    One cycle of each monitor class (built as monitor_class(db), with an
+    engine attribute) over the companies, split across up to `shards` worker
+    processes; returns the new mentions of each monitor in the order given.
+    initializer runs in each worker before its shard, as in ProcessPoolExecutor
+    """
+    parts = [(shard, part) for shard, part in enumerate(partition(companies, shards)) if part]
+    # (monitor index, mention, future) for every mention queued with the database's writer thread
+    pending: List[Tuple[int, Dict, Future]] = []
+    # Companies with mentions that failed to store, and how many of pending have been checked
+    failed = set()
+    checked = 0
+    if not parts:
+        return [[] for _ in monitor_classes]
+    logger.info(f"Monitoring {len(companies)} companies on {len(parts)} shard processes")
+
+    # Workers are spawned rather than forked, as forking a process with running threads
+    # (the scheduler's, the alert dispatcher's) can copy locks held by them
+    context = multiprocessing.get_context('spawn')
+    queue = context.Queue()
+    writer = db.get_writer()
+    with ProcessPoolExecutor(max_workers=len(parts), mp_context=context, initializer=_init_worker,
+                             initargs=(queue, logging.getLogger().getEffectiveLevel(), initializer)) as pool:
+        futures = {pool.submit(_run_shard, shard, monitor_classes, part, db.db_path): shard
+                   for shard, part in parts}
+        running = len(futures)
+        while running:
+            try:
+                message = queue.get(timeout=POLL_SECONDS)
+            except Empty:
+                # A worker that died outright never says it is done
+                if all(future.done() for future in futures):
+                    break
+                continue
+            if message[0] == 'done':
+                running -= 1
+            elif message[0] == 'mentions':
+                _, index, mentions = message
+                pending.extend((index, mention, writer.add_mention(mention)) for mention in mentions)
+            elif message[0] == 'call' and message[1] in ShardDatabase.FORWARDED:
+                _, method, args = message
+                try:
+                    writer.flush()
+                except Exception as e:
+                    logger.error(f"Storing shard mentions failed: {e}")
+                for _, mention, future in pending[checked:]:
+                    if future.exception() is not None:
+                        failed.add(mention['company_name'])
+                checked = len(pending)
+                # As in MonitorEngine, a failed company's cursors stay put so its items are fetched again.
+                # Which mentions came from batched queries is not sent, so any failure holds back those
+                if method == 'save_source_cursors' and (args[0] in failed or args[0] == QUERY_CURSOR_SCOPE and failed):
+                    logger.warning(f"Not saving source cursors for {args[0]}: its mentions failed to store")
+                    continue
+                with metrics.timed('db_write'):
+                    getattr(db, method)(*args)
+
+        for future, shard in futures.items():
+            try:
+                future.result()
+            except Exception as e:
+                logger.error(f"Monitoring shard {shard} failed: {e}")
+
+    new_mentions: List[List[Dict]] = [[] for _ in monitor_classes]
+    new_counts = {company['name']: 0 for company in companies}
+    for index, mention, future in pending:
+        try:
+            mention_id = future.result()
+        except Exception as e:
+            if mention['company_name'] not in failed:
+                logger.error(f"Storing mentions failed for {mention['company_name']}: {e}")
+                failed.add(mention['company_name'])
+            continue
+        if mention_id:
+            mention['id'] = mention_id
+            new_mentions[index].append(mention)
+            new_counts[mention['company_name']] += 1
+    for name, count in new_counts.items():
+        logger.info(f"Found {count} new mentions for {name}")
+    return new_mentions
@@ -0,0 +1,180 @@
+"""
+Slack webhook transport for ScaleX Ventures portfolio alerts
+Splits large messages into block-limit compliant chunks and paces delivery
+"""
+
+import logging
+import threading
+import time
+from typing import Dict, List, Optional, Tuple
+
+import requests
+
+from http_client import get_session
+
+logger = logging.getLogger(__name__)
+
+# Slack limits for incoming webhooks
+SLACK_MAX_BLOCKS = 50
+SLACK_MAX_SECTION_TEXT = 3000
+SLACK_MAX_HEADER_TEXT = 150
+SLACK_MESSAGES_PER_SECOND = 1.0
+
+def _truncate(text: str, limit: int) -> str:
+    """Truncate text to a Slack field limit"""
+    return text if len(text) <= limit else text[:limit - 3] + "..."
+
+def _fit_block(block: Dict) -> Dict:
+    """Trim block text that would exceed Slack's per-field limits"""
+    text = block.get('text')
+    if not isinstance(text, dict) or 'text' not in text:
+        return block
+    
+    limit = SLACK_MAX_HEADER_TEXT if block.get('type') == 'header' else SLACK_MAX_SECTION_TEXT
+    if len(text['text']) <= limit:
+        return block
+    
+    return dict(block, text=dict(text, text=_truncate(text['text'], limit)))
+
+def _segments(blocks: List[Dict]) -> List[List[Dict]]:
+    """Blocks split after each divider, so a company's section is one segment"""
+    segments = []
+    current = []
+    for block in blocks:
+        current.append(block)
+        if block.get('type') == 'divider':
+            segments.append(current)
+            current = []
+    if current:
+        segments.append(current)
+    return segments
+
+def _pack(segments: List[List[Dict]], max_blocks: int) -> List[Tuple[List[Dict], List[int]]]:
+    """Chunks of at most max_blocks blocks, each with the indexes of the segments it carries"""
+    chunks = []
+    chunk = []
+    owners = []
+    for index, segment in enumerate(segments):
+        segment = [_fit_block(block) for block in segment]
+        if len(chunk) + len(segment) > max_blocks and chunk:
+            chunks.append((chunk, owners))
+            chunk, owners = [], []
+        
+        # A single segment larger than the limit is split hard
+        while len(segment) > max_blocks:
+            chunks.append((segment[:max_blocks], [index]))
+            segment = segment[max_blocks:]
+        chunk.extend(segment)
+        owners.append(index)
+    
+    if chunk:
+        chunks.append((chunk, owners))
+    return chunks
+
+def chunk_blocks(blocks: List[Dict], max_blocks: int = SLACK_MAX_BLOCKS) -> List[List[Dict]]:
+    """
+    Split blocks into chunks of at most max_blocks
+    Splits happen after divider blocks where possible so a company's section
+    stays in one message
+    """
+    return [chunk for chunk, _ in _pack(_segments(blocks), max_blocks)]
+
+class SlackWebhookTransport:
+    def __init__(self, webhook_url: str, session: Optional[requests.Session] = None,
+                 messages_per_second: float = SLACK_MESSAGES_PER_SECOND,
+                 max_retries: int = 3, timeout: int = 10):
+        self.webhook_url = webhook_url
+        self.min_interval = 1.0 / messages_per_second
+        self.max_retries = max_retries
+        self.timeout = timeout
+        self._next_send_at = 0.0
+        self._lock = threading.Lock()
+        
+        self.session = session or get_session()
+    
+    def _wait_turn(self):
+        """Block until the webhook rate limit allows another message"""
+        with self._lock:
+            now = time.monotonic()
+            wait = self._next_send_at - now
+            self._next_send_at = max(now, self._next_send_at) + self.min_interval
+        
+        if wait > 0:
+            time.sleep(wait)
+    
+    def _defer(self, seconds: float):
+        """Push back the next send slot, e.g. after a 429"""
+        with self._lock:
+            self._next_send_at = max(self._next_send_at, time.monotonic() + seconds)
+    
+    def _post(self, payload: Dict) -> bool:
+        """Post one message, honoring 429 Retry-After and retrying server errors"""
+        for attempt in range(self.max_retries + 1):
+            self._wait_turn()
+            try:
+                response = self.session.post(self.webhook_url, json=payload, timeout=self.timeout)
+            except requests.exceptions.RequestException as e:
+                logger.warning(f"Slack webhook request failed (attempt {attempt + 1}): {e}")
+                self._defer(2 ** attempt)
+                continue
+            
+            if response.status_code == 200:
+                return True
+            
+            if response.status_code == 429:
+                try:
+                    retry_after = float(response.headers.get('Retry-After', 1))
+                except ValueError:
+                    retry_after = 1.0
+                logger.warning(f"Slack rate limited, retrying after {retry_after}s")
+                self._defer(retry_after)
+                continue
+            
+            if response.status_code >= 500:
+                logger.warning(f"Slack webhook error {response.status_code} (attempt {attempt + 1})")
+                self._defer(2 ** attempt)
+                continue
+            
+            logger.error(f"Slack webhook rejected message: {response.status_code} - {response.text}")
+            return False
+        
+        return False
+    
+    def send(self, payload: Dict) -> bool:
+        """Send a payload, split into as many messages as the block limit requires"""
+        blocks = payload.get('blocks')
+        if not blocks:
+            return self._post(payload)
+        return all(self.send_segments(payload, _segments(blocks)))
+    
+    def send_segments(self, payload: Dict, segments: List[List[Dict]]) -> List[bool]:
+        """
+        Send a payload whose blocks are given as segments, each kept in one message
+        where it fits; returns per segment whether every message carrying it was
+        delivered, so a caller can retry only what failed
+        """
+        chunks = _pack(segments, SLACK_MAX_BLOCKS)
+        delivered = [True] * len(segments)
+        for i, (chunk, owners) in enumerate(chunks, 1):
+            part = dict(payload, blocks=chunk)
+            if len(chunks) > 1 and payload.get('text'):
+                part['text'] = f"{payload['text']} (part {i}/{len(chunks)})"
+            
+            if not self._post(part):
+                logger.error(f"Failed to deliver Slack message part {i}/{len(chunks)}")
+                for index in owners:
+                    delivered[index] = False
+        
+        if len(chunks) > 1:
+            logger.info(f"Slack payload delivered in {len(chunks)} messages")
+        return delivered
+
+_transports: Dict[str, SlackWebhookTransport] = {}
+_transports_lock = threading.Lock()
+
+def get_slack_transport(webhook_url: str) -> SlackWebhookTransport:
+    """Get the shared transport for a webhook so its rate limit applies process-wide"""
+    with _transports_lock:
+        if webhook_url not in _transports:
+            _transports[webhook_url] = SlackWebhookTransport(webhook_url)
+        return _transports[webhook_url]
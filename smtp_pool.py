@@ -0,0 +1,195 @@
+"""
+Pooled SMTP sender for ScaleX Ventures portfolio email alerts
+Keeps one authenticated connection alive and sends many messages over it
+"""
+
+import logging
+import re
+import smtplib
+import threading
+import time
+from typing import List, Optional, Tuple
+
+from config import (
+    EMAIL_SMTP_SERVER, EMAIL_SMTP_PORT, EMAIL_USERNAME, EMAIL_PASSWORD,
+    EMAIL_USE_TLS, EMAIL_SMTP_TIMEOUT
+)
+
+logger = logging.getLogger(__name__)
+
+def _to_crlf(message: str) -> str:
+    """Line endings normalized to CRLF, as sendmail() does before DATA"""
+    return re.sub(r'(?:\r\n|\n|\r(?!\n))', '\r\n', message)
+
+class PooledSMTPSender:
+    def __init__(self, host: str, port: int, username: str = '', password: str = '',
+                 use_tls: bool = True, timeout: int = 30,
+                 health_check_interval: int = 30, max_idle_seconds: int = 300):
+        self.host = host
+        self.port = port
+        self.username = username
+        self.password = password
+        self.use_tls = use_tls
+        self.timeout = timeout
+        self.health_check_interval = health_check_interval
+        self.max_idle_seconds = max_idle_seconds
+        self._server: Optional[smtplib.SMTP] = None
+        self._last_used = 0.0
+        self._lock = threading.Lock()
+        self.connections_opened = 0
+    
+    def _connect(self) -> smtplib.SMTP:
+        """Open, secure and authenticate a new SMTP connection"""
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        server.ehlo()
+        if self.use_tls:
+            server.starttls()
+            server.ehlo()
+        if self.username:
+            server.login(self.username, self.password)
+        
+        self.connections_opened += 1
+        logger.debug(f"Opened SMTP connection to {self.host}:{self.port}")
+        return server
+    
+    def _close_server(self):
+        """Close the current connection, ignoring errors from a dead socket"""
+        if self._server is None:
+            return
+        try:
+            self._server.quit()
+        except Exception:
+            try:
+                self._server.close()
+            except Exception:
+                pass
+        self._server = None
+    
+    def _is_alive(self) -> bool:
+        """NOOP health check on the pooled connection"""
+        try:
+            code, _ = self._server.noop()
+            return code == 250
+        except Exception:
+            return False
+    
+    def _get_server(self) -> smtplib.SMTP:
+        """Return a healthy connection, reconnecting when idle too long or dead"""
+        idle = time.monotonic() - self._last_used
+        
+        if self._server is not None:
+            if idle > self.max_idle_seconds:
+                self._close_server()
+            elif idle > self.health_check_interval and not self._is_alive():
+                logger.info("Pooled SMTP connection failed health check, reconnecting")
+                self._close_server()
+        
+        if self._server is None:
+            self._server = self._connect()
+        
+        return self._server
+    
+    def send(self, from_addr: str, to_addrs: List[str], message: str) -> bool:
+        """Send a single message over the pooled connection"""
+        return self.send_many([(from_addr, to_addrs, message)]) == 1
+    
+    def send_many(self, messages: List[Tuple[str, List[str], str]]) -> int:
+        """
+        Send (from_addr, to_addrs, message) tuples back to back over one connection
+        Returns how many messages were accepted by the server; a message refused
+        at any step, including the final reply to DATA, is not counted. A
+        connection lost before DATA is retried once on a new connection; one lost
+        during or after DATA is reported as a failure, since the server may
+        already have accepted the message and a resend could deliver it twice
+        """
+        sent = 0
+        with self._lock:
+            for from_addr, to_addrs, message in messages:
+                for attempt in range(2):
+                    data_started = False
+                    try:
+                        server = self._get_server()
+                        self._envelope(server, from_addr, to_addrs)
+                        data_started = True
+                        code, response = server.data(_to_crlf(message).encode('ascii'))
+                        if code != 250:
+                            raise smtplib.SMTPDataError(code, response)
+                        self._last_used = time.monotonic()
+                        sent += 1
+                        break
+                    except smtplib.SMTPServerDisconnected as e:
+                        if not self._handle_connection_error(e, attempt, data_started):
+                            break
+                    except smtplib.SMTPException as e:
+                        # SMTPException subclasses OSError, so it must be caught before it
+                        logger.error(f"SMTP server rejected message: {e}")
+                        self._abort_transaction(e)
+                        break
+                    except OSError as e:
+                        if not self._handle_connection_error(e, attempt, data_started):
+                            break
+        
+        return sent
+    
+    @staticmethod
+    def _envelope(server: smtplib.SMTP, from_addr: str, to_addrs: List[str]):
+        """MAIL FROM and RCPT TO, as sendmail() does before DATA"""
+        server.ehlo_or_helo_if_needed()
+        code, response = server.mail(from_addr)
+        if code != 250:
+            raise smtplib.SMTPSenderRefused(code, response, from_addr)
+        refused = {}
+        for to_addr in to_addrs:
+            code, response = server.rcpt(to_addr)
+            if code not in (250, 251):
+                refused[to_addr] = (code, response)
+        if len(refused) == len(to_addrs):
+            raise smtplib.SMTPRecipientsRefused(refused)
+    
+    def _abort_transaction(self, error: smtplib.SMTPException):
+        """
+        RSET after a refused message so the pooled connection starts the next one
+        clean, as sendmail() does; a 421 reply means the server is closing it
+        """
+        if self._server is None:
+            return
+        if getattr(error, 'smtp_code', None) == 421:
+            self._close_server()
+            return
+        try:
+            self._server.rset()
+            self._last_used = time.monotonic()
+        except Exception:
+            self._close_server()
+    
+    def _handle_connection_error(self, error: Exception, attempt: int, data_started: bool) -> bool:
+        """Drop a dead connection; returns whether the message should be sent again"""
+        self._close_server()
+        if data_started:
+            logger.error(f"SMTP connection lost during DATA ({error}), not resending in case it was delivered")
+            return False
+        if attempt == 1:
+            logger.error(f"Failed to send email after reconnecting: {error}")
+            return False
+        logger.info(f"SMTP connection lost ({error}), reconnecting")
+        return True
+    
+    def close(self):
+        """Close the pooled connection"""
+        with self._lock:
+            self._close_server()
+
+_default_sender: Optional[PooledSMTPSender] = None
+_default_sender_lock = threading.Lock()
+
+def get_smtp_sender() -> PooledSMTPSender:
+    """Get the process-wide pooled sender for the configured SMTP server"""
+    global _default_sender
+    with _default_sender_lock:
+        if _default_sender is None:
+            _default_sender = PooledSMTPSender(
+                EMAIL_SMTP_SERVER, EMAIL_SMTP_PORT,
+                username=EMAIL_USERNAME, password=EMAIL_PASSWORD,
+                use_tls=EMAIL_USE_TLS, timeout=EMAIL_SMTP_TIMEOUT
+            )
+        return _default_sender
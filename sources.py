@@ -0,0 +1,717 @@
+"""
+Mention sources for the portfolio monitor
+Each source turns a company into HTTP requests and parses the responses into raw
+items; MonitorEngine runs any set of them, so pooling, caching and batching
+live in one place instead of in every monitor variant
+"""
+
+import json
+import logging
+import threading
+import time
+from concurrent.futures import Executor
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from datetime import datetime, timedelta, timezone
+from typing import Awaitable, Callable, Dict, Iterator, List, Optional, Tuple, Type
+
+import requests
+
+from config import (
+    NEWS_API_KEY, MAX_ARTICLES_PER_CHECK, NEWSAPI_URL, GOOGLE_NEWS_RSS_URL,
+    GOOGLE_SEARCH_URL, LINKEDIN_BASE_URL, SOURCE_CURSOR_OVERLAP_MINUTES, LINKEDIN_SLUG_RECHECK_DAYS,
+    BACKFILL_NEWSAPI_MAX_DAYS, BACKFILL_NEWSAPI_MAX_RESULTS
+)
+from circuit_breaker import CircuitBreakers, endpoint_of
+from metrics import metrics
+from query_planner import QueryBatch, QueryLimits, halves
+from rss_parser import parse_feed, parse_google_news_rss
+from serp_parser import parse_results
+
+logger = logging.getLogger(__name__)
+
+@dataclass
+class SourceRequest:
+    """One HTTP request a source wants made for a company"""
+    url: str
+    params: Dict = field(default_factory=dict)
+    keyword: str = ''
+    # Stop issuing the company's remaining requests once this one yields items
+    stop_on_items: bool = False
+    # Items kept from the response (default: the source's max_items)
+    max_items: Optional[int] = None
+    # Set by parse() when the upstream had more results than it returned
+    truncated: bool = False
+    # HTTP status of the response, left None when the request was skipped or got no answer
+    status: Optional[int] = None
+
+# Cap on GUIDs remembered per cursor, in case a feed floods the overlap window
+MAX_SEEN_GUIDS = 500
+
+@dataclass
+class SourceCursor:
+    """
+    High-water mark for one (company, source, keyword): the newest publish time
+    seen, plus the GUIDs seen within the overlap window before it
+    """
+    published: Optional[datetime] = None
+    seen: Dict[str, datetime] = field(default_factory=dict)
+    overlap: timedelta = timedelta(minutes=SOURCE_CURSOR_OVERLAP_MINUTES)
+    # Set on an OR query whose response was cut off; later cycles search its halves instead
+    split: bool = False
+    # Looked up this cycle; cursors of queries no longer made are not saved again
+    used: bool = field(default=False, compare=False)
+
+    @property
+    def floor(self) -> Optional[datetime]:
+        """Items published before this are treated as already seen"""
+        return self.published - self.overlap if self.published else None
+
+    def is_seen(self, item: Dict) -> bool:
+        published = item.get('published_at')
+        if published is None or self.published is None:
+            return False
+        return published < self.floor or item.get('guid') in self.seen
+
+    def advance(self, items: List[Dict]):
+        """Move the mark past every dated item in a response"""
+        dated = [(item['guid'], item['published_at']) for item in items
+                 if item.get('published_at') and item.get('guid')]
+        if not dated:
+            return
+        self.published = max([published for _, published in dated] + ([self.published] if self.published else []))
+        self.seen.update(dated)
+        floor = self.floor
+        recent = sorted(((guid, published) for guid, published in self.seen.items() if published >= floor),
+                        key=lambda pair: pair[1], reverse=True)
+        self.seen = dict(recent[:MAX_SEEN_GUIDS])
+
+    def to_row(self) -> Tuple[Optional[str], str, int]:
+        """(last_published, seen_guids JSON, split) for MentionDatabase.save_source_cursors"""
+        return (
+            self.published.isoformat() if self.published else None,
+            json.dumps({guid: published.isoformat() for guid, published in self.seen.items()}),
+            int(self.split)
+        )
+
+    @classmethod
+    def from_row(cls, published: Optional[str], seen: Optional[str], split: int = 0) -> 'SourceCursor':
+        return cls(
+            datetime.fromisoformat(published) if published else None,
+            {guid: datetime.fromisoformat(value) for guid, value in json.loads(seen or '{}').items()},
+            split=bool(split)
+        )
+
+class Source:
+    """
+    Base class for mention sources
+    Subclasses set `name` and implement build_requests() and parse(); fetch()
+    ties the two together over a shared session
+    """
+    name = ''
+    # Whether the engine runs its relevance filter over this source's items
+    filter_relevance = True
+    # HTTP statuses that only mean "nothing here" and are logged at debug level
+    expected_statuses = ()
+    # Set when the upstream accepts boolean OR queries, so keywords can be batched
+    query_limits: Optional[QueryLimits] = None
+    # HTTP statuses that only say one endpoint is gone; they count against that
+    # endpoint's circuit breaker but not the source's
+    missing_statuses = (404, 410)
+    # Set when build_window_requests() can ask the upstream for a date range, for backfill
+    date_windows = False
+
+    def __init__(self, session: requests.Session, max_keywords: Optional[int] = None,
+                 max_items: int = MAX_ARTICLES_PER_CHECK, timeout: float = 30, delay: float = 0):
+        self.session = session
+        self.max_keywords = max_keywords
+        self.max_items = max_items
+        self.timeout = timeout
+        self.delay = delay
+        # Circuit breakers consulted before every request, set by MonitorEngine
+        self.breakers: Optional[CircuitBreakers] = None
+        # Days back the upstream can search, for backfill (None: no limit)
+        self.history_days: Optional[int] = None
+
+    def keywords(self, company: Dict) -> List[str]:
+        return company['keywords'][:self.max_keywords] if self.max_keywords else list(company['keywords'])
+
+    def build_requests(self, company: Dict, since: Optional[datetime]) -> List[SourceRequest]:
+        raise NotImplementedError
+
+    def build_batch_requests(self, batch: QueryBatch, since: Optional[datetime]) -> List[SourceRequest]:
+        """Requests for one OR query; only called on sources with query_limits"""
+        raise NotImplementedError
+
+    @property
+    def window_query_limits(self) -> Optional[QueryLimits]:
+        """query_limits for the queries passed to build_window_requests()"""
+        return self.query_limits
+
+    def build_window_requests(self, query: str, start: datetime, end: datetime) -> List[SourceRequest]:
+        """Requests for items matching query published from start up to end; only called on date_windows sources"""
+        raise NotImplementedError
+
+    def next_page(self, request: SourceRequest) -> Optional[SourceRequest]:
+        """The request for the page after a truncated response, where the upstream pages its results"""
+        return None
+
+    def parse(self, response: requests.Response, request: SourceRequest) -> List[Dict]:
+        """
+        Raw items from one response: dicts with title, description, url, source,
+        published_date (display string), published_at (naive UTC datetime or None)
+        and guid
+        """
+        raise NotImplementedError
+
+    def narrow_request(self, request: SourceRequest, after: datetime):
+        """Ask the upstream for items published after `after` only, where it supports that"""
+
+    def save(self):
+        """Persist any state the source keeps between cycles; MonitorEngine calls this after each run"""
+
+    def fetch(self, company: Dict, since: Optional[datetime] = None,
+              cursors: Optional[Dict[str, SourceCursor]] = None) -> Iterator[Dict]:
+        """
+        Raw items for a company, published after `since` where the upstream can filter
+        With cursors (keyword -> SourceCursor), items seen in earlier cycles are
+        dropped and the cursors are advanced in place
+        """
+        return self._fetch(self.build_requests(company, since), company['name'], cursors)
+
+    def fetch_batch(self, batch: QueryBatch, since: Optional[datetime] = None,
+                    cursors: Optional[Dict[str, SourceCursor]] = None) -> Iterator[Dict]:
+        """
+        Raw items for an OR query, as fetch(); cursors are keyed by the query
+        A response cut off at the upstream's page limit may be missing some
+        keyword's newest items, so it is dropped and each half of the query is
+        fetched instead, down to single keywords. The query's cursor is marked
+        split, and MonitorEngine.plan() searches the halves from then on
+        """
+        def split(request: SourceRequest) -> Iterator[Dict]:
+            logger.debug(f"{self.name} query truncated, splitting: {request.keyword}")
+            for part in halves(batch):
+                yield from self.fetch_batch(part, since, cursors)
+
+        return self._fetch(self.build_batch_requests(batch, since), batch.label, cursors,
+                           split if len(batch.terms) > 1 else None)
+
+    async def afetch(self, company: Dict, since: Optional[datetime], cursors: Optional[Dict[str, SourceCursor]],
+                     client: 'AsyncHTTPClient', executor: Optional[Executor] = None) -> List[Dict]:
+        """fetch() for the asyncio cycle: requests go through client and parsing runs on executor"""
+        return await self._afetch(self.build_requests(company, since), company['name'], cursors, client, executor)
+
+    async def afetch_batch(self, batch: QueryBatch, since: Optional[datetime],
+                           cursors: Optional[Dict[str, SourceCursor]], client: 'AsyncHTTPClient',
+                           executor: Optional[Executor] = None) -> List[Dict]:
+        """fetch_batch() for the asyncio cycle"""
+        async def split(request: SourceRequest) -> List[Dict]:
+            logger.debug(f"{self.name} query truncated, splitting: {request.keyword}")
+            items = []
+            for part in halves(batch):
+                items.extend(await self.afetch_batch(part, since, cursors, client, executor))
+            return items
+
+        return await self._afetch(self.build_batch_requests(batch, since), batch.label, cursors, client, executor,
+                                  split if len(batch.terms) > 1 else None)
+
+    async def afetch_window(self, query: str, start: datetime, end: datetime, label: str,
+                            client: 'AsyncHTTPClient', executor: Optional[Executor] = None,
+                            max_pages: int = 1) -> Optional[List[Dict]]:
+        """
+        Raw items matching query published from start up to end, for backfill;
+        None when any request failed or was skipped, so the window can be retried.
+        A window whose first page is cut off is split in half and each half
+        fetched instead; a single day is paged through, up to max_pages pages
+        and as far as the upstream pages its results
+        """
+        import asyncio
+        loop = asyncio.get_running_loop()
+        items = []
+        for request in self.build_window_requests(query, start, end):
+            response = await self._aget(request, label, client)
+            if response is None:
+                return None
+            found = await loop.run_in_executor(executor, self._parse, response, request, label)
+
+            if request.truncated and end - start > timedelta(days=1):
+                logger.debug(f"{self.name} window truncated, splitting: {query} {start:%Y-%m-%d}..{end:%Y-%m-%d}")
+                middle = start + timedelta(days=(end - start).days // 2)
+                for part_start, part_end in ((start, middle), (middle, end)):
+                    part = await self.afetch_window(query, part_start, part_end, label, client, executor, max_pages)
+                    if part is None:
+                        return None
+                    items.extend(part)
+                continue
+
+            items.extend(found)
+            for _ in range(max(1, max_pages) - 1):
+                following = self.next_page(request) if request.truncated else None
+                if following is None:
+                    break
+                request = following
+                response = await self._aget(request, label, client)
+                if response is None:
+                    return None
+                items.extend(await loop.run_in_executor(executor, self._parse, response, request, label))
+            if request.truncated:
+                logger.warning(f"{self.name} returned only part of {query} for {start:%Y-%m-%d}, "
+                               f"the rest of that day is not backfilled")
+        return items
+
+    def _allowed(self, request: SourceRequest, label: str) -> bool:
+        if self.breakers is not None and not self.breakers.allow(self.name, endpoint_of(request.url)):
+            logger.debug(f"{self.name} circuit open, skipping {request.keyword or label}")
+            return False
+        return True
+
+    @contextmanager
+    def _attempt(self, request: SourceRequest, label: str):
+        """
+        Wraps one request: request errors raised in the block are logged and
+        swallowed, and the outcome is recorded with the circuit breakers
+        """
+        endpoint_ok = source_ok = False
+        try:
+            yield
+            endpoint_ok = source_ok = True
+        except requests.exceptions.HTTPError as e:
+            source_ok = e.response.status_code in self.missing_statuses
+            level = logging.DEBUG if e.response.status_code in self.expected_statuses else logging.ERROR
+            logger.log(level, f"{self.name} request failed for {request.keyword or label}: {e}")
+        except requests.exceptions.RequestException as e:
+            logger.error(f"{self.name} request failed for {request.keyword or label}: {e}")
+        finally:
+            if self.breakers is not None:
+                self.breakers.record(self.name, endpoint_of(request.url), endpoint_ok, source_ok)
+
+    def _get(self, request: SourceRequest, label: str) -> Optional[requests.Response]:
+        """GET one request through the circuit breakers; None when it was skipped or failed"""
+        if not self._allowed(request, label):
+            return None
+        with self._attempt(request, label):
+            with metrics.timed('fetch', source=self.name, company=label, keyword=request.keyword):
+                response = self.session.get(request.url, params=request.params, timeout=self.timeout)
+                request.status = response.status_code
+                response.raise_for_status()
+            return response
+        return None
+
+    async def _aget(self, request: SourceRequest, label: str, client: 'AsyncHTTPClient'):
+        """_get() through the asyncio client; the source's delay becomes the host's minimum spacing"""
+        if not self._allowed(request, label):
+            return None
+        with self._attempt(request, label):
+            with metrics.timed('fetch', source=self.name, company=label, keyword=request.keyword):
+                response = await client.get(self.session, request.url, request.params, self.timeout, self.delay)
+                request.status = response.status_code
+                response.raise_for_status()
+            return response
+        return None
+
+    def _cursor(self, request: SourceRequest, cursors: Optional[Dict[str, SourceCursor]]) -> Optional[SourceCursor]:
+        cursor = cursors.setdefault(request.keyword, SourceCursor()) if cursors is not None else None
+        if cursor is None:
+            return None
+        cursor.used = True
+        if cursor.floor:
+            self.narrow_request(request, cursor.floor)
+        return cursor
+
+    def _parse(self, response, request: SourceRequest, label: str) -> List[Dict]:
+        with metrics.timed('parse', source=self.name, company=label):
+            return self.parse(response, request)
+
+    @staticmethod
+    def _fresh(items: List[Dict], cursor: Optional[SourceCursor]) -> List[Dict]:
+        """Items the cursor has not seen, advancing it past all of them"""
+        if cursor is None:
+            return items
+        fresh = [item for item in items if not cursor.is_seen(item)]
+        cursor.advance(items)
+        return fresh
+
+    def _fetch(self, requests_: List[SourceRequest], label: str, cursors: Optional[Dict[str, SourceCursor]],
+               on_truncated: Optional[Callable[[SourceRequest], Iterator[Dict]]] = None) -> Iterator[Dict]:
+        for request in requests_:
+            cursor = self._cursor(request, cursors)
+            try:
+                response = self._get(request, label)
+                if response is None:
+                    continue
+
+                items = self._parse(response, request, label)
+
+                if request.truncated and on_truncated:
+                    # Remembered, so the next cycle searches the halves without this request
+                    if cursor is not None:
+                        cursor.split = True
+                    yield from on_truncated(request)
+                    continue
+
+                yield from self._fresh(items, cursor)
+
+                if self.delay:
+                    time.sleep(self.delay)
+                if items and request.stop_on_items:
+                    break
+
+            except Exception as e:
+                logger.error(f"Unexpected error in {self.name} search for {request.keyword or label}: {e}")
+
+    async def _afetch(self, requests_: List[SourceRequest], label: str, cursors: Optional[Dict[str, SourceCursor]],
+                      client: 'AsyncHTTPClient', executor: Optional[Executor],
+                      on_truncated: Optional[Callable[[SourceRequest], Awaitable[List[Dict]]]] = None) -> List[Dict]:
+        import asyncio
+        loop = asyncio.get_running_loop()
+        found = []
+        for request in requests_:
+            cursor = self._cursor(request, cursors)
+            try:
+                response = await self._aget(request, label, client)
+                if response is None:
+                    continue
+
+                items = await loop.run_in_executor(executor, self._parse, response, request, label)
+
+                if request.truncated and on_truncated:
+                    if cursor is not None:
+                        cursor.split = True
+                    found.extend(await on_truncated(request))
+                    continue
+
+                found.extend(self._fresh(items, cursor))
+
+                if items and request.stop_on_items:
+                    break
+
+            except Exception as e:
+                logger.error(f"Unexpected error in {self.name} search for {request.keyword or label}: {e}")
+        return found
+
+SOURCES: Dict[str, Type[Source]] = {}
+
+def register_source(cls: Type[Source]) -> Type[Source]:
+    """Class decorator adding a source to the registry under its name"""
+    SOURCES[cls.name] = cls
+    return cls
+
+def create_source(name: str, session: requests.Session, **options) -> Source:
+    if name not in SOURCES:
+        raise ValueError(f"Unknown source '{name}' (available: {', '.join(sorted(SOURCES))})")
+    return SOURCES[name](session, **options)
+
+@register_source
+class NewsAPISource(Source):
+    name = 'newsapi'
+    # NewsAPI rejects `q` values over 500 characters
+    query_limits = QueryLimits(500)
+    date_windows = True
+
+    def __init__(self, session: requests.Session, api_key: str = NEWS_API_KEY,
+                 url: str = NEWSAPI_URL, history_days: int = BACKFILL_NEWSAPI_MAX_DAYS,
+                 paged_results: int = BACKFILL_NEWSAPI_MAX_RESULTS, **options):
+        super().__init__(session, **options)
+        self.api_key = api_key
+        self.url = url
+        # Older `from` dates are rejected outright on plans with a limited archive
+        self.history_days = history_days or None
+        # Pages past this many results are an error on plans with a result cap
+        self.paged_results = paged_results or None
+
+    def _request(self, query: str, since: Optional[datetime], page_size: int) -> SourceRequest:
+        params = {
+            'q': query,
+            'sortBy': 'publishedAt',
+            'language': 'en',
+            'pageSize': min(page_size, 100),
+            'apiKey': self.api_key
+        }
+        if since:
+            params['from'] = since.strftime('%Y-%m-%d')
+        return SourceRequest(self.url, params, query)
+
+    def build_requests(self, company: Dict, since: Optional[datetime]) -> List[SourceRequest]:
+        if not self.api_key:
+            return []
+        return [self._request(keyword, since, self.max_items) for keyword in self.keywords(company)]
+
+    def build_batch_requests(self, batch: QueryBatch, since: Optional[datetime]) -> List[SourceRequest]:
+        if not self.api_key:
+            return []
+        if len(batch.terms) == 1:
+            return [self._request(batch.query, since, self.max_items)]
+        # A full page, so a response that is still cut off means the query must be split
+        return [self._request(batch.query, since, self.query_limits.max_results)]
+
+    def build_window_requests(self, query: str, start: datetime, end: datetime) -> List[SourceRequest]:
+        if not self.api_key:
+            return []
+        request = self._request(query, None, self.query_limits.max_results)
+        # Both ends are inclusive
+        request.params['from'] = start.strftime('%Y-%m-%dT%H:%M:%S')
+        request.params['to'] = (end - timedelta(seconds=1)).strftime('%Y-%m-%dT%H:%M:%S')
+        return [request]
+
+    def next_page(self, request: SourceRequest) -> Optional[SourceRequest]:
+        page = request.params.get('page', 1)
+        if self.paged_results and page * request.params.get('pageSize', 0) >= self.paged_results:
+            return None
+        params = dict(request.params, page=page + 1)
+        return SourceRequest(request.url, params, request.keyword, max_items=request.max_items)
+
+    def narrow_request(self, request: SourceRequest, after: datetime):
+        # A date-only `from` sorts before any timestamp on the same day
+        after_param = after.strftime('%Y-%m-%dT%H:%M:%S')
+        if after_param > request.params.get('from', ''):
+            request.params['from'] = after_param
+
+    def parse(self, response: requests.Response, request: SourceRequest) -> List[Dict]:
+        data = response.json()
+        if data.get('status') != 'ok':
+            return []
+        # Results on earlier pages count towards totalResults too
+        offset = (request.params.get('page', 1) - 1) * request.params.get('pageSize', 0)
+        request.truncated = data.get('totalResults', 0) > offset + len(data.get('articles', []))
+
+        items = []
+        for article in data.get('articles', []):
+            published_date = article.get('publishedAt') or ''
+            published_at = None
+            if published_date:
+                try:
+                    # NewsAPI uses ISO format, convert to readable format
+                    dt = datetime.fromisoformat(published_date.replace('Z', '+00:00'))
+                    published_date = dt.strftime('%Y-%m-%d %H:%M:%S')
+                    published_at = dt.astimezone(timezone.utc).replace(tzinfo=None) if dt.tzinfo else dt
+                except ValueError:
+                    published_date = published_date[:10]  # Just the date part
+            items.append({
+                'title': article.get('title') or '',
+                'description': article.get('description') or '',
+                'url': article.get('url') or '',
+                'source': f"NewsAPI - {(article.get('source') or {}).get('name', 'Unknown')}",
+                'published_date': published_date,
+                'published_at': published_at,
+                'guid': article.get('url') or '',
+            })
+        return items
+
+@register_source
+class GoogleNewsSource(Source):
+    name = 'google_news'
+    # Google ignores words past the 32nd, OR operators included
+    query_limits = QueryLimits(500, max_words=32)
+    # Room for the two after:/before: date operators
+    window_query_limits = QueryLimits(470, max_words=30)
+    date_windows = True
+
+    def __init__(self, session: requests.Session, url: str = GOOGLE_NEWS_RSS_URL, **options):
+        super().__init__(session, **options)
+        self.url = url
+
+    def _request(self, query: str, max_items: Optional[int] = None) -> SourceRequest:
+        return SourceRequest(self.url, {'q': query, 'hl': 'en-US', 'gl': 'US', 'ceid': 'US:en'}, query,
+                             max_items=max_items)
+
+    def build_requests(self, company: Dict, since: Optional[datetime]) -> List[SourceRequest]:
+        return [self._request(keyword) for keyword in self.keywords(company)]
+
+    def build_batch_requests(self, batch: QueryBatch, since: Optional[datetime]) -> List[SourceRequest]:
+        if len(batch.terms) == 1:
+            return [self._request(batch.query)]
+        return [self._request(batch.query, self.query_limits.max_results)]
+
+    def build_window_requests(self, query: str, start: datetime, end: datetime) -> List[SourceRequest]:
+        # after: is inclusive and before: exclusive, at day granularity
+        dated = f"{query} after:{start:%Y-%m-%d} before:{end:%Y-%m-%d}"
+        return [self._request(dated, self.query_limits.max_results)]
+
+    def parse(self, response: requests.Response, request: SourceRequest) -> List[Dict]:
+        entries = parse_google_news_rss(response.content)
+        # Google News search feeds stop at a fixed number of entries
+        request.truncated = len(entries) >= self.query_limits.max_results
+
+        items = []
+        for entry in entries[:request.max_items or self.max_items]:
+            # Parse the actual publication date
+            published_at = entry['published_at']
+            items.append({
+                'title': entry['title'],
+                'description': entry['summary'],
+                'url': entry['link'],
+                'source': f"Google News - {entry.get('source', {}).get('href', 'Unknown')}",
+                'published_date': published_at.strftime('%Y-%m-%d %H:%M:%S') if published_at else entry['published'],
+                'published_at': published_at,
+                'guid': entry['id'] or entry['link'],
+            })
+        return items
+
+@register_source
+class LinkedInGoogleSource(Source):
+    """LinkedIn posts found through a Google news search restricted to linkedin.com"""
+    name = 'linkedin_google'
+
+    def __init__(self, session: requests.Session, url: str = GOOGLE_SEARCH_URL,
+                 source_label: Optional[str] = None, max_items: int = 5, **options):
+        super().__init__(session, max_items=max_items, **options)
+        self.url = url
+        # Fixed label for every result; by default the result's cited host is used
+        self.source_label = source_label
+
+    def build_requests(self, company: Dict, since: Optional[datetime]) -> List[SourceRequest]:
+        return [
+            SourceRequest(self.url, {'q': f'site:linkedin.com "{keyword}"', 'num': 10, 'tbm': 'nws'}, keyword)
+            for keyword in self.keywords(company)
+        ]
+
+    def parse(self, response: requests.Response, request: SourceRequest) -> List[Dict]:
+        items = []
+        for result in parse_results(response.content, self.max_items):
+            if result['title'] is None or not result['url'] or 'linkedin.com' not in result['url']:
+                continue
+
+            items.append({
+                'title': result['title'],
+                'description': result['snippet'] or '',
+                'url': result['url'],
+                'source': self.source_label or f"LinkedIn - {result['cite'] if result['cite'] is not None else 'LinkedIn'}",
+                # Search results carry no publish date, so they never advance a cursor
+                'published_date': datetime.now().isoformat(),
+                'published_at': None,
+                'guid': result['url'],
+            })
+        return items
+
+class SlugCache:
+    """
+    Which page slug answers for each company, persisted through a MentionDatabase
+    A company is probed one candidate slug per cycle until one answers; that slug
+    is then used alone until it goes missing, and a company none answer for is
+    skipped until recheck_days have passed
+    """
+
+    def __init__(self, db=None, source: str = 'linkedin_rss', recheck_days: float = LINKEDIN_SLUG_RECHECK_DAYS):
+        self.db = db
+        self.source = source
+        self.recheck_seconds = recheck_days * 86400
+        # company name -> (slug that answers, index of the next candidate to probe, time of the last answer)
+        self._entries: Dict[str, Tuple[Optional[str], int, Optional[float]]] = {}
+        self._changed = set()
+        self._lock = threading.Lock()
+        if db is not None:
+            self._entries.update(db.get_page_slugs(source))
+
+    def candidate(self, company_name: str, slugs: List[str]) -> Optional[str]:
+        """The one slug to request this cycle, or None while the company is a known miss"""
+        with self._lock:
+            slug, index, checked_at = self._entries.get(company_name, (None, 0, None))
+        if slug is not None:
+            return slug
+        if index < len(slugs):
+            return slugs[index]
+        if checked_at is not None and time.time() - checked_at < self.recheck_seconds:
+            return None
+        return slugs[0] if slugs else None
+
+    def record(self, company_name: str, slugs: List[str], slug: str, found: Optional[bool]):
+        """
+        Outcome of requesting a slug: True when it answered, False when it is
+        missing, None when the response says nothing about the slug
+        """
+        if found is None:
+            return
+        with self._lock:
+            known = self._entries.get(company_name, (None, 0, None))[0]
+            if found:
+                entry = (slug, 0, time.time())
+            elif slug == known:
+                # The page moved; discovery starts over next cycle
+                entry = (None, 0, time.time())
+            else:
+                entry = (None, slugs.index(slug) + 1 if slug in slugs else len(slugs), time.time())
+            self._entries[company_name] = entry
+            self._changed.add(company_name)
+
+    def save(self):
+        if self.db is None:
+            return
+        with self._lock:
+            rows = [(name, *self._entries[name]) for name in self._changed]
+            self._changed.clear()
+        self.db.save_page_slugs(self.source, rows)
+
+@register_source
+class LinkedInRSSSource(Source):
+    """Company page RSS feeds, tried under a few slug spellings until one answers"""
+    name = 'linkedin_rss'
+    # A company's own page is always about the company
+    filter_relevance = False
+    expected_statuses = (404, 999)  # LinkedIn answers unknown slugs and bots with these
+
+    def __init__(self, session: requests.Session, base_url: str = LINKEDIN_BASE_URL,
+                 source_label: str = 'LinkedIn Company Page', slug_variations: bool = True,
+                 slug_cache: Optional[SlugCache] = None, max_items: int = 3, timeout: float = 10, **options):
+        super().__init__(session, max_items=max_items, timeout=timeout, **options)
+        self.base_url = base_url
+        self.source_label = source_label
+        self.slug_variations = slug_variations
+        # Without a cache every slug spelling is tried each cycle until one yields items
+        self.slug_cache = slug_cache
+
+    def slugs(self, company: Dict) -> List[str]:
+        name = company['name'].lower()
+        slugs = [name.replace(' ', '-')]
+        if self.slug_variations:
+            slugs.extend(slug for slug in (name.replace(' ', ''), name) if slug not in slugs)
+        return slugs
+
+    def build_requests(self, company: Dict, since: Optional[datetime]) -> List[SourceRequest]:
+        slugs = self.slugs(company)
+        if self.slug_cache is not None:
+            slug = self.slug_cache.candidate(company['name'], slugs)
+            slugs = [slug] if slug else []
+        return [
+            SourceRequest(f"{self.base_url}/company/{slug}/rss/", keyword=slug, stop_on_items=True)
+            for slug in slugs
+        ]
+
+    def fetch(self, company: Dict, since: Optional[datetime] = None,
+              cursors: Optional[Dict[str, SourceCursor]] = None) -> Iterator[Dict]:
+        requests_ = self.build_requests(company, since)
+        yield from self._fetch(requests_, company['name'], cursors)
+        self._record_slugs(company, requests_)
+
+    async def afetch(self, company: Dict, since: Optional[datetime], cursors: Optional[Dict[str, SourceCursor]],
+                     client: 'AsyncHTTPClient', executor: Optional[Executor] = None) -> List[Dict]:
+        requests_ = self.build_requests(company, since)
+        items = await self._afetch(requests_, company['name'], cursors, client, executor)
+        self._record_slugs(company, requests_)
+        return items
+
+    def _record_slugs(self, company: Dict, requests_: List[SourceRequest]):
+        if self.slug_cache is not None:
+            for request in requests_:
+                self.slug_cache.record(company['name'], self.slugs(company), request.keyword, self._found(request))
+
+    def _found(self, request: SourceRequest) -> Optional[bool]:
+        if request.status is None:
+            return None
+        if 200 <= request.status < 300:
+            return True
+        return False if request.status in self.missing_statuses else None
+
+    def save(self):
+        if self.slug_cache is not None:
+            self.slug_cache.save()
+
+    def parse(self, response: requests.Response, request: SourceRequest) -> List[Dict]:
+        return [{
+            'title': entry['title'],
+            'description': entry['summary'],
+            'url': entry['link'],
+            'source': self.source_label,
+            'published_date': entry['published'],
+            'published_at': entry['published_at'],
+            'guid': entry['id'] or entry['link'],
+        } for entry in parse_feed(response.content)[:self.max_items]]
@@ -0,0 +1,133 @@
+"""
+Near-duplicate story clustering for portfolio mentions
+Groups syndicated copies of the same story using SimHash signatures
+and an LSH band index
+"""
+
+import hashlib
+import html
+import re
+import threading
+from typing import Dict, List, Optional
+
+SIMHASH_BITS = 64
+BAND_COUNT = 4
+BAND_BITS = SIMHASH_BITS // BAND_COUNT
+BAND_MASK = (1 << BAND_BITS) - 1
+
+# With 4 bands of 16 bits, any two signatures within 3 bits of each other
+# share at least one identical band, so the index never misses a match
+MAX_HAMMING_DISTANCE = BAND_COUNT - 1
+
+SHINGLE_SIZE = 3
+
+# Google News titles end with " - Publisher"; syndicated copies differ only there.
+# The publisher's own name may contain a dash ("EU-Startups"), just not a spaced one
+PUBLISHER_SUFFIX = re.compile(r'\s+[-|–—]\s+(?:(?!\s[-|–—]\s).){1,60}$')
+TOKEN_PATTERN = re.compile(r'[a-z0-9]+')
+TAG_PATTERN = re.compile(r'<[^>]+>')
+# Google News descriptions name the publisher again in a trailing <font> element
+FONT_PATTERN = re.compile(r'<font\b[^>]*>.*?</font>', re.IGNORECASE | re.DOTALL)
+
+def story_text(title: str, summary: str = '') -> str:
+    """
+    Text used to fingerprint a story: title and summary without markup, entities
+    or publisher names; a summary that only repeats the title is left out
+    """
+    title = PUBLISHER_SUFFIX.sub('', html.unescape(title or '').strip())
+    summary = html.unescape(TAG_PATTERN.sub(' ', FONT_PATTERN.sub(' ', summary or '')))
+    summary = PUBLISHER_SUFFIX.sub('', ' '.join(summary.split()))
+    if not summary or TOKEN_PATTERN.findall(summary.lower()) == TOKEN_PATTERN.findall(title.lower()):
+        return title
+    return f"{title} {summary}"
+
+def shingles(text: str, size: int = SHINGLE_SIZE) -> List[str]:
+    """Word shingles of the normalized text"""
+    tokens = TOKEN_PATTERN.findall(text.lower())
+    if len(tokens) <= size:
+        return [' '.join(tokens)] if tokens else []
+    return [' '.join(tokens[i:i + size]) for i in range(len(tokens) - size + 1)]
+
+def simhash(text: str) -> int:
+    """64-bit SimHash over word shingles"""
+    values = [
+        format(int.from_bytes(hashlib.blake2b(shingle.encode(), digest_size=8).digest(), 'big'), '064b')
+        for shingle in set(shingles(text))
+    ]
+    if not values:
+        return 0
+    
+    # Count set bits column-wise over the binary strings; a bit is set in the
+    # signature when it is set in more than half of the shingle hashes
+    half = len(values) / 2
+    return int(''.join('1' if column.count('1') > half else '0' for column in zip(*values)), 2)
+
+def hamming_distance(a: int, b: int) -> int:
+    """Number of differing bits between two signatures"""
+    return bin(a ^ b).count('1')
+
+def to_signed(value: int) -> int:
+    """Convert an unsigned 64-bit signature to SQLite's signed INTEGER range"""
+    return value - (1 << 64) if value >= 1 << 63 else value
+
+def to_unsigned(value: int) -> int:
+    """Convert a signature read back from SQLite to unsigned"""
+    return value + (1 << 64) if value < 0 else value
+
+class StoryClusterIndex:
+    def __init__(self, max_distance: int = MAX_HAMMING_DISTANCE):
+        self.max_distance = max_distance
+        self._bands: Dict[str, List[Dict[int, List[tuple]]]] = {}
+        self._lock = threading.Lock()
+    
+    def _company_bands(self, company: str) -> List[Dict[int, List[tuple]]]:
+        if company not in self._bands:
+            self._bands[company] = [{} for _ in range(BAND_COUNT)]
+        return self._bands[company]
+    
+    def find(self, company: str, signature: int) -> Optional[int]:
+        """Story id of an indexed near-duplicate, if any"""
+        with self._lock:
+            bands = self._bands.get(company)
+            if not bands:
+                return None
+            
+            for band, buckets in enumerate(bands):
+                key = (signature >> (band * BAND_BITS)) & BAND_MASK
+                for candidate, story_id in buckets.get(key, ()):
+                    if hamming_distance(candidate, signature) <= self.max_distance:
+                        return story_id
+        return None
+    
+    def add(self, company: str, signature: int, story_id: int):
+        """Index a signature under its story id"""
+        with self._lock:
+            bands = self._company_bands(company)
+            for band, buckets in enumerate(bands):
+                key = (signature >> (band * BAND_BITS)) & BAND_MASK
+                buckets.setdefault(key, []).append((signature, story_id))
+
+def collapse_stories(mentions: List[Dict]) -> List[Dict]:
+    """
+    Collapse mentions of the same story into one representative
+    The first mention of each story is kept with duplicate_count and
+    duplicate_sources describing the rest
+    """
+    collapsed = []
+    by_story = {}
+    for mention in mentions:
+        story_id = mention.get('story_id')
+        key = (mention.get('company_name'), story_id)
+        if story_id is None:
+            collapsed.append(mention)
+            continue
+        
+        if key not in by_story:
+            representative = dict(mention, duplicate_count=0, duplicate_sources=[])
+            by_story[key] = representative
+            collapsed.append(representative)
+        else:
+            representative = by_story[key]
+            representative['duplicate_count'] += 1
+            representative['duplicate_sources'].append(mention.get('source', ''))
+    return collapsed
@@ -0,0 +1,157 @@
+"""
+Tests for the alert outbox: claiming with a lease, digest windows and retries
+Run with: python -m pytest test_alert_outbox.py
+"""
+
+import pytest
+
+from alert_dispatcher import AlertDispatcher
+from database import MentionDatabase
+
+@pytest.fixture
+def db(tmp_path):
+    db = MentionDatabase(str(tmp_path / 'mentions.db'))
+    db.register_alert_types(['email'])
+    return db
+
+def add_mentions(db, company, count, start=0):
+    return [db.add_mention({
+        'company_name': company,
+        'title': f"{company} story number {i} about something else entirely {i * 7919}",
+        'content': '',
+        'url': f"https://example.com/{company.lower()}/{i}",
+        'source': 'test',
+        'published_date': '2024-06-01 12:00:00',
+        'sentiment_score': 0.0,
+    }) for i in range(start, start + count)]
+
+def statuses(db):
+    with db._connect() as conn:
+        return dict(conn.execute("SELECT id, status FROM alerts").fetchall())
+
+def execute(db, sql, params=()):
+    with db._connect() as conn:
+        conn.execute(sql, params)
+        conn.commit()
+
+def test_new_mentions_enqueue_one_alert_per_type(db):
+    db.register_alert_types(['email', 'slack'])
+    add_mentions(db, 'Kuzudb', 2)
+    with db._connect() as conn:
+        rows = conn.execute("SELECT alert_type, status, idempotency_key FROM alerts").fetchall()
+    assert sorted(alert_type for alert_type, _, _ in rows) == ['email', 'email', 'slack', 'slack']
+    assert {status for _, status, _ in rows} == {'pending'}
+    assert len({key for _, _, key in rows}) == 4
+
+def test_claimed_alerts_are_leased(db):
+    add_mentions(db, 'Kuzudb', 3)
+    claimed = db.claim_due_alerts(limit=10)
+    assert len(claimed) == 3
+    assert set(statuses(db).values()) == {'sending'}
+    # A second dispatcher gets nothing while the lease holds
+    assert db.claim_due_alerts(limit=10) == []
+
+def test_claim_respects_the_limit(db):
+    add_mentions(db, 'Kuzudb', 5)
+    assert len(db.claim_due_alerts(limit=2)) == 2
+    assert len(db.claim_due_alerts(limit=10)) == 3
+
+def test_expired_lease_is_claimed_again(db):
+    add_mentions(db, 'Kuzudb', 1)
+    first = db.claim_due_alerts(limit=10)
+    # The dispatcher that claimed it died; its lease runs out
+    execute(db, "UPDATE alerts SET next_attempt_at = datetime('now', '-1 seconds')")
+    again = db.claim_due_alerts(limit=10)
+    assert [row['alert_id'] for row in again] == [row['alert_id'] for row in first]
+
+def test_digest_window_holds_new_alerts(db):
+    add_mentions(db, 'Kuzudb', 2)
+    assert db.claim_due_alerts(limit=10, digest_window_minutes=30, digest_max_size=5) == []
+    assert [(d['company_name'], d['pending']) for d in db.get_pending_digests()] == [('Kuzudb', 2)]
+
+def test_digest_window_releases_after_the_oldest_waited(db):
+    add_mentions(db, 'Kuzudb', 2)
+    add_mentions(db, 'Ubicloud', 1)
+    execute(db, """
+        UPDATE alerts SET created_at = datetime('now', '-31 minutes')
+        WHERE mention_id IN (SELECT id FROM mentions WHERE company_name = 'Kuzudb')
+    """)
+    claimed = db.claim_due_alerts(limit=10, digest_window_minutes=30, digest_max_size=5)
+    assert sorted(row['company_name'] for row in claimed) == ['Kuzudb', 'Kuzudb']
+
+def test_digest_window_releases_a_full_digest(db):
+    add_mentions(db, 'Kuzudb', 3)
+    add_mentions(db, 'Ubicloud', 1)
+    claimed = db.claim_due_alerts(limit=10, digest_window_minutes=30, digest_max_size=3)
+    assert sorted(row['company_name'] for row in claimed) == ['Kuzudb'] * 3
+
+def test_failed_delivery_is_retried_after_backoff(db):
+    add_mentions(db, 'Kuzudb', 1)
+    dispatcher = AlertDispatcher(db, {'email': lambda rows: False}, base_delay=60, max_delay=600,
+                                 digest_window_minutes=0)
+    assert dispatcher.drain() == {'email': False}
+    with db._connect() as conn:
+        status, attempts, due_later = conn.execute("""
+            SELECT status, attempts, next_attempt_at > CURRENT_TIMESTAMP FROM alerts
+        """).fetchone()
+    assert (status, attempts, due_later) == ('retry', 1, 1)
+    # Not due until the backoff has passed
+    assert db.claim_due_alerts(limit=10) == []
+    execute(db, "UPDATE alerts SET next_attempt_at = datetime('now', '-1 seconds')")
+    assert len(db.claim_due_alerts(limit=10)) == 1
+
+def test_backoff_grows_and_is_capped():
+    dispatcher = AlertDispatcher(None, {}, base_delay=30, max_delay=3600)
+    for attempts, ceiling in ((1, 30), (2, 60), (3, 120), (10, 3600)):
+        delay = dispatcher.backoff_delay(attempts)
+        assert ceiling // 2 <= delay <= ceiling
+
+def test_alert_fails_after_max_attempts(db):
+    add_mentions(db, 'Kuzudb', 1)
+    dispatcher = AlertDispatcher(db, {'email': lambda rows: False}, max_attempts=2, digest_window_minutes=0)
+    dispatcher.drain()
+    assert set(statuses(db).values()) == {'retry'}
+    execute(db, "UPDATE alerts SET next_attempt_at = datetime('now', '-1 seconds')")
+    dispatcher.drain()
+    assert set(statuses(db).values()) == {'failed'}
+    assert db.claim_due_alerts(limit=10) == []
+
+def test_sender_exception_counts_as_failure(db):
+    add_mentions(db, 'Kuzudb', 1)
+
+    def broken(rows):
+        raise RuntimeError('smtp down')
+
+    AlertDispatcher(db, {'email': broken}, digest_window_minutes=0).drain()
+    with db._connect() as conn:
+        assert conn.execute("SELECT status, error_message FROM alerts").fetchone() == ('retry', 'smtp down')
+
+def test_missing_sender_fails_at_once(db):
+    add_mentions(db, 'Kuzudb', 1)
+    AlertDispatcher(db, {}, digest_window_minutes=0).drain()
+    assert set(statuses(db).values()) == {'failed'}
+
+def test_one_digest_per_channel_and_company(db):
+    add_mentions(db, 'Kuzudb', 2)
+    add_mentions(db, 'Ubicloud', 1)
+    digests = []
+
+    def sender(rows):
+        digests.append(sorted(row['company_name'] for row in rows))
+        return True
+
+    assert AlertDispatcher(db, {'email': sender}, digest_window_minutes=0).drain() == {'email': True}
+    assert sorted(digests) == [['Kuzudb', 'Kuzudb'], ['Ubicloud']]
+    assert set(statuses(db).values()) == {'sent'}
+
+def test_partly_delivered_digest_retries_only_the_rest(db):
+    ids = add_mentions(db, 'Kuzudb', 3)
+
+    def sender(rows):
+        # The message carrying the first mention went out, the one after it failed
+        return [row['alert_id'] for row in rows if row['id'] == ids[0]]
+
+    AlertDispatcher(db, {'email': sender}, digest_window_minutes=0).drain()
+    with db._connect() as conn:
+        rows = dict(conn.execute("SELECT mention_id, status FROM alerts").fetchall())
+    assert rows == {ids[0]: 'sent', ids[1]: 'retry', ids[2]: 'retry'}
@@ -0,0 +1,93 @@
+"""
+Tests for the per-source and per-endpoint circuit breakers
+Run with: python -m pytest test_circuit_breaker.py
+"""
+
+import pytest
+
+from circuit_breaker import CLOSED, HALF_OPEN, OPEN, SOURCE_ENDPOINT, CircuitBreaker, CircuitBreakers
+from database import MentionDatabase
+
+SETTINGS = {'window': 4, 'failure_rate': 0.5, 'min_calls': 2, 'cooldown': 60, 'max_cooldown': 240}
+
+@pytest.fixture
+def db(tmp_path):
+    return MentionDatabase(str(tmp_path / 'mentions.db'))
+
+def health(db):
+    return {(row['source'], row['endpoint']): row for row in db.get_source_health()}
+
+def test_breaker_opens_and_probes_after_cooldown():
+    breaker = CircuitBreaker(**SETTINGS)
+    breaker.record(False, now=0)
+    assert breaker.state == CLOSED
+    breaker.record(False, now=1)
+    assert breaker.state == OPEN
+    assert not breaker.available(now=30)
+    assert breaker.available(now=61)
+    breaker.start(now=61)
+    assert breaker.state == HALF_OPEN
+    # Only one probe at a time
+    assert not breaker.available(now=62)
+
+def test_failed_probe_doubles_the_cooldown_up_to_the_max():
+    breaker = CircuitBreaker(**SETTINGS)
+    breaker.record(False, now=0)
+    breaker.record(False, now=0)
+    now = 0
+    for cooldown in (120, 240, 240):
+        now = breaker.open_until
+        breaker.start(now)
+        breaker.record(False, now)
+        assert (breaker.state, breaker.cooldown) == (OPEN, cooldown)
+
+def test_successful_probe_closes_the_breaker():
+    breaker = CircuitBreaker(**SETTINGS)
+    breaker.record(False, now=0)
+    breaker.record(False, now=0)
+    breaker.start(now=60)
+    breaker.record(True, now=60)
+    assert (breaker.state, breaker.cooldown) == (CLOSED, 60)
+
+def test_state_survives_a_restart(db):
+    breakers = CircuitBreakers(db, **SETTINGS)
+    breakers.record('google_news', 'https://news.google.com/rss/search', False)
+    breakers.record('google_news', 'https://news.google.com/rss/search', False)
+    breakers.record('newsapi', 'https://newsapi.org/v2/everything', True)
+    breakers.save()
+
+    restarted = CircuitBreakers(db, **SETTINGS)
+    assert not restarted.allow('google_news', 'https://news.google.com/rss/search')
+    assert restarted.allow('newsapi', 'https://newsapi.org/v2/everything')
+    rows = health(db)
+    assert rows[('google_news', SOURCE_ENDPOINT)]['state'] == OPEN
+    assert rows[('newsapi', SOURCE_ENDPOINT)]['state'] == CLOSED
+    assert rows[('google_news', SOURCE_ENDPOINT)]['health'] < rows[('newsapi', SOURCE_ENDPOINT)]['health']
+
+def test_unanswered_probe_is_saved_as_open(db):
+    breakers = CircuitBreakers(db, **dict(SETTINGS, cooldown=0))
+    breakers.record('newsapi', 'https://newsapi.org/v2/everything', False)
+    breakers.record('newsapi', 'https://newsapi.org/v2/everything', False)
+    assert breakers.allow('newsapi', 'https://newsapi.org/v2/everything')
+    breakers.save()
+    assert health(db)[('newsapi', SOURCE_ENDPOINT)]['state'] == OPEN
+
+def test_save_writes_only_breakers_with_new_outcomes(db):
+    first = CircuitBreakers(db, **SETTINGS)
+    second = CircuitBreakers(db, **SETTINGS)
+    first.record('google_news', 'https://news.google.com/rss/search', False)
+    first.record('google_news', 'https://news.google.com/rss/search', False)
+    second.record('newsapi', 'https://newsapi.org/v2/everything', True)
+    first.save()
+    # second loaded google_news as closed; saving last must not write that back
+    second.save()
+    rows = health(db)
+    assert rows[('google_news', SOURCE_ENDPOINT)]['state'] == OPEN
+    assert rows[('newsapi', SOURCE_ENDPOINT)]['state'] == CLOSED
+
+def test_endpoint_failures_can_spare_the_source(db):
+    breakers = CircuitBreakers(db, **SETTINGS)
+    for _ in range(2):
+        breakers.record('linkedin_rss', 'https://www.linkedin.com/company/a/rss', False, source_ok=True)
+    assert not breakers.allow('linkedin_rss', 'https://www.linkedin.com/company/a/rss')
+    assert breakers.allow('linkedin_rss', 'https://www.linkedin.com/company/b/rss')
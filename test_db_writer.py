@@ -0,0 +1,119 @@
+"""
+Tests for the database writer thread
+Run with: python -m pytest test_db_writer.py
+"""
+
+import sqlite3
+
+import pytest
+
+import db_writer
+from database import MentionDatabase
+from db_writer import DatabaseWriter
+
+TIMEOUT = 5
+
+@pytest.fixture
+def db(tmp_path):
+    return MentionDatabase(str(tmp_path / 'mentions.db'))
+
+def mention(i, company='Kuzudb'):
+    return {
+        'company_name': company,
+        'title': f"{company} story number {i} about something else entirely {i * 7919}",
+        'content': '',
+        'url': f"https://example.com/{company.lower()}/{i}",
+        'source': 'test',
+        'published_date': '2024-06-01 12:00:00',
+        'sentiment_score': 0.0,
+    }
+
+def count_mentions(db):
+    with db._connect() as conn:
+        return conn.execute("SELECT COUNT(*) FROM mentions").fetchone()[0]
+
+def test_queued_mentions_are_committed_with_ids(db):
+    writer = DatabaseWriter(db)
+    futures = [writer.add_mention(mention(i)) for i in range(5)]
+    ids = [future.result(TIMEOUT) for future in futures]
+    assert all(ids) and len(set(ids)) == 5
+    assert count_mentions(db) == 5
+
+def test_duplicate_resolves_to_none(db):
+    writer = DatabaseWriter(db)
+    assert writer.add_mention(mention(1)).result(TIMEOUT)
+    assert writer.add_mention(mention(1)).result(TIMEOUT) is None
+
+def test_malformed_mention_fails_alone(db):
+    writer = DatabaseWriter(db, flush_ms=200)
+    good = writer.add_mention(mention(1))
+    bad = writer.add_mention({'title': 'no url or company'})
+    other = writer.add_mention(mention(2))
+    with pytest.raises(KeyError):
+        bad.result(TIMEOUT)
+    assert good.result(TIMEOUT) and other.result(TIMEOUT)
+
+def test_database_error_fails_the_group(db, monkeypatch):
+    writer = DatabaseWriter(db)
+
+    def broken(cursor, mention_data):
+        raise sqlite3.OperationalError('disk I/O error')
+
+    monkeypatch.setattr(db, 'insert_mention', broken)
+    with pytest.raises(sqlite3.OperationalError):
+        writer.add_mention(mention(1)).result(TIMEOUT)
+
+def test_unexpected_error_does_not_kill_the_writer(db, monkeypatch):
+    writer = DatabaseWriter(db)
+    apply = writer._apply
+    calls = []
+
+    def flaky(cursor, group):
+        calls.append(len(group))
+        if len(calls) == 1:
+            raise ValueError('boom')
+        return apply(cursor, group)
+
+    monkeypatch.setattr(writer, '_apply', flaky)
+    with pytest.raises(ValueError):
+        writer.add_mention(mention(1)).result(TIMEOUT)
+    # Later writes are still committed instead of hanging
+    assert writer.add_mention(mention(2)).result(TIMEOUT)
+    writer.flush(TIMEOUT)
+
+def test_failed_connect_fails_writes_and_the_next_thread_reconnects(db, monkeypatch):
+    writer = DatabaseWriter(db)
+    connect = db_writer.connect
+
+    def refuse(path):
+        raise sqlite3.OperationalError('unable to open database file')
+
+    monkeypatch.setattr(db_writer, 'connect', refuse)
+    with pytest.raises(sqlite3.OperationalError):
+        writer.add_mention(mention(1)).result(TIMEOUT)
+    monkeypatch.setattr(db_writer, 'connect', connect)
+    assert writer.add_mention(mention(2)).result(TIMEOUT)
+
+def test_idle_writer_exits_and_restarts(db, monkeypatch):
+    monkeypatch.setattr(db_writer, 'IDLE_SECONDS', 0.05)
+    writer = DatabaseWriter(db)
+    assert writer.add_mention(mention(1)).result(TIMEOUT)
+    thread = writer._thread
+    thread.join(TIMEOUT)
+    assert writer._thread is None
+    assert writer.add_mention(mention(2)).result(TIMEOUT)
+    assert count_mentions(db) == 2
+
+def test_disabled_writer_writes_inline(db):
+    writer = DatabaseWriter(db, enabled=False)
+    future = writer.add_mention(mention(1))
+    assert future.done() and future.result()
+    assert writer._thread is None
+
+def test_alert_records_are_written(db):
+    writer = DatabaseWriter(db)
+    mention_id = writer.add_mention(mention(1)).result(TIMEOUT)
+    writer.add_alert_records([(mention_id, 'email', 'sent'), (mention_id, 'slack', 'failed')]).result(TIMEOUT)
+    with db._connect() as conn:
+        assert sorted(conn.execute("SELECT alert_type, status FROM alerts").fetchall()) == \
+            [('email', 'sent'), ('slack', 'failed')]
@@ -0,0 +1,118 @@
+"""
+Tests for OR query planning and the splitting of truncated queries
+Run with: python -m pytest test_query_planner.py
+"""
+
+import pytest
+
+from database import MentionDatabase
+from monitor_engine import MonitorEngine
+from query_planner import QueryBatch, QueryLimits, halves, or_query, plan_queries
+from sources import Source, SourceCursor, SourceRequest
+
+KUZU = {'name': 'Kuzudb', 'keywords': ['Kuzu', 'Kuzudb', 'Kùzu graph database', 'Semih Salihoglu']}
+UBICLOUD = {'name': 'Ubicloud', 'keywords': ['Ubicloud']}
+PEERDB = {'name': 'PeerDB', 'keywords': ['PeerDB']}
+
+class Response:
+    status_code = 200
+
+    def __init__(self, query):
+        self.query = query
+
+    def raise_for_status(self):
+        pass
+
+class Session:
+    """Answers every query with one item per OR term, recording the queries asked"""
+
+    def __init__(self):
+        self.queries = []
+
+    def get(self, url, params=None, timeout=None):
+        self.queries.append(params['q'])
+        return Response(params['q'])
+
+class OrSource(Source):
+    name = 'or_source'
+    # Three results per query, so four ORed keywords come back cut off
+    query_limits = QueryLimits(max_length=200, max_results=3)
+
+    def build_batch_requests(self, batch, since):
+        return [SourceRequest('https://search.example.com', {'q': batch.query}, keyword=batch.query)]
+
+    def parse(self, response, request):
+        terms = response.query.split(' OR ')
+        request.truncated = len(terms) >= self.query_limits.max_results
+        return [{'guid': term, 'title': term} for term in terms[:self.query_limits.max_results]]
+
+def test_keywords_are_packed_up_to_max_terms():
+    batches = plan_queries([(KUZU, KUZU['keywords'])], QueryLimits(max_length=500), max_terms=3)
+    assert [batch.terms for batch in batches] == [KUZU['keywords'][:3], KUZU['keywords'][3:]]
+    assert batches[0].query == 'Kuzu OR Kuzudb OR (Kùzu graph database)'
+
+def test_keywords_are_packed_up_to_the_query_length():
+    limits = QueryLimits(max_length=len('Kuzu OR Kuzudb'))
+    batches = plan_queries([(KUZU, KUZU['keywords'])], limits, max_terms=10)
+    assert [batch.terms for batch in batches][0] == ['Kuzu', 'Kuzudb']
+    assert all(len(batch.query) <= limits.max_length or len(batch.terms) == 1 for batch in batches)
+
+def test_word_limit_counts_operators():
+    limits = QueryLimits(max_length=500, max_words=3)
+    batches = plan_queries([(KUZU, ['Kuzu', 'Kuzudb', 'Kuzu'])], limits, max_terms=10)
+    # Duplicates are dropped and 'Kuzu OR Kuzudb' is three words
+    assert [batch.terms for batch in batches] == [['Kuzu', 'Kuzudb']]
+
+def test_companies_share_queries_only_when_combined():
+    groups = [(UBICLOUD, UBICLOUD['keywords']), (PEERDB, PEERDB['keywords'])]
+    limits = QueryLimits(max_length=500)
+    assert len(plan_queries(groups, limits, max_terms=10)) == 2
+    shared = plan_queries(groups, limits, max_terms=10, combine_companies=True)
+    assert [(batch.terms, batch.label) for batch in shared] == [(['Ubicloud', 'PeerDB'], 'Ubicloud+PeerDB')]
+
+def test_a_company_needing_several_queries_is_not_combined():
+    groups = [(KUZU, KUZU['keywords']), (UBICLOUD, UBICLOUD['keywords'])]
+    batches = plan_queries(groups, QueryLimits(max_length=500), max_terms=3, combine_companies=True)
+    assert [batch.label for batch in batches] == ['Kuzudb', 'Kuzudb', 'Ubicloud']
+
+def test_halves_keep_every_company():
+    batch = QueryBatch(['Ubicloud', 'PeerDB', 'Kuzu'], [UBICLOUD, PEERDB, KUZU])
+    first, second = halves(batch)
+    assert (first.terms, second.terms) == (['Ubicloud'], ['PeerDB', 'Kuzu'])
+    assert first.companies == second.companies == batch.companies
+
+@pytest.fixture
+def engine(tmp_path):
+    return MonitorEngine(MentionDatabase(str(tmp_path / 'mentions.db')), [], batch_queries=True, max_query_terms=10)
+
+def test_truncated_query_is_fetched_as_halves_and_marked_split(engine):
+    session = Session()
+    source = OrSource(session)
+    cursors = {}
+    batch = engine.plan(source, [KUZU], cursors)[0]
+    items = list(source.fetch_batch(batch, None, cursors))
+    assert sorted(item['guid'] for item in items) == sorted(or_query(KUZU['keywords']).split(' OR '))
+    assert session.queries == [
+        or_query(KUZU['keywords']),
+        or_query(KUZU['keywords'][:2]),
+        or_query(KUZU['keywords'][2:]),
+    ]
+    assert cursors[batch.query].split
+
+def test_split_cursor_plans_the_halves_next_cycle(engine):
+    source = OrSource(Session())
+    cursors = {}
+    batch = engine.plan(source, [KUZU], cursors)[0]
+    list(source.fetch_batch(batch, None, cursors))
+
+    # The split flag survives a save and load
+    reloaded = {query: SourceCursor.from_row(*cursor.to_row()) for query, cursor in cursors.items()}
+    session = Session()
+    source = OrSource(session)
+    planned = engine.plan(source, [KUZU], reloaded)
+    assert [part.terms for part in planned] == [KUZU['keywords'][:2], KUZU['keywords'][2:]]
+    # The whole query's cursor is kept in use so it is saved again
+    assert reloaded[batch.query].used
+    for part in planned:
+        list(source.fetch_batch(part, None, reloaded))
+    assert or_query(KUZU['keywords']) not in session.queries
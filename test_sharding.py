@@ -0,0 +1,89 @@
+"""
+Tests for sharded monitoring cycles: cursors are held back for companies whose mentions failed to store
+Run with: python -m pytest test_sharding.py
+"""
+
+import sqlite3
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+import sharding
+from database import MentionDatabase
+from monitor_engine import QUERY_CURSOR_SCOPE
+from sharding import run_sharded
+
+COMPANIES = [{'name': 'Kuzudb', 'keywords': ['Kuzu']}, {'name': 'Ubicloud', 'keywords': ['Ubicloud']}]
+
+class WorkerThreads(ThreadPoolExecutor):
+    """Runs the shards on threads of this process, so the fake monitor below needs no pickling"""
+
+    def __init__(self, max_workers, mp_context=None, **kwargs):
+        super().__init__(max_workers, **kwargs)
+
+class Resolver:
+    def resolve_mentions(self, mentions):
+        pass
+
+class Engine:
+    """Finds one mention per company and saves a cursor for it and for the batched queries"""
+
+    def __init__(self, db):
+        self.db = db
+        self.resolver = Resolver()
+
+    def run(self, companies, submit):
+        for company in companies:
+            submit(company, [{
+                'company_name': company['name'],
+                'title': f"{company['name']} launches something new",
+                'content': '',
+                'url': f"https://example.com/{company['name'].lower()}",
+                'source': 'test',
+                'published_date': '2024-06-01 12:00:00',
+                'sentiment_score': 0.0,
+            }])
+            self.db.save_source_cursors(company['name'], [('test', company['keywords'][0], '2024-06-01', '{}', 0)])
+        self.db.save_source_cursors(QUERY_CURSOR_SCOPE, [('test', 'Kuzu OR Ubicloud', '2024-06-01', '{}', 0)])
+
+class Monitor:
+    def __init__(self, db):
+        self.engine = Engine(db)
+
+class BrokenDatabase(MentionDatabase):
+    """Fails to store Kuzudb's mentions"""
+
+    def insert_mention(self, cursor, mention_data):
+        if mention_data['company_name'] == 'Kuzudb':
+            raise sqlite3.OperationalError('disk I/O error')
+        return super().insert_mention(cursor, mention_data)
+
+@pytest.fixture(autouse=True)
+def worker_threads(monkeypatch):
+    monkeypatch.setattr(sharding, 'ProcessPoolExecutor', WorkerThreads)
+
+def cursor_companies(db):
+    with db._connect() as conn:
+        return {name for name, in conn.execute("SELECT company_name FROM source_cursors")}
+
+def test_stored_mentions_save_every_cursor(tmp_path):
+    db = MentionDatabase(str(tmp_path / 'mentions.db'))
+    new_mentions, = run_sharded([Monitor], COMPANIES, db, shards=2)
+    assert sorted(mention['company_name'] for mention in new_mentions) == ['Kuzudb', 'Ubicloud']
+    assert all(mention['id'] for mention in new_mentions)
+    assert cursor_companies(db) == {'Kuzudb', 'Ubicloud', QUERY_CURSOR_SCOPE}
+
+def test_failed_company_cursors_are_held_back(tmp_path):
+    db = BrokenDatabase(str(tmp_path / 'mentions.db'))
+    new_mentions, = run_sharded([Monitor], COMPANIES, db, shards=2)
+    assert [mention['company_name'] for mention in new_mentions] == ['Ubicloud']
+    # Kuzudb's items are fetched again next cycle
+    assert 'Kuzudb' not in cursor_companies(db)
+    assert 'Ubicloud' in cursor_companies(db)
+
+def test_batched_query_cursors_are_held_back_after_a_failure(tmp_path):
+    db = BrokenDatabase(str(tmp_path / 'mentions.db'))
+    # One shard, so the batched queries are saved after Kuzudb's failure is known
+    new_mentions, = run_sharded([Monitor], COMPANIES, db, shards=1)
+    assert [mention['company_name'] for mention in new_mentions] == ['Ubicloud']
+    assert cursor_companies(db) == {'Ubicloud'}
@@ -0,0 +1,109 @@
+"""
+Tests for the pooled SMTP sender against a local SMTP server
+Run with: python -m pytest test_smtp_pool.py
+"""
+
+import threading
+import warnings
+
+import pytest
+
+with warnings.catch_warnings():
+    warnings.simplefilter('ignore', DeprecationWarning)
+    asyncore = pytest.importorskip('asyncore')
+    smtpd = pytest.importorskip('smtpd')
+
+from smtp_pool import PooledSMTPSender
+
+MESSAGE = "Subject: Portfolio alert\r\n\r\nKuzudb raises a Series A\r\n"
+
+class LocalChannel(smtpd.SMTPChannel):
+    def found_terminator(self):
+        # Hang up once the message is in, before the final reply
+        if self.smtp_state == self.DATA and self.smtp_server.drop_after_data:
+            self.smtp_server.drop_after_data = False
+            self.smtp_server.received.append(self.mailfrom)
+            self.close()
+            return
+        super().found_terminator()
+
+class LocalSMTPServer(smtpd.SMTPServer):
+    """Records each accepted message; replies with the queued statuses instead while there are any"""
+    channel_class = LocalChannel
+
+    def __init__(self):
+        self.map = {}
+        self.received = []
+        self.rejections = []
+        self.drop_after_data = False
+        super().__init__(('127.0.0.1', 0), None, map=self.map, decode_data=False)
+        self.port = self.socket.getsockname()[1]
+        self.thread = threading.Thread(target=asyncore.loop, kwargs={'timeout': 0.05, 'map': self.map},
+                                       daemon=True)
+        self.thread.start()
+
+    def process_message(self, peer, mailfrom, rcpttos, data, **kwargs):
+        if self.rejections:
+            return self.rejections.pop(0)
+        self.received.append(mailfrom)
+        return None
+
+    def hang_up(self):
+        """Drop every open client connection, as an idle timeout on the server would"""
+        for channel in list(self.map.values()):
+            if channel is not self:
+                channel.close()
+
+    def stop(self):
+        for channel in list(self.map.values()):
+            channel.close()
+        self.thread.join(timeout=5)
+
+@pytest.fixture
+def server():
+    server = LocalSMTPServer()
+    yield server
+    server.stop()
+
+@pytest.fixture
+def sender(server):
+    sender = PooledSMTPSender('127.0.0.1', server.port, use_tls=False, timeout=5)
+    yield sender
+    sender.close()
+
+def messages(*senders):
+    return [(from_addr, ['team@example.com'], MESSAGE) for from_addr in senders]
+
+def test_accepted_messages_share_one_connection(server, sender):
+    assert sender.send_many(messages('a@example.com', 'b@example.com', 'c@example.com')) == 3
+    assert server.received == ['a@example.com', 'b@example.com', 'c@example.com']
+    assert sender.connections_opened == 1
+
+def test_rejection_after_data_is_not_counted_and_resets_the_connection(server, sender):
+    server.rejections.append('554 Message rejected as spam')
+    assert sender.send_many(messages('a@example.com', 'b@example.com')) == 1
+    # The second message went out over the same connection after the RSET
+    assert server.received == ['b@example.com']
+    assert sender.connections_opened == 1
+
+def test_421_after_data_closes_the_connection(server, sender):
+    server.rejections.append('421 Service shutting down')
+    assert not sender.send('a@example.com', ['team@example.com'], MESSAGE)
+    assert sender.send('b@example.com', ['team@example.com'], MESSAGE)
+    assert server.received == ['b@example.com']
+    assert sender.connections_opened == 2
+
+def test_connection_dropped_before_data_is_retried_once(server, sender):
+    assert sender.send('a@example.com', ['team@example.com'], MESSAGE)
+    server.hang_up()
+    assert sender.send('b@example.com', ['team@example.com'], MESSAGE)
+    assert server.received == ['a@example.com', 'b@example.com']
+    assert sender.connections_opened == 2
+
+def test_connection_dropped_after_data_is_not_resent(server, sender):
+    server.drop_after_data = True
+    assert not sender.send('a@example.com', ['team@example.com'], MESSAGE)
+    # The server had the message, so a resend would have delivered it twice
+    assert server.received == ['a@example.com']
+    assert sender.send('b@example.com', ['team@example.com'], MESSAGE)
+    assert server.received == ['a@example.com', 'b@example.com']
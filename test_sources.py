@@ -0,0 +1,67 @@
+"""
+Tests for the LinkedIn page slug cache
+Run with: python -m pytest test_sources.py
+"""
+
+import time
+
+import pytest
+
+from database import MentionDatabase
+from sources import SlugCache
+
+SLUGS = ['kuzudb', 'kuzu-inc', 'kuzu']
+
+@pytest.fixture
+def db(tmp_path):
+    return MentionDatabase(str(tmp_path / 'mentions.db'))
+
+def test_candidates_are_probed_one_per_cycle(db):
+    cache = SlugCache(db)
+    assert cache.candidate('Kuzudb', SLUGS) == 'kuzudb'
+    cache.record('Kuzudb', SLUGS, 'kuzudb', False)
+    assert cache.candidate('Kuzudb', SLUGS) == 'kuzu-inc'
+    cache.record('Kuzudb', SLUGS, 'kuzu-inc', True)
+    assert cache.candidate('Kuzudb', SLUGS) == 'kuzu-inc'
+
+def test_uninformative_response_changes_nothing(db):
+    cache = SlugCache(db)
+    cache.record('Kuzudb', SLUGS, 'kuzudb', None)
+    assert cache.candidate('Kuzudb', SLUGS) == 'kuzudb'
+    cache.save()
+    assert db.get_page_slugs('linkedin_rss') == {}
+
+def test_found_slug_survives_a_restart(db):
+    cache = SlugCache(db)
+    cache.record('Kuzudb', SLUGS, 'kuzu', True)
+    cache.save()
+    assert SlugCache(db).candidate('Kuzudb', SLUGS) == 'kuzu'
+    # Other sources keep their own slugs
+    assert SlugCache(db, source='other').candidate('Kuzudb', SLUGS) == 'kuzudb'
+
+def test_missing_known_slug_restarts_discovery(db):
+    cache = SlugCache(db)
+    cache.record('Kuzudb', SLUGS, 'kuzu', True)
+    cache.record('Kuzudb', SLUGS, 'kuzu', False)
+    assert cache.candidate('Kuzudb', SLUGS) == 'kuzudb'
+
+def test_company_no_slug_answers_for_is_skipped_until_recheck(db):
+    cache = SlugCache(db, recheck_days=1)
+    for slug in SLUGS:
+        cache.record('Kuzudb', SLUGS, slug, False)
+    assert cache.candidate('Kuzudb', SLUGS) is None
+    cache.save()
+
+    db.save_page_slugs('linkedin_rss', [('Kuzudb', None, len(SLUGS), time.time() - 2 * 86400)])
+    assert SlugCache(db, recheck_days=1).candidate('Kuzudb', SLUGS) == 'kuzudb'
+
+def test_save_writes_only_changed_companies(db):
+    first = SlugCache(db)
+    second = SlugCache(db)
+    first.record('Kuzudb', SLUGS, 'kuzu', True)
+    second.record('Ubicloud', ['ubicloud'], 'ubicloud', True)
+    first.save()
+    second.save()
+    saved = db.get_page_slugs('linkedin_rss')
+    # second never saw Kuzudb's slug and must not write its stale view back
+    assert {name: slug for name, (slug, _, _) in saved.items()} == {'Kuzudb': 'kuzu', 'Ubicloud': 'ubicloud'}
@@ -0,0 +1,55 @@
+"""
+Tests for near-duplicate story clustering
+Run with: python -m pytest test_story_clustering.py
+"""
+
+import os
+
+from database import MentionDatabase
+from rss_parser import parse_google_news_rss
+from story_clustering import hamming_distance, simhash, story_text, MAX_HAMMING_DISTANCE
+
+FIXTURE = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                       'benchmarks', 'fixtures', 'google_news_rss', 'ubicloud.xml')
+
+def fixture_entries():
+    with open(FIXTURE, 'rb') as f:
+        return parse_google_news_rss(f.read())
+
+def test_story_text_drops_publisher_markup_and_repeated_title():
+    entry = fixture_entries()[0]
+    assert story_text(entry['title'], entry['summary']) == \
+        'Ubicloud raises $16M to build an open-source alternative to AWS'
+    assert story_text('Big news - EU-Startups') == 'Big news'
+    assert story_text('A &amp; B - Reuters', '<p>Funding&nbsp;round closed</p>') == 'A & B Funding round closed'
+
+def test_syndicated_fixture_items_are_within_the_threshold():
+    entries = fixture_entries()
+    syndicated = [simhash(story_text(e['title'], e['summary'])) for e in entries
+                  if e['title'].startswith('Ubicloud raises $16M')]
+    assert len(syndicated) == 2
+    assert hamming_distance(*syndicated) <= MAX_HAMMING_DISTANCE
+
+def test_syndicated_fixture_items_share_a_story_id(tmp_path):
+    db = MentionDatabase(str(tmp_path / 'mentions.db'))
+    story_ids = {}
+    for entry in fixture_entries():
+        mention_id = db.add_mention({
+            'company_name': 'Ubicloud',
+            'title': entry['title'],
+            'content': entry['summary'],
+            'url': entry['link'],
+            'source': f"Google News - {entry['source']['href']}",
+            'published_date': entry['published'],
+            'sentiment_score': 0.0,
+        })
+        assert mention_id
+        with db._connect() as conn:
+            story_ids[entry['title']] = conn.execute(
+                "SELECT story_id FROM mentions WHERE id = ?", (mention_id,)).fetchone()[0]
+
+    techcrunch = story_ids['Ubicloud raises $16M to build an open-source alternative to AWS - TechCrunch']
+    yahoo = story_ids['Ubicloud raises $16M to build an open-source alternative to AWS - Yahoo Finance']
+    assert techcrunch == yahoo
+    # Every other item in the fixture is a different story
+    assert len(set(story_ids.values())) == len(story_ids) - 1
@@ -0,0 +1,47 @@
+"""
+Tests for article URL canonicalization
+Run with: python -m pytest test_url_canonicalizer.py
+"""
+
+import pytest
+
+from url_canonicalizer import canonicalize_url, needs_resolution
+
+CANONICAL = 'https://techcrunch.com/2024/03/05/ubicloud-raises-16m'
+
+@pytest.mark.parametrize('url', [
+    'https://techcrunch.com/2024/03/05/ubicloud-raises-16m',
+    'http://techcrunch.com/2024/03/05/ubicloud-raises-16m/',
+    'https://www.TechCrunch.com./2024/03/05/ubicloud-raises-16m',
+    'https://techcrunch.com:443/2024/03/05/ubicloud-raises-16m',
+    'http://techcrunch.com:80//2024/03/05//ubicloud-raises-16m',
+    'https://techcrunch.com/2024/03/05/ubicloud-raises-16m#comments',
+    'https://techcrunch.com/2024/03/05/ubicloud-raises-16m?utm_source=twitter&utm_medium=social&fbclid=abc',
+    '  https://techcrunch.com/2024/03/05/ubicloud-raises-16m?guccounter=1  ',
+])
+def test_variants_share_one_canonical_url(url):
+    assert canonicalize_url(url) == CANONICAL
+
+def test_article_query_is_kept_and_sorted():
+    assert canonicalize_url('https://example.com/story?page=2&id=7&utm_campaign=x') == \
+        'https://example.com/story?id=7&page=2'
+
+def test_non_default_port_is_kept():
+    assert canonicalize_url('https://example.com:8443/story/') == 'https://example.com:8443/story'
+
+def test_root_path_keeps_its_slash():
+    assert canonicalize_url('https://www.example.com') == 'https://example.com/'
+
+def test_google_search_result_is_unwrapped():
+    url = ('https://www.google.com/url?sa=t&q=https%3A%2F%2Fwww.techcrunch.com%2F2024%2F03%2F05'
+           '%2Fubicloud-raises-16m%2F%3Futm_source%3Dgoogle&ved=abc&usg=def')
+    assert canonicalize_url(url) == CANONICAL
+
+@pytest.mark.parametrize('url', ['', 'mailto:team@example.com', 'ftp://example.com/file', 'not a url'])
+def test_other_urls_are_left_alone(url):
+    assert canonicalize_url(url) == url
+
+def test_redirectors_need_resolution():
+    assert needs_resolution('https://news.google.com/rss/articles/CBMi')
+    assert needs_resolution('https://t.co/abc')
+    assert not needs_resolution(CANONICAL)
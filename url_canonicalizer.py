@@ -0,0 +1,155 @@
+"""
+URL canonicalization and redirect resolution for portfolio mentions
+Lets the same article found through Google News, NewsAPI or a search
+result be recognised as one URL
+"""
+
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, List, Optional
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+import requests
+
+from config import REDIRECT_CACHE_TTL_HOURS, REDIRECT_MAX_CONCURRENT, REDIRECT_TIMEOUT
+from http_client import get_session
+
+logger = logging.getLogger(__name__)
+
+# Query parameters that only track the click and never change the article
+TRACKING_PARAMS = {
+    'fbclid', 'gclid', 'dclid', 'msclkid', 'yclid', 'igshid', 'mc_cid', 'mc_eid',
+    'ocid', 'cmpid', 'ref', 'ref_src', 'src', 'source', 'smid', 'sr_share',
+    'guccounter', 'guce_referrer', 'guce_referrer_sig', '_ga', '_hsenc', '_hsmi',
+    'oc', 'ved', 'usg', 'ei'
+}
+TRACKING_PREFIXES = ('utm_', 'hsa_', 'pk_', 'mkt_')
+
+# Hosts whose links are redirects to the publisher's article
+REDIRECT_HOSTS = {
+    'news.google.com', 'feedproxy.google.com', 't.co', 'bit.ly', 'lnkd.in',
+    'ow.ly', 'buff.ly', 'trib.al', 'dlvr.it'
+}
+
+DEFAULT_PORTS = {'http': 80, 'https': 443}
+
+def _is_tracking_param(name: str) -> bool:
+    name = name.lower()
+    return name in TRACKING_PARAMS or name.startswith(TRACKING_PREFIXES)
+
+def _unwrap_google_redirect(parts) -> Optional[str]:
+    """Target of a google.com/url?q=... search result link"""
+    if parts.hostname and parts.hostname.startswith(('google.', 'www.google.')) and parts.path == '/url':
+        params = dict(parse_qsl(parts.query))
+        return params.get('q') or params.get('url')
+    return None
+
+def canonicalize_url(url: str) -> str:
+    """
+    Canonical form of an article URL
+    Normalizes scheme and host, drops default ports, fragments and tracking
+    parameters, sorts the remaining query and strips trailing slashes
+    """
+    if not url:
+        return url
+
+    url = url.strip()
+    parts = urlsplit(url)
+    if parts.scheme.lower() not in ('http', 'https') or not parts.hostname:
+        return url
+
+    target = _unwrap_google_redirect(parts)
+    if target and target != url:
+        return canonicalize_url(target)
+
+    host = parts.hostname.lower().rstrip('.')
+    if host.startswith('www.'):
+        host = host[4:]
+    if parts.port and parts.port not in DEFAULT_PORTS.values():
+        host = f"{host}:{parts.port}"
+
+    path = parts.path or '/'
+    while '//' in path:
+        path = path.replace('//', '/')
+    if len(path) > 1:
+        path = path.rstrip('/')
+
+    query = urlencode(sorted(
+        (name, value) for name, value in parse_qsl(parts.query, keep_blank_values=True)
+        if not _is_tracking_param(name)
+    ))
+
+    return urlunsplit(('https', host, path, query, ''))
+
+def needs_resolution(url: str) -> bool:
+    """Whether a URL points at a known redirector"""
+    try:
+        host = (urlsplit(url).hostname or '').lower()
+    except ValueError:
+        return False
+    return host in REDIRECT_HOSTS
+
+class RedirectResolver:
+    def __init__(self, db, session: Optional[requests.Session] = None,
+                 ttl_hours: int = REDIRECT_CACHE_TTL_HOURS,
+                 max_concurrent: int = REDIRECT_MAX_CONCURRENT,
+                 timeout: int = REDIRECT_TIMEOUT):
+        # MentionDatabase holding the url_redirects cache; not imported here
+        # because the database module canonicalizes URLs itself
+        self.db = db
+        self.session = session or get_session()
+        self.ttl_hours = ttl_hours
+        self.max_concurrent = max_concurrent
+        self.timeout = timeout
+        self._semaphore = threading.BoundedSemaphore(max_concurrent)
+
+    def _resolve_one(self, url: str) -> Optional[str]:
+        """Follow redirects to the final URL; None when the request failed or the redirector erred"""
+        with self._semaphore:
+            try:
+                response = self.session.head(url, allow_redirects=True, timeout=self.timeout)
+                if response.status_code in (403, 405, 501):
+                    # Some redirectors only answer GET
+                    response = self.session.get(url, allow_redirects=True, timeout=self.timeout, stream=True)
+                    response.close()
+            except requests.exceptions.RequestException as e:
+                logger.debug(f"Redirect resolution failed for {url}: {e}")
+                return None
+            if response.status_code == 429 or response.status_code >= 500:
+                logger.debug(f"Redirect resolution failed for {url}: HTTP {response.status_code}")
+                return None
+            return response.url or url
+
+    def resolve_many(self, urls: List[str]) -> Dict[str, str]:
+        """
+        Map each redirect URL to its final URL, using the persistent cache first
+        A URL that could not be resolved maps to itself and is not cached, so the
+        next cycle tries it again
+        """
+        urls = list(dict.fromkeys(url for url in urls if url and needs_resolution(url)))
+        if not urls:
+            return {}
+
+        resolved = self.db.get_cached_redirects(urls, self.ttl_hours)
+        missing = [url for url in urls if url not in resolved]
+
+        if missing:
+            with ThreadPoolExecutor(max_workers=min(self.max_concurrent, len(missing))) as pool:
+                final_urls = list(pool.map(self._resolve_one, missing))
+            fresh = {url: final_url for url, final_url in zip(missing, final_urls) if final_url}
+            self.db.save_redirects(fresh)
+            resolved.update(fresh)
+            resolved.update((url, url) for url in missing if url not in fresh)
+            logger.debug(f"Resolved {len(fresh)} of {len(missing)} redirect URLs ({len(urls) - len(missing)} cached)")
+
+        return resolved
+
+    def resolve_mentions(self, mentions: List[Dict]) -> List[Dict]:
+        """Replace redirect URLs in mentions with the publisher URL they lead to"""
+        resolved = self.resolve_many([mention.get('url', '') for mention in mentions])
+        for mention in mentions:
+            final_url = resolved.get(mention.get('url'))
+            if final_url:
+                mention['url'] = final_url
+        return mentions